@@ -1,3 +1,10 @@
+# Probability assigned to each confidence level
+CONFIDENCE_MAPPING = {
+    "Not Confident": 0.5,        # 50%
+    "Moderately Confident": 0.7, # 70%
+    "Super Confident": 0.9       # 90%
+}
+
 # Default bets data
 default_bets = [
     {"name": "Bet 1", "odds": "1.50", "confidence": "Moderately Confident"},
@@ -1,15 +1,21 @@
 # main_window.py
 
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QSplitter
+import sqlite3
+
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QSplitter, QInputDialog
 from PyQt5.QtCore import Qt
 from .widgets.strategy_config_widget import StrategyConfigWidget
 from .widgets.bets_entry_widget import BetsEntryWidget
 from .widgets.action_buttons_widget import ActionButtonsWidget
 from .widgets.results_explanations_widget import ResultsExplanationsWidget
 from .widgets.visualization_widget import VisualizationWidget
-from models.betting_strategy import BettingStrategy
-from utils.combination_utils import generate_combinations
+from .strategy_worker import StoreImportWorker, StrategyWorker
+from utils.allocation_cache import AllocationCache
 from utils.stake_allocation_utils import allocate_stakes
+from utils.strategy_store import StrategyStore
+
+# Most recent strategies offered by "Load from History"
+HISTORY_LIMIT = 500
 
 
 class MainWindow(QWidget):
@@ -20,6 +26,14 @@ class MainWindow(QWidget):
         self.setWindowTitle("Betting Strategy Simulator")
         self.setMinimumSize(900, 700)
         self.strategy = None
+        # Solved allocations, reused when Process is clicked again on the same slate
+        self.allocation_cache = AllocationCache()
+        # Index of saved strategies, opened on first use
+        self.strategy_store = None
+        # Background indexing of the strategy files of results/, started with the store
+        self.store_import = None
+        # Background pipeline run, while the Process button is busy
+        self.worker = None
         self.init_ui()
         self.apply_light_mode()
 
@@ -43,6 +57,7 @@ class MainWindow(QWidget):
 
         # Bets Entry Section
         self.bets_widget = BetsEntryWidget()
+        self.bets_widget.bet_edited.connect(self.update_bet)
         main_splitter.addWidget(self.bets_widget)
 
         # Action Buttons Section
@@ -51,8 +66,10 @@ class MainWindow(QWidget):
 
         # Connect action buttons to methods
         self.action_buttons_widget.process_btn.clicked.connect(self.process_strategy)
+        self.action_buttons_widget.cancel_btn.clicked.connect(self.cancel_processing)
         self.action_buttons_widget.save_btn.clicked.connect(self.save_strategy)
         self.action_buttons_widget.load_btn.clicked.connect(self.load_strategy)
+        self.action_buttons_widget.history_btn.clicked.connect(self.load_from_history)
         self.action_buttons_widget.reset_btn.clicked.connect(self.reset_app)
 
         # Results and Explanations Section
@@ -76,7 +93,9 @@ class MainWindow(QWidget):
         self.setLayout(main_layout)
 
     def process_strategy(self):
-        """Process the betting strategy based on user input."""
+        """Process the betting strategy based on user input, on a background thread."""
+        if self.worker is not None:
+            return
         try:
             # Retrieve configuration data
             total_budget = self.config_widget.get_total_budget()
@@ -90,49 +109,188 @@ class MainWindow(QWidget):
 
             # Retrieve bets data
             bets = self.bets_widget.get_bets()
+        except Exception as e:
+            self.results_widget.show_warning(str(e))
+            return
 
-            # Error checking
-            if total_budget <= 0:
-                self.results_widget.show_warning("Total budget must be greater than zero.")
-                return
-            if not bets:
-                self.results_widget.show_warning("Please enter at least one bet.")
-                return
+        # Generate, filter and allocate off the UI thread
+        self.worker = StrategyWorker(
+            bets, total_budget, strategy_type, risk_preference, folds=folds,
+            method=self.config_widget.get_allocation_method(), cache=self.allocation_cache
+        )
+        self.worker.progress.connect(self.action_buttons_widget.show_progress)
+        self.worker.partial.connect(self.show_partial_results)
+        self.worker.finished.connect(self.strategy_processed)
+        self.worker.failed.connect(self.processing_failed)
+        self.worker.cancelled.connect(self.discard_partial_results)
+        self.worker.worker_thread.finished.connect(self.processing_stopped)
+        self.action_buttons_widget.set_processing(True)
+        self.worker.start()
 
-            # Generate combinations
-            self.strategy = BettingStrategy(total_budget, strategy_type, folds, risk_preference)
-            self.strategy.combinations = generate_combinations(
-                bets, strategy_type, risk_preference, folds=folds
-            )
+    def cancel_processing(self):
+        """Stop the strategy being processed; the previous results stay displayed.
+
+        Results the worker already queued are ignored from here on, so they
+        cannot replace a strategy loaded or reset after the cancel.
+        """
+        if self.worker is not None:
+            self.worker.cancel()
+            self.discard_partial_results()
+
+    def show_partial_results(self, strategy):
+        if not self.worker.cancel_requested():
+            self.results_widget.display_results(strategy)
+
+    def strategy_processed(self, strategy):
+        if self.worker.cancel_requested():
+            return  # Finished before it saw the cancel
+        self.strategy = strategy
+        self.display_results()
+        # The worker copied the bets when it started; apply the edits made since
+        updates = self.edited_bets()
+        if updates:
+            self.rescore(updates)
+
+    def processing_failed(self, message):
+        if self.worker.cancel_requested():
+            return
+        self.discard_partial_results()
+        self.results_widget.show_warning(message)
+
+    def discard_partial_results(self):
+        """Show the current strategy again in place of the provisional top-K."""
+        self.results_widget.display_results(self.strategy)
+
+    def processing_stopped(self):
+        self.worker.worker_thread.wait()
+        self.worker = None
+        self.action_buttons_widget.set_processing(False)
+
+    def update_bet(self, index):
+        """Re-score the current strategy after one bet's odds or confidence changed."""
+        if not self.strategy or self.worker is not None:
+            return  # The running pipeline's strategy is brought up to date when it finishes
+        try:
+            bet = self.bets_widget.get_bet(index)
+        except ValueError:
+            return  # Entry not valid yet; it will be checked on the next full processing
+
+        # Only patch the strategy if the bets panel still matches its bet table
+        slate = self.strategy.combinations.bets
+        if len(slate) != self.bets_widget.bet_count() or slate[index].name != bet.name:
+            return
+        if (slate[index].odds, slate[index].confidence) == (bet.odds, bet.confidence):
+            return
+        self.rescore({index: (bet.odds, bet.confidence)})
 
-            # Filter and sort combinations based on risk preference
-            self.strategy.filter_and_sort_combinations()
+    def edited_bets(self):
+        """The `leg -> (odds, confidence)` of the bets whose valid panel entry differs from the strategy's."""
+        slate = self.strategy.combinations.bets
+        if len(slate) != self.bets_widget.bet_count():
+            return {}
+        updates = {}
+        for index, bet in enumerate(slate):
+            try:
+                entry = self.bets_widget.get_bet(index)
+            except ValueError:
+                continue
+            if entry.name == bet.name and (entry.odds, entry.confidence) != (bet.odds, bet.confidence):
+                updates[index] = (entry.odds, entry.confidence)
+        return updates
 
+    def rescore(self, updates):
+        """Re-score the strategy for `leg -> (odds, confidence)` updates, re-allocate and display it."""
+        try:
+            self.strategy.rescore_bets(updates)
             if not self.strategy.combinations:
                 self.results_widget.show_warning("No suitable combinations found based on your risk preference.")
                 return
-
-            # Allocate stakes
-            allocate_stakes(self.strategy)
-
-            # Display results
+            # Warm-start the optimizer from the stakes kept through the update
+            self.allocate_stakes(initial_weights=self.strategy.stake_allocation)
             self.display_results()
         except Exception as e:
             self.results_widget.show_warning(str(e))
 
+    def allocate_stakes(self, initial_weights=None):
+        """Allocate the strategy's stakes with the selected method.
+
+        Mean-variance allocation accounts for combinations that share legs.
+        """
+        allocate_stakes(
+            self.strategy, initial_weights=initial_weights, covariance="shared_legs",
+            cache=self.allocation_cache, method=self.config_widget.get_allocation_method()
+        )
+
     def display_results(self):
         """Display the results and explanations based on the processed strategy."""
         self.results_widget.display_results(self.strategy)
         self.visualization_widget.set_strategy(self.strategy)
 
     def save_strategy(self):
-        """Save the current betting strategy to a JSON file."""
-        self.results_widget.save_strategy(self.strategy)
+        """Save the current betting strategy to a JSON or binary strategy file."""
+        file_path = self.results_widget.save_strategy(self.strategy)
+        if file_path:
+            try:
+                self.get_strategy_store().add(self.strategy, source=file_path)
+            except sqlite3.Error as e:
+                self.results_widget.show_warning(f"Strategy saved, but not added to the history: {e}")
+
+    def get_strategy_store(self):
+        """Open the strategy history, and index the strategy files of results/ it does not know yet.
+
+        The files are indexed on a background thread; strategies appear in
+        the history as soon as it commits.
+        """
+        if self.strategy_store is None:
+            self.strategy_store = StrategyStore()
+            self.store_import = StoreImportWorker(self.strategy_store.path)
+            self.store_import.finished.connect(self.store_imported)
+            self.store_import.failed.connect(self.store_import_failed)
+            self.store_import.worker_thread.finished.connect(self.store_import_stopped)
+            self.store_import.start()
+        return self.strategy_store
+
+    def store_imported(self, imported, skipped, errors):
+        if errors:
+            self.bets_widget.show_errors(
+                "History Import Errors", f"Added {imported} saved strategies to the history; "
+                f"{len(errors)} files could not be read.", errors
+            )
+
+    def store_import_failed(self, message):
+        self.results_widget.show_warning(f"Failed to index the saved strategies: {message}")
+
+    def store_import_stopped(self):
+        self.store_import.worker_thread.wait()
+        self.store_import = None
+
+    def load_from_history(self):
+        """Load a betting strategy from the strategy history."""
+        try:
+            records = self.get_strategy_store().find(limit=HISTORY_LIMIT)
+            if not records:
+                if self.store_import is not None:
+                    self.results_widget.show_warning("The saved strategies are still being indexed; try again shortly.")
+                else:
+                    self.results_widget.show_warning("No saved strategies in the history.")
+                return
+            labels = [record.label() for record in records]
+            label, ok = QInputDialog.getItem(self, "Load from History", "Strategy:", labels, 0, False)
+            if ok:
+                self.strategy = self.strategy_store.load(records[labels.index(label)].id)
+                self.show_loaded_strategy()
+        except (sqlite3.Error, KeyError) as e:
+            self.results_widget.show_warning(f"Failed to load strategy from the history: {e}")
 
     def load_strategy(self):
-        """Load a betting strategy from a JSON file."""
+        """Load a betting strategy from a JSON or binary strategy file."""
         self.strategy = self.results_widget.load_strategy()
+        self.show_loaded_strategy()
+
+    def show_loaded_strategy(self):
         if self.strategy:
+            # A strategy still being processed must not replace the loaded one
+            self.cancel_processing()
             # Update UI with loaded data
             self.config_widget.set_strategy(self.strategy)
             self.bets_widget.set_bets(self.strategy.get_unique_bets())
@@ -140,8 +298,18 @@ class MainWindow(QWidget):
 
     def reset_app(self):
         """Reset the application to its initial state."""
+        self.cancel_processing()
         self.config_widget.reset()
         self.bets_widget.reset()
         self.results_widget.reset()
         self.visualization_widget.set_strategy(None)
         self.strategy = None
+
+    def closeEvent(self, event):
+        """Stop a running pipeline, and let the history indexing finish, before the window goes away."""
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker.worker_thread.wait()
+        if self.store_import is not None:
+            self.store_import.worker_thread.wait()
+        super().closeEvent(event)
@@ -0,0 +1,93 @@
+import threading
+
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+
+from utils.pipeline import PipelineCancelled, run_pipeline
+from utils.strategy_store import StrategyStore
+
+
+class StrategyWorker(QObject):
+    """Runs `run_pipeline` on a QThread and reports back through signals.
+
+    `progress` receives `(stage, enumerated, total, kept)`, `partial` the
+    provisional top-K strategies, and exactly one of `finished` (the
+    strategy), `failed` (the message to show) or `cancelled` is emitted at
+    the end. `cancel` may be called from the UI thread at any time.
+    """
+    progress = pyqtSignal(str, int, int, int)
+    partial = pyqtSignal(object)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, bets, total_budget, strategy_type, risk_preference, folds=None,
+                 method="mean_variance", cache=None):
+        super().__init__()
+        self.arguments = (bets, total_budget, strategy_type, risk_preference)
+        self.options = {"folds": folds, "method": method, "cache": cache}
+        self._cancel = threading.Event()
+        self.worker_thread = QThread()
+        self.moveToThread(self.worker_thread)
+        self.worker_thread.started.connect(self.run)
+        for signal in (self.finished, self.failed, self.cancelled):
+            signal.connect(self.worker_thread.quit)
+        self.worker_thread.finished.connect(self.deleteLater)
+
+    def start(self):
+        self.worker_thread.start()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    def report(self, report):
+        self.progress.emit(report.stage, report.enumerated, report.total, report.kept)
+        if report.partial is not None:
+            self.partial.emit(report.partial)
+
+    def run(self):
+        try:
+            strategy = run_pipeline(
+                *self.arguments, progress=self.report, cancelled=self._cancel.is_set, **self.options
+            )
+        except PipelineCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.finished.emit(strategy)
+
+
+class StoreImportWorker(QObject):
+    """Runs `StrategyStore.import_directory` on a QThread, with its own connection to the store.
+
+    Emits `finished` with `(imported, skipped, errors)`, or `failed` with the
+    message of a database error.
+    """
+    finished = pyqtSignal(int, int, list)
+    failed = pyqtSignal(str)
+
+    def __init__(self, path, directory="results"):
+        super().__init__()
+        self.path = path
+        self.directory = directory
+        self.worker_thread = QThread()
+        self.moveToThread(self.worker_thread)
+        self.worker_thread.started.connect(self.run)
+        for signal in (self.finished, self.failed):
+            signal.connect(self.worker_thread.quit)
+        self.worker_thread.finished.connect(self.deleteLater)
+
+    def start(self):
+        self.worker_thread.start()
+
+    def run(self):
+        try:
+            with StrategyStore(self.path) as store:
+                imported, skipped, errors = store.import_directory(self.directory)
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.finished.emit(imported, skipped, errors)
@@ -1,4 +1,4 @@
-from PyQt5.QtWidgets import QWidget, QHBoxLayout, QPushButton
+from PyQt5.QtWidgets import QWidget, QHBoxLayout, QPushButton, QProgressBar
 
 
 class ActionButtonsWidget(QWidget):
@@ -16,19 +16,54 @@ class ActionButtonsWidget(QWidget):
         self.process_btn = QPushButton("Process Betting Strategy")
         self.process_btn.setToolTip("Process the betting strategy based on entered bets.")
 
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.setToolTip("Stop processing the betting strategy.")
+        self.cancel_btn.setEnabled(False)
+
+        # Progress of the strategy being processed, hidden when idle
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setTextVisible(True)
+        self.progress_bar.setVisible(False)
+
         self.save_btn = QPushButton("Save Strategy")
         self.save_btn.setToolTip("Save the current betting strategy to a file.")
 
         self.load_btn = QPushButton("Load Strategy")
         self.load_btn.setToolTip("Load a previously saved betting strategy from a file.")
 
+        self.history_btn = QPushButton("Load from History")
+        self.history_btn.setToolTip("Load a previously saved betting strategy from the strategy history.")
+
         self.reset_btn = QPushButton("Reset")
         self.reset_btn.setToolTip("Reset the application to its initial state.")
 
         action_layout.addWidget(self.process_btn)
+        action_layout.addWidget(self.cancel_btn)
+        action_layout.addWidget(self.progress_bar)
         action_layout.addWidget(self.save_btn)
         action_layout.addWidget(self.load_btn)
+        action_layout.addWidget(self.history_btn)
         action_layout.addWidget(self.reset_btn)
 
         self.setLayout(action_layout)
         self.setFixedHeight(70)
+
+    def set_processing(self, processing):
+        """Switch between the idle and processing states of the buttons."""
+        self.process_btn.setEnabled(not processing)
+        self.cancel_btn.setEnabled(processing)
+        self.progress_bar.setVisible(processing)
+        if processing:
+            self.progress_bar.setRange(0, 0)  # Busy until the first progress report
+            self.progress_bar.setFormat("Starting...")
+
+    def show_progress(self, stage, enumerated, total, kept):
+        """Show one progress report of the strategy pipeline."""
+        if stage == "enumerating" and total:
+            self.progress_bar.setRange(0, 1000)
+            self.progress_bar.setValue(int(1000 * enumerated / total))
+            self.progress_bar.setFormat(f"Enumerated {enumerated:,} of {total:,} ({kept:,} kept)")
+        else:
+            self.progress_bar.setRange(0, 0)
+            self.progress_bar.setFormat(f"Optimizing stakes for {kept:,} combinations..." if stage == "optimizing"
+                                        else "Done")
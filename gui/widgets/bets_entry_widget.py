@@ -1,19 +1,26 @@
+import os
 from PyQt5.QtWidgets import (
-    QWidget, QHBoxLayout, QLineEdit, QLabel, QGroupBox, QVBoxLayout,
-    QScrollArea, QPushButton, QMessageBox, QHBoxLayout
+    QWidget, QGroupBox, QVBoxLayout, QHBoxLayout, QTableView, QHeaderView,
+    QPushButton, QMessageBox, QFileDialog
 )
-from PyQt5.QtGui import QDoubleValidator, QIntValidator
-from PyQt5.QtCore import Qt
-from .bet_entry_widget import BetEntryWidget
-from data.bets_data import default_bets
+from PyQt5.QtCore import pyqtSignal
+from data.bets_data import CONFIDENCE_MAPPING, default_bets
 from models.bet import Bet
+from utils.strategy_io import BET_FIELDS, read_bet_columns
+from .bets_table_model import BetEditorDelegate, BetsTableModel
+
+# Errors listed in the body of an error report; all of them are in its details
+REPORTED_ERRORS = 10
+
 
 class BetsEntryWidget(QGroupBox):
     """Widget for entering bets."""
 
+    # Emitted with the bet's position when its odds or confidence are edited
+    bet_edited = pyqtSignal(int)
+
     def __init__(self):
         super().__init__("Bets")
-        self.bets_widgets = []
         self.init_ui()
 
     def init_ui(self):
@@ -21,21 +28,23 @@ class BetsEntryWidget(QGroupBox):
         bets_layout.setContentsMargins(10, 10, 10, 10)
         bets_layout.setSpacing(10)
 
-        # Scroll Area for Bets
-        self.bets_scroll = QScrollArea()
-        self.bets_scroll.setWidgetResizable(True)
-        self.bets_container = QWidget()
-        self.bets_vbox = QVBoxLayout()
-        self.bets_vbox.setAlignment(Qt.AlignTop)
-        self.bets_container.setLayout(self.bets_vbox)
-        self.bets_scroll.setWidget(self.bets_container)
-        bets_layout.addWidget(self.bets_scroll)
+        # Bets Table
+        self.bets_model = BetsTableModel(self)
+        self.bets_model.bet_edited.connect(self.bet_edited.emit)
+        self.bets_table = QTableView()
+        self.bets_table.setModel(self.bets_model)
+        self.bets_table.setItemDelegate(BetEditorDelegate(self.bets_table))
+        self.bets_table.setSelectionBehavior(QTableView.SelectRows)
+        self.bets_table.setAlternatingRowColors(True)
+        self.bets_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        # Rows all have the same height, so the view never measures them one by one
+        self.bets_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        bets_layout.addWidget(self.bets_table)
 
         # Add default bets
-        for bet in default_bets:
-            self.add_bet_entry(bet["name"], bet["odds"], bet["confidence"])
+        self.reset()
 
-        # Add/Remove Bet Buttons
+        # Add/Remove/Import Bet Buttons
         buttons_widget = QWidget()
         buttons_layout = QHBoxLayout(buttons_widget)
         buttons_layout.setContentsMargins(10, 0, 10, 0)
@@ -46,71 +55,106 @@ class BetsEntryWidget(QGroupBox):
         self.add_bet_btn.setToolTip("Add a new bet entry.")
         self.remove_bet_btn = QPushButton("Remove Bet")
         self.remove_bet_btn.clicked.connect(self.remove_bet_entry)
-        self.remove_bet_btn.setToolTip("Remove the last bet entry.")
+        self.remove_bet_btn.setToolTip("Remove the selected bet entries, or the last one.")
+        self.import_bets_btn = QPushButton("Import Bets")
+        self.import_bets_btn.clicked.connect(self.import_bets)
+        self.import_bets_btn.setToolTip("Replace the bets with those of a CSV, JSON-lines or JSON file.")
 
         buttons_layout.addWidget(self.add_bet_btn)
         buttons_layout.addWidget(self.remove_bet_btn)
+        buttons_layout.addWidget(self.import_bets_btn)
         buttons_widget.setLayout(buttons_layout)
         buttons_widget.setFixedHeight(60)
 
         bets_layout.addWidget(buttons_widget)
         self.setLayout(bets_layout)
 
-    def add_bet_entry(self, name: str = "Bet", odds: str = "1.50", confidence: str = "50"):
-        """Add a new bet entry widget."""
-        bet_widget = BetEntryWidget(name=name, odds=odds, confidence=confidence)
-        self.bets_vbox.addWidget(bet_widget)
-        self.bets_widgets.append(bet_widget)
+    def bet_count(self) -> int:
+        return self.bets_model.rowCount()
+
+    def add_bet_entry(self, name: str = "Bet", odds: str = "1.50", confidence: str = "Not Confident"):
+        """Add a new bet row and select it."""
+        self.bets_model.add_row(name, odds, confidence)
+        index = self.bets_model.index(self.bet_count() - 1, 0)
+        self.bets_table.scrollTo(index)
+        self.bets_table.setCurrentIndex(index)
 
     def remove_bet_entry(self):
-        """Remove the last bet entry widget."""
-        if self.bets_widgets:
-            bet_widget = self.bets_widgets.pop()
-            self.bets_vbox.removeWidget(bet_widget)
-            bet_widget.deleteLater()
-        else:
+        """Remove the selected bet rows, or the last one if none is selected."""
+        if not self.bet_count():
             QMessageBox.warning(self, "Warning", "No more bets to remove.")
+            return
+        rows = sorted({index.row() for index in self.bets_table.selectionModel().selectedRows()})
+        if not rows:
+            rows = [self.bet_count() - 1]
+        # Remove contiguous runs from the bottom up, so the rows above keep their position
+        runs = []
+        for row in rows:
+            if runs and row == runs[-1][0] + runs[-1][1]:
+                runs[-1][1] += 1
+            else:
+                runs.append([row, 1])
+        for first, count in reversed(runs):
+            self.bets_model.remove_rows(first, count)
+
+    def import_bets(self):
+        """Replace the bets with those of a CSV, JSON-lines or JSON file and report its invalid rows."""
+        options = QFileDialog.Options()
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "Import Bets", os.getcwd(),
+            "Bet Files (*.csv *.jsonl *.ndjson *.json);;CSV Files (*.csv);;"
+            "JSON Lines Files (*.jsonl *.ndjson);;JSON Files (*.json);;All Files (*)", options=options
+        )
+        if not file_path:
+            return
+
+        try:
+            columns, read_errors = read_bet_columns(file_path)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to import bets: {e}")
+            return
+
+        # Invalid rows are imported too, highlighted, so they can be fixed in the table
+        self.bets_model.set_rows(columns["name"], columns["odds"], columns["confidence"])
+        bets, errors = self.bets_model.validate()
+        messages = read_errors + list(errors.values())
+        if messages:
+            self.show_errors(
+                "Import Errors", f"Imported {self.bet_count()} bets from {os.path.basename(file_path)}; "
+                f"{len(bets)} are valid.", messages
+            )
+
+    def show_errors(self, title: str, summary: str, messages):
+        """Report all the errors in one message box: the first few in its text, every one in its details."""
+        shown = "\n".join(messages[:REPORTED_ERRORS])
+        if len(messages) > REPORTED_ERRORS:
+            shown += f"\n... and {len(messages) - REPORTED_ERRORS} more (see details)."
+        report = QMessageBox(QMessageBox.Critical, title, f"{summary}\n\n{shown}", QMessageBox.Ok, self)
+        report.setDetailedText("\n".join(messages))
+        report.exec_()
+
+    def get_bet(self, index: int) -> Bet:
+        """Return the bet at `index`; raises ValueError if its entry is invalid."""
+        return self.bets_model.bet(index)
 
     def get_bets(self):
-            bets = []
-            confidence_mapping = {
-                "Not Confident": 0.5,        # 50%
-                "Moderately Confident": 0.7, # 70%
-                "Super Confident": 0.9       # 90%
-            }
-            for idx, bet_widget in enumerate(self.bets_widgets, start=1):
-                bet_data = bet_widget.get_bet_data()
-                try:
-                    name = bet_data["name"]
-                    odds = float(bet_data["odds"])
-                    confidence_str = bet_data["confidence"]
-                    if not name:
-                        raise ValueError("Bet name cannot be empty.")
-                    if odds <= 1.0:
-                        raise ValueError("Odds must be greater than 1.0.")
-                    if confidence_str not in confidence_mapping:
-                        raise ValueError("Invalid confidence selection.")
-                    confidence = confidence_mapping[confidence_str]
-                    bets.append(Bet(name, odds, confidence))
-                except ValueError as e:
-                    QMessageBox.critical(self, "Input Error", f"Bet {idx} ({bet_data.get('name', 'Unnamed')}): {e}")
-                    raise
-            return bets
+        bets, errors = self.bets_model.validate()
+        if errors:
+            messages = list(errors.values())
+            self.show_errors("Input Error", f"{len(messages)} of {self.bet_count()} bets are invalid.", messages)
+            raise ValueError(messages[0] if len(messages) == 1 else
+                             f"{len(messages)} bets are invalid; they are highlighted in the bets table.")
+        return bets
 
     def set_bets(self, bets):
-        # Clear existing bets
-        while self.bets_widgets:
-            self.remove_bet_entry()
-
-        # Add bets to the UI
-        for bet in bets:
-            self.add_bet_entry(bet.name, f"{bet.odds:.2f}", f"{bet.confidence:.1f}")
+        # Confidences matching a level are shown as its label
+        labels = {probability: label for label, probability in CONFIDENCE_MAPPING.items()}
+        self.bets_model.set_rows(
+            [bet.name for bet in bets],
+            [f"{bet.odds:.2f}" for bet in bets],
+            [labels.get(bet.confidence, f"{bet.confidence:g}") for bet in bets],
+        )
 
     def reset(self):
-        # Clear bets
-        while self.bets_widgets:
-            self.remove_bet_entry()
-
-        # Add default bets
-        for bet in default_bets:
-            self.add_bet_entry(bet["name"], bet["odds"], bet["confidence"])
+        # Restore the default bets
+        self.bets_model.set_rows(*([bet[field] for bet in default_bets] for field in BET_FIELDS))
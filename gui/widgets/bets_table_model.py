@@ -0,0 +1,153 @@
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt, pyqtSignal
+from PyQt5.QtGui import QColor, QDoubleValidator
+from PyQt5.QtWidgets import QComboBox, QLineEdit, QStyledItemDelegate
+
+from data.bets_data import CONFIDENCE_MAPPING
+from models.bet import Bet
+from utils.strategy_io import BET_FIELDS, parse_bet, validate_bet_columns
+
+# Column headers, in the order of `BET_FIELDS`
+BET_COLUMNS = ["Name", "Odds", "Confidence"]
+
+# Background of the rows that failed the last validation
+INVALID_ROW_COLOR = QColor(255, 220, 220)
+
+
+class BetsTableModel(QAbstractTableModel):
+    """Editable table model over the bets panel.
+
+    Entries are kept as text, as typed or imported, in one list per column,
+    and validated all at once by `validate`. Rows that failed the last
+    validation are highlighted, with their error as tooltip, until edited.
+    """
+
+    # Emitted with the row whose odds or confidence were edited
+    bet_edited = pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.columns = tuple([] for _ in BET_FIELDS)
+        self.errors = {}
+
+    def set_rows(self, names, odds, confidences):
+        """Replace all the rows; values are shown as text, with empty cells for None."""
+        self.beginResetModel()
+        self.columns = tuple(
+            ["" if value is None else str(value) for value in column] for column in (names, odds, confidences)
+        )
+        self.errors = {}
+        self.endResetModel()
+
+    def set_errors(self, errors):
+        """Highlight the rows of `errors`, a dict of messages by row."""
+        self.errors = dict(errors)
+        if self.rowCount():
+            self.dataChanged.emit(
+                self.index(0, 0), self.index(self.rowCount() - 1, len(BET_FIELDS) - 1),
+                [Qt.BackgroundRole, Qt.ToolTipRole]
+            )
+
+    def add_row(self, name: str, odds: str, confidence: str):
+        row = self.rowCount()
+        self.beginInsertRows(QModelIndex(), row, row)
+        for column, value in zip(self.columns, (name, odds, confidence)):
+            column.append(value)
+        self.endInsertRows()
+
+    def remove_rows(self, first: int, count: int):
+        self.beginRemoveRows(QModelIndex(), first, first + count - 1)
+        for column in self.columns:
+            del column[first:first + count]
+        # Errors of the following rows move up with them
+        self.errors = {
+            row - count if row >= first else row: message
+            for row, message in self.errors.items() if not first <= row < first + count
+        }
+        self.endRemoveRows()
+
+    def row_data(self, row: int) -> dict:
+        return {field: column[row].strip() for field, column in zip(BET_FIELDS, self.columns)}
+
+    def bet(self, row: int) -> Bet:
+        """The bet of one row; raises ValueError if it is invalid."""
+        return parse_bet(self.row_data(row))
+
+    def validate(self):
+        """Validate every row; returns `(bets, errors)` as `validate_bet_columns` and highlights the invalid rows."""
+        bets, errors = validate_bet_columns(*self.columns)
+        self.set_errors(errors)
+        return bets, errors
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns[0])
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(BET_COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return self.columns[index.column()][index.row()]
+        if role == Qt.BackgroundRole and index.row() in self.errors:
+            return INVALID_ROW_COLOR
+        if role == Qt.ToolTipRole:
+            return self.errors.get(index.row())
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.EditRole or not index.isValid():
+            return False
+        row, column = index.row(), index.column()
+        value = str(value)
+        if value == self.columns[column][row]:
+            return False
+        self.columns[column][row] = value
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+        if self.errors.pop(row, None) is not None:
+            self.dataChanged.emit(
+                self.index(row, 0), self.index(row, len(BET_FIELDS) - 1), [Qt.BackgroundRole, Qt.ToolTipRole]
+            )
+        if column > 0:
+            self.bet_edited.emit(row)
+        return True
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsSelectable | Qt.ItemIsEnabled | Qt.ItemIsEditable
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole:
+            return BET_COLUMNS[section] if orientation == Qt.Horizontal else str(section + 1)
+        return super().headerData(section, orientation, role)
+
+
+class BetEditorDelegate(QStyledItemDelegate):
+    """Editors of the bets table: validated odds, and the confidence labels (or a typed probability)."""
+
+    def createEditor(self, parent, option, index):
+        if index.column() == 1:
+            editor = QLineEdit(parent)
+            editor.setValidator(QDoubleValidator(1.01, 1000.00, 2, editor))
+            return editor
+        if index.column() == 2:
+            editor = QComboBox(parent)
+            editor.setEditable(True)
+            editor.addItems(list(CONFIDENCE_MAPPING))
+            # Picking a label applies it at once, as the old per-bet combo did
+            editor.activated.connect(lambda: self.commitData.emit(editor))
+            return editor
+        return super().createEditor(parent, option, index)
+
+    def setEditorData(self, editor, index):
+        if isinstance(editor, QComboBox):
+            editor.setCurrentText(index.data(Qt.EditRole))
+        else:
+            super().setEditorData(editor, index)
+
+    def setModelData(self, editor, model, index):
+        if isinstance(editor, QComboBox):
+            model.setData(index, editor.currentText().strip(), Qt.EditRole)
+        else:
+            super().setModelData(editor, model, index)
@@ -0,0 +1,110 @@
+import numpy as np
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+# Column headers, in display order
+RESULT_COLUMNS = ["Combination", "Combined Odds", "Stake Allocation ($)", "Potential Payout ($)", "EV per $"]
+
+
+class ResultsTableModel(QAbstractTableModel):
+    """Table model over the staked combinations of a strategy.
+
+    The numeric columns are computed once as arrays (rounded to cents, as
+    displayed) and cells are formatted only when the view asks for them.
+    Sorting permutes a row order array; combination names are only built
+    for the rows shown, or all at once when sorting by name.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.set_strategy(None)
+
+    def set_strategy(self, strategy):
+        """Show the combinations of `strategy` (None for an empty table) with a stake of at least a cent."""
+        self.beginResetModel()
+        self.strategy = strategy
+        if strategy:
+            stakes = np.round(np.asarray(strategy.stake_allocation, dtype=np.float64), 2)
+            self.rows = np.flatnonzero(stakes > 0)
+            combinations = strategy.combinations
+            self.stakes = stakes[self.rows]
+            self.combined_odds = np.round(combinations.combined_odds[self.rows], 2)
+            self.payouts = np.round(self.combined_odds * self.stakes, 2)
+            self.ev_per_dollar = np.round(combinations.ev_per_dollar[self.rows], 2)
+        else:
+            self.rows = np.zeros(0, dtype=np.intp)
+            self.stakes = self.combined_odds = self.payouts = self.ev_per_dollar = np.zeros(0)
+        self.order = np.arange(len(self.rows))
+        self.endResetModel()
+
+    @property
+    def total_stake(self) -> float:
+        return float(self.stakes.sum())
+
+    @property
+    def total_payout(self) -> float:
+        return float(self.payouts.sum())
+
+    def combination_row(self, view_row: int) -> int:
+        """Row of the strategy's combinations shown at `view_row`."""
+        return int(self.rows[self.order[view_row]])
+
+    def bet_names(self, position: int) -> str:
+        return self.strategy.combinations.bet_names(int(self.rows[position]))
+
+    def explanation(self, view_row: int) -> str:
+        """HTML explanation of the combination shown at `view_row`."""
+        position = self.order[view_row]
+        return (
+            f"<b>Combination:</b> {self.bet_names(position)}<br>"
+            f"<b>Combined Odds:</b> {self.combined_odds[position]}<br>"
+            f"<b>Stake Allocation:</b> ${self.stakes[position]}<br>"
+            f"<b>Potential Payout:</b> ${self.payouts[position]}<br>"
+            f"<b>Expected Value per $:</b> {self.ev_per_dollar[position]}<br><br>"
+        )
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(RESULT_COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        position = self.order[index.row()]
+        column = index.column()
+        if column == 0:
+            return self.bet_names(position)
+        if column == 1:
+            return f"{self.combined_odds[position]:.2f}"
+        if column == 2:
+            return f"${self.stakes[position]:.2f}"
+        if column == 3:
+            return f"${self.payouts[position]:.2f}"
+        return f"{self.ev_per_dollar[position]:.2f}"
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return RESULT_COLUMNS[section]
+        return super().headerData(section, orientation, role)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """Order the rows by a column; ties keep the strategy's order and the selection follows its row."""
+        if not len(self.rows):
+            return
+        self.layoutAboutToBeChanged.emit()
+        if column == 0:
+            # Rank of each name, so that both directions sort the same way as numbers
+            _, keys = np.unique([self.bet_names(position) for position in range(len(self.rows))],
+                                return_inverse=True)
+        else:
+            keys = (self.combined_odds, self.stakes, self.payouts, self.ev_per_dollar)[column - 1]
+        previous = self.persistentIndexList()
+        positions = [self.order[index.row()] for index in previous]
+        self.order = np.argsort(-keys if order == Qt.DescendingOrder else keys, kind="stable")
+        view_rows = np.empty_like(self.order)
+        view_rows[self.order] = np.arange(len(self.order))
+        self.changePersistentIndexList(previous, [
+            self.index(int(view_rows[position]), index.column()) for position, index in zip(positions, previous)
+        ])
+        self.layoutChanged.emit()
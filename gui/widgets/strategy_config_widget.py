@@ -1,6 +1,13 @@
 from PyQt5.QtWidgets import QWidget, QHBoxLayout, QLabel, QLineEdit, QComboBox, QGroupBox
 from PyQt5.QtGui import QDoubleValidator, QIntValidator
 
+# Stake allocation choices shown to the user -> `allocate_stakes` method
+ALLOCATION_METHODS = {
+    "Mean-Variance": "mean_variance",
+    "Kelly": "kelly",
+    "Simultaneous Kelly": "simultaneous_kelly"
+}
+
 
 class StrategyConfigWidget(QGroupBox):
     """Widget for configuring the betting strategy."""
@@ -49,6 +56,17 @@ class StrategyConfigWidget(QGroupBox):
         config_layout.addWidget(folds_label)
         config_layout.addWidget(self.folds_input)
 
+        # Stake Allocation Method
+        allocation_label = QLabel("Stake Allocation:")
+        self.allocation_combo = QComboBox()
+        self.allocation_combo.addItems(list(ALLOCATION_METHODS))
+        self.allocation_combo.setToolTip(
+            "Mean-variance optimization, Kelly fractions per combination, "
+            "or Kelly growth optimized over all combinations together."
+        )
+        config_layout.addWidget(allocation_label)
+        config_layout.addWidget(self.allocation_combo)
+
         self.setLayout(config_layout)
         self.on_strategy_type_changed(self.strategy_type_combo.currentText())
 
@@ -67,6 +85,9 @@ class StrategyConfigWidget(QGroupBox):
     def get_risk_preference(self) -> str:
         return self.risk_combo.currentText()
 
+    def get_allocation_method(self) -> str:
+        return ALLOCATION_METHODS[self.allocation_combo.currentText()]
+
     def get_folds(self) -> int:
         if self.folds_input.isEnabled():
             return int(self.folds_input.text().strip())
@@ -89,3 +110,4 @@ class StrategyConfigWidget(QGroupBox):
         self.risk_combo.setCurrentIndex(1)
         self.folds_input.setText("4")
         self.folds_input.setEnabled(False)
+        self.allocation_combo.setCurrentIndex(0)
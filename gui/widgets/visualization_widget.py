@@ -1,11 +1,121 @@
 # visualization_widget.py
 
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QComboBox, QLabel
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QComboBox, QLabel, QStackedWidget
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.backends.backend_qt5 import NavigationToolbar2QT as NavigationToolbar  # Added for toolbar
 from matplotlib.figure import Figure
-import matplotlib.pyplot as plt
 import numpy as np
+from scipy.spatial import cKDTree
+from utils.frontier_utils import DEFAULT_RISK_AVERSIONS, efficient_frontier, portfolio_point
+from utils.stake_allocation_utils import get_risk_aversion
+from utils.exact_distribution import exact_pnl_distribution
+from utils.monte_carlo import CONFIDENCE_LEVEL, simulate_strategy
+from utils.plot_utils import decimate_line, largest_slices
+
+# Scatter charts with more points are drawn as hexagonal density plots
+SCATTER_LIMIT = 5000
+HEXBIN_GRIDSIZE = 60
+
+# Most points drawn for a line chart (see `decimate_line`)
+LINE_POINTS = 4000
+
+# Largest stakes shown as their own pie slice; the rest are grouped as "Other"
+PIE_SLICES = 12
+
+# Distance (pixels) within which hovering shows a point's annotation
+HOVER_RADIUS = 10
+
+# Covariance model of the frontier for strategies not allocated in this session (as the GUI allocates)
+DEFAULT_COVARIANCE = "shared_legs"
+
+
+class HoverIndex:
+    """Nearest-point lookup and annotation for hovering over a chart with many points.
+
+    The points are indexed in a KD-tree in display coordinates, rebuilt only
+    when the view limits or the axes size change (zoom, pan, resize). The
+    annotation is animated, so it is drawn by blitting rather than by full
+    redraws.
+    """
+
+    def __init__(self, ax, x, y, label):
+        self.ax = ax
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.label = label
+        self.shown = None
+        self._tree = None
+        self._view = None
+        self.annot = ax.annotate("", xy=(0, 0), xytext=(20, 20), textcoords="offset points",
+                                 bbox=dict(boxstyle="round", fc="lightyellow", alpha=0.9),
+                                 arrowprops=dict(arrowstyle="->"), animated=True)
+        self.annot.set_visible(False)
+
+    def find(self, event):
+        """Index of the point under the mouse, or None."""
+        view = (tuple(self.ax.viewLim.bounds), tuple(self.ax.bbox.bounds))
+        if view != self._view:
+            self._tree = cKDTree(self.ax.transData.transform(np.column_stack([self.x, self.y])))
+            self._view = view
+        distance, index = self._tree.query((event.x, event.y), distance_upper_bound=HOVER_RADIUS)
+        return None if np.isinf(distance) else int(index)
+
+    def show(self, index):
+        self.annot.xy = (self.x[index], self.y[index])
+        self.annot.set_text(self.label(index))
+        self.annot.set_visible(True)
+        self.ax.draw_artist(self.annot)
+
+
+class ChartPage(QWidget):
+    """Figure, canvas and toolbar of one chart type.
+
+    The rendering is kept while the page is hidden; `version` records the
+    strategy version it shows, so switching back to an up-to-date chart does
+    not redraw it. The hover handlers are connected once, here.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.version = None
+        self.hover = None
+        self.background = None
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.figure = Figure()
+        self.canvas = FigureCanvas(self.figure)
+        layout.addWidget(self.canvas)
+        self.toolbar = NavigationToolbar(self.canvas, self)
+        layout.addWidget(self.toolbar)
+        self.setLayout(layout)
+
+        self.canvas.mpl_connect("draw_event", self.on_draw)
+        self.canvas.mpl_connect("motion_notify_event", self.on_hover)
+
+    def clear(self):
+        self.figure.clear()
+        self.hover = None
+        self.background = None
+
+    def on_draw(self, event):
+        # Every full draw (zoom, resize, redraw) leaves the chart without the animated annotation
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        if self.hover is not None:
+            self.hover.shown = None
+
+    def on_hover(self, event):
+        hover = self.hover
+        if hover is None or self.background is None:
+            return
+        index = hover.find(event) if event.inaxes is hover.ax else None
+        if index == hover.shown:
+            return
+        hover.shown = index
+        self.canvas.restore_region(self.background)
+        if index is not None:
+            hover.show(index)
+        self.canvas.blit(self.figure.bbox)
 
 
 class VisualizationWidget(QWidget):
@@ -14,6 +124,18 @@ class VisualizationWidget(QWidget):
     def __init__(self, strategy=None):
         super().__init__()
         self.strategy = strategy
+        # Incremented whenever the strategy is set, so cached charts know they are stale
+        self.version = 0
+        self.charts = {
+            "Odds Distribution": self.plot_odds_distribution,
+            "Expected Value Distribution": self.plot_ev_distribution,
+            "Risk-Return Plot": self.plot_risk_return,
+            "Stake Allocation": self.plot_stake_allocation,
+            "Cumulative Return": self.plot_cumulative_return,
+            "Probability vs. Odds": self.plot_probability_vs_odds,
+            "Efficient Frontier": self.plot_efficient_frontier,
+            "P&L Distribution": self.plot_pnl_distribution,
+        }
         self.init_ui()
 
     def init_ui(self):
@@ -21,170 +143,174 @@ class VisualizationWidget(QWidget):
 
         # Dropdown to select visualization type
         self.chart_selector = QComboBox()
-        self.chart_selector.addItems([
-            "Odds Distribution",
-            "Expected Value Distribution",
-            "Risk-Return Plot",
-            "Stake Allocation",
-            "Cumulative Return",
-            "Probability vs. Odds"
-        ])
+        self.chart_selector.addItems(list(self.charts))
         self.chart_selector.currentIndexChanged.connect(self.update_plot)
         layout.addWidget(QLabel("Select Chart Type:"))
         layout.addWidget(self.chart_selector)
 
-        # Matplotlib Figure and Canvas
-        self.figure = Figure()
-        self.canvas = FigureCanvas(self.figure)
-        layout.addWidget(self.canvas)
-
-        # Add navigation toolbar
-        self.toolbar = NavigationToolbar(self.canvas, self)
-        layout.addWidget(self.toolbar)
+        # One Matplotlib figure, canvas and toolbar per chart type
+        self.pages = QStackedWidget()
+        for _ in self.charts:
+            self.pages.addWidget(ChartPage())
+        layout.addWidget(self.pages)
 
         self.setLayout(layout)
 
     def set_strategy(self, strategy):
         self.strategy = strategy
+        self.version += 1
         self.update_plot()
 
     def update_plot(self):
-        if not self.strategy or not self.strategy.combinations:
-            self.figure.clear()
-            self.canvas.draw()
+        """Show the selected chart, drawing it only if the strategy changed since it was drawn."""
+        index = self.chart_selector.currentIndex()
+        self.pages.setCurrentIndex(index)
+        page = self.pages.widget(index)
+        if page.version == self.version:
             return
+        page.version = self.version
+        page.clear()
+        if self.strategy and len(self.strategy.combinations):
+            page.hover = self.charts[self.chart_selector.currentText()](page.figure)
+        page.canvas.draw()
 
-        chart_type = self.chart_selector.currentText()
-        self.figure.clear()
+    @staticmethod
+    def plot_histogram(ax, values, bins, weights=None, **style):
+        """Bin the values with NumPy and draw the histogram as a single artist."""
+        counts, edges = np.histogram(values, bins=bins, weights=weights)
+        ax.stairs(counts, edges, fill=True, **style)
+        ax.stairs(counts, edges, color='black', linewidth=0.8)
 
-        if chart_type == "Odds Distribution":
-            self.plot_odds_distribution()
-        elif chart_type == "Expected Value Distribution":
-            self.plot_ev_distribution()
-        elif chart_type == "Risk-Return Plot":
-            self.plot_risk_return()
-        elif chart_type == "Stake Allocation":
-            self.plot_stake_allocation()
-        elif chart_type == "Cumulative Return":
-            self.plot_cumulative_return()
-        elif chart_type == "Probability vs. Odds":
-            self.plot_probability_vs_odds()
-
-        self.canvas.draw()
-
-    def plot_odds_distribution(self):
-        odds = [combo.combined_odds for combo in self.strategy.combinations]
-        ax = self.figure.add_subplot(111)
-        ax.hist(odds, bins=20, color='skyblue', edgecolor='black')
+    def plot_odds_distribution(self, figure):
+        odds = self.strategy.combinations.combined_odds
+        ax = figure.add_subplot(111)
+        self.plot_histogram(ax, odds, bins=20, color='skyblue')
         ax.set_title('Odds Distribution')
         ax.set_xlabel('Combined Odds')
         ax.set_ylabel('Frequency')
 
-    def plot_ev_distribution(self):
-        evs = [combo.ev_per_dollar for combo in self.strategy.combinations]
-        ax = self.figure.add_subplot(111)
-        ax.hist(evs, bins=20, color='lightgreen', edgecolor='black')
+    def plot_ev_distribution(self, figure):
+        evs = self.strategy.combinations.ev_per_dollar
+        ax = figure.add_subplot(111)
+        self.plot_histogram(ax, evs, bins=20, color='lightgreen')
         ax.set_title('Expected Value Distribution')
         ax.set_xlabel('Expected Value per Dollar')
         ax.set_ylabel('Frequency')
 
-    def plot_risk_return(self):
-        returns = [combo.ev_per_dollar for combo in self.strategy.combinations]
-        risks = [np.sqrt(combo.combined_prob * (1 - combo.combined_prob)) for combo in self.strategy.combinations]
-        ax = self.figure.add_subplot(111)
-        sc = ax.scatter(risks, returns, c=returns, cmap='coolwarm')
+    def plot_points(self, figure, ax, x, y, colors=None, cmap=None, color=None, label=None):
+        """Scatter the points, or draw their density when there are more than `SCATTER_LIMIT`.
+
+        Densities are colored by the mean of `colors` in each cell (by the
+        count without `colors`). Returns the mappable, for a colorbar.
+        """
+        if len(x) <= SCATTER_LIMIT:
+            return ax.scatter(x, y, c=colors if colors is not None else color, cmap=cmap)
+        mappable = ax.hexbin(x, y, C=colors, reduce_C_function=np.mean, gridsize=HEXBIN_GRIDSIZE,
+                             mincnt=1, cmap=cmap or 'Purples')
+        if colors is None:
+            figure.colorbar(mappable, ax=ax, label='Combinations')
+        return mappable
+
+    def plot_risk_return(self, figure):
+        returns = self.strategy.combinations.ev_per_dollar
+        probs = self.strategy.combinations.combined_prob
+        risks = np.sqrt(probs * (1 - probs))
+        ax = figure.add_subplot(111)
+        sc = self.plot_points(figure, ax, risks, returns, colors=returns, cmap='coolwarm')
         ax.set_title('Risk-Return Plot')
         ax.set_xlabel('Risk (Standard Deviation)')
         ax.set_ylabel('Expected Return')
-        cbar = self.figure.colorbar(sc, ax=ax, label='Expected Return')
-
-        # Annotate function for hover tooltips
-        annot = ax.annotate("", xy=(0,0), xytext=(20,20), textcoords="offset points",
-                            bbox=dict(boxstyle="round", fc="w"),
-                            arrowprops=dict(arrowstyle="->"))
-        annot.set_visible(False)
-
-        def update_annot(ind):
-            index = ind["ind"][0]
-            annot.xy = (risks[index], returns[index])
-            text = f"Risk: {risks[index]:.4f}\nReturn: {returns[index]:.4f}"
-            annot.set_text(text)
-            annot.get_bbox_patch().set_facecolor('lightyellow')
-            annot.get_bbox_patch().set_alpha(0.9)
-
-        def on_hover(event):
-            vis = annot.get_visible()
-            if event.inaxes == ax:
-                cont, ind = sc.contains(event)
-                if cont:
-                    update_annot(ind)
-                    annot.set_visible(True)
-                    self.canvas.draw_idle()
-                else:
-                    if vis:
-                        annot.set_visible(False)
-                        self.canvas.draw_idle()
-
-        self.canvas.mpl_connect("motion_notify_event", on_hover)
-
-    def plot_stake_allocation(self):
-        allocations = self.strategy.stake_allocation
-        labels = [', '.join(bet.name for bet in combo.bets) for combo in self.strategy.combinations]
-        # Only plot combinations with non-zero allocations
-        allocations_labels = [(alloc, label) for alloc, label in zip(allocations, labels) if alloc > 0]
-        if not allocations_labels:
-            ax = self.figure.add_subplot(111)
+        figure.colorbar(sc, ax=ax, label='Expected Return')
+
+        return HoverIndex(ax, risks, returns,
+                          lambda index: f"Risk: {risks[index]:.4f}\nReturn: {returns[index]:.4f}")
+
+    def plot_stake_allocation(self, figure):
+        combinations = self.strategy.combinations
+        allocations = np.asarray(self.strategy.stake_allocation, dtype=np.float64)
+        # Only plot combinations with non-zero allocations, the smallest grouped into one slice
+        rows, other = largest_slices(allocations, PIE_SLICES)
+        ax = figure.add_subplot(111)
+        if not len(rows):
             ax.text(0.5, 0.5, 'No stake allocations to display.', ha='center', va='center')
             return
-        allocations, labels = zip(*allocations_labels)
-        ax = self.figure.add_subplot(111)
-        ax.pie(allocations, labels=labels, autopct='%1.1f%%', startangle=140)
+        sizes = list(allocations[rows])
+        labels = [combinations.bet_names(index) for index in rows]
+        if other > 0:
+            sizes.append(other)
+            labels.append(f'Other ({np.count_nonzero(allocations > 0) - len(rows)} combinations)')
+        ax.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=140)
         ax.set_title('Stake Allocation')
         ax.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle.
 
-    def plot_cumulative_return(self):
-        returns = [combo.ev_per_dollar for combo in self.strategy.combinations]
-        cumulative_returns = np.cumsum(returns)
-        ax = self.figure.add_subplot(111)
-        ax.plot(cumulative_returns)
+    def plot_cumulative_return(self, figure):
+        returns = self.strategy.combinations.ev_per_dollar
+        indices, cumulative_returns = decimate_line(np.cumsum(returns), LINE_POINTS)
+        ax = figure.add_subplot(111)
+        ax.plot(indices, cumulative_returns)
         ax.set_title('Cumulative Return')
         ax.set_xlabel('Combination Index')
         ax.set_ylabel('Cumulative Expected Return')
 
-    def plot_probability_vs_odds(self):
-        probs = [combo.combined_prob for combo in self.strategy.combinations]
-        odds = [combo.combined_odds for combo in self.strategy.combinations]
-        ax = self.figure.add_subplot(111)
-        sc = ax.scatter(probs, odds, color='purple')
+    def plot_probability_vs_odds(self, figure):
+        probs = self.strategy.combinations.combined_prob
+        odds = self.strategy.combinations.combined_odds
+        ax = figure.add_subplot(111)
+        self.plot_points(figure, ax, probs, odds, color='purple')
         ax.set_title('Combined Probability vs. Combined Odds')
         ax.set_xlabel('Combined Probability')
         ax.set_ylabel('Combined Odds')
 
-        # Annotate function for hover tooltips
-        annot = ax.annotate("", xy=(0,0), xytext=(20,20), textcoords="offset points",
-                            bbox=dict(boxstyle="round", fc="w"),
-                            arrowprops=dict(arrowstyle="->"))
-        annot.set_visible(False)
-
-        def update_annot(ind):
-            index = ind["ind"][0]
-            annot.xy = (probs[index], odds[index])
-            text = f"Probability: {probs[index]:.4f}\nOdds: {odds[index]:.2f}"
-            annot.set_text(text)
-            annot.get_bbox_patch().set_facecolor('lightyellow')
-            annot.get_bbox_patch().set_alpha(0.9)
-
-        def on_hover(event):
-            vis = annot.get_visible()
-            if event.inaxes == ax:
-                cont, ind = sc.contains(event)
-                if cont:
-                    update_annot(ind)
-                    annot.set_visible(True)
-                    self.canvas.draw_idle()
-                else:
-                    if vis:
-                        annot.set_visible(False)
-                        self.canvas.draw_idle()
-
-        self.canvas.mpl_connect("motion_notify_event", on_hover)
+        return HoverIndex(ax, probs, odds,
+                          lambda index: f"Probability: {probs[index]:.4f}\nOdds: {odds[index]:.2f}")
+
+    def plot_efficient_frontier(self, figure):
+        # Same covariance model as the allocation, and its risk aversion on the curve,
+        # so that a mean-variance allocation is drawn on the frontier
+        covariance = self.strategy.covariance or DEFAULT_COVARIANCE
+        risk_aversion = get_risk_aversion(self.strategy.risk_preference)
+        frontier = efficient_frontier(
+            self.strategy.combinations, np.union1d(DEFAULT_RISK_AVERSIONS, [risk_aversion]),
+            budgets=[self.strategy.total_budget], covariance=covariance
+        )
+        risks = frontier.standard_deviations[0]
+        profits = frontier.expected_profits[0]
+        profit, risk = portfolio_point(self.strategy.combinations, self.strategy.stake_allocation, covariance)
+        ax = figure.add_subplot(111)
+        ax.plot(risks, profits, marker='.', color='steelblue')
+        ax.scatter([risk], [profit], color='red', zorder=3,
+                   label=f'Current allocation ({self.strategy.risk_preference}, risk aversion {risk_aversion:.2f})')
+        ax.set_title('Efficient Frontier')
+        ax.set_xlabel('Risk (Standard Deviation)')
+        ax.set_ylabel('Expected Profit')
+        ax.legend()
+
+    def plot_pnl_distribution(self, figure):
+        # Exact distribution when the slate is small enough, simulated otherwise
+        combinations = self.strategy.combinations
+        stakes = self.strategy.stake_allocation
+        ax = figure.add_subplot(111)
+        try:
+            distribution = exact_pnl_distribution(combinations, stakes)
+            self.plot_histogram(ax, distribution.values, bins=50, weights=distribution.probabilities,
+                                color='slategray')
+            mean = distribution.mean
+            value_at_risk = distribution.value_at_risk(CONFIDENCE_LEVEL)
+            probability_of_loss = distribution.probability_of_loss
+            title = f'Exact P&L (P(loss) = {probability_of_loss:.1%})'
+            ax.set_ylabel('Probability')
+        except ValueError:
+            # Fixed seed so the chart does not change between redraws
+            result = simulate_strategy(combinations, stakes, seed=0, keep_samples=True)
+            self.plot_histogram(ax, result.pnl, bins=50, color='slategray')
+            mean = result.mean
+            value_at_risk = result.value_at_risk
+            probability_of_loss = result.probability_of_loss
+            title = f'Simulated P&L ({result.trials:,} trials, P(loss) = {probability_of_loss:.1%})'
+            ax.set_ylabel('Frequency')
+        ax.axvline(-value_at_risk, color='red', linestyle='--',
+                   label=f'VaR {CONFIDENCE_LEVEL:.0%}: {value_at_risk:.2f}')
+        ax.axvline(mean, color='green', label=f'Mean: {mean:.2f}')
+        ax.set_title(title)
+        ax.set_xlabel('Profit / Loss')
+        ax.legend()
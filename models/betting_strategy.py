@@ -1,6 +1,58 @@
+import heapq
 from dataclasses import dataclass, field
-from typing import List
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
 from .combination import Combination
+from .combination_set import CombinationSet
+
+# Thresholds used to filter combinations for each risk preference
+RISK_THRESHOLDS = {
+    "Conservative": {"min_ev": 0.05, "max_combined_odds": 5},
+    "Moderate": {"min_ev": 0.0, "max_combined_odds": 15},
+    "Aggressive": {"min_ev": -0.05, "max_combined_odds": None},
+}
+
+# Maximum number of combinations kept after filtering
+MAX_COMBINATIONS = 500
+
+
+def get_risk_thresholds(risk_preference: str) -> dict:
+    """Return the filtering thresholds for a risk preference (Moderate by default)."""
+    return RISK_THRESHOLDS.get(risk_preference, RISK_THRESHOLDS["Moderate"])
+
+
+def passes_thresholds(combo: Combination, thresholds: dict) -> bool:
+    """Check a combination against the expected value and combined odds thresholds."""
+    return combo.ev_per_dollar >= thresholds["min_ev"] and (
+        thresholds["max_combined_odds"] is None or combo.combined_odds <= thresholds["max_combined_odds"]
+    )
+
+
+def select_top_combinations(combinations: Iterable[Combination], thresholds: dict, limit: int,
+                            heap: list = None) -> List[Combination]:
+    """Return the best `limit` combinations passing the thresholds, sorted by EV per dollar.
+
+    Combinations stream through a bounded min-heap, so memory stays O(limit)
+    and the cost is O(N log limit). Equal EVs are ordered by size then leg
+    positions (the itertools.combinations order), falling back to arrival
+    order for combinations without legs. A `heap` list passed in is filled in
+    place, so the iterable can look at the best entries so far (the
+    combination is the last item of each entry) whenever it yields.
+    """
+    heap = [] if heap is None else heap
+    for sequence, combo in enumerate(combinations):
+        if not passes_thresholds(combo, thresholds):
+            continue
+        # The root is the first entry to drop out: lowest EV, then last in order
+        # (the legs are negated element-wise so that larger means earlier)
+        entry = (combo.ev_per_dollar, (-len(combo.legs),) + tuple(-leg for leg in combo.legs), -sequence, combo)
+        if len(heap) < limit:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+
+    heap.sort(reverse=True)
+    return [entry[-1] for entry in heap]
 
 
 @dataclass
@@ -10,37 +62,90 @@ class BettingStrategy:
     strategy_type: str  # "Accumulator", "Parlay", "System"
     folds: int  # Number of legs per combination (None for System)
     risk_preference: str  # "Conservative", "Moderate", "Aggressive"
-    combinations: List[Combination] = field(default_factory=list)
-    stake_allocation: List[float] = field(default_factory=list)
-
-    def filter_and_sort_combinations(self):
-        """Filter and sort combinations based on risk preference."""
-        # Define risk thresholds
-        risk_thresholds = {
-            "Conservative": {"min_ev": 0.05, "max_combined_odds": 5},
-            "Moderate": {"min_ev": 0.0, "max_combined_odds": 15},
-            "Aggressive": {"min_ev": -0.05, "max_combined_odds": None},
-        }
-
-        thresholds = risk_thresholds.get(self.risk_preference, risk_thresholds["Moderate"])
-
-        # Filter combinations based on expected value and combined odds
-        filtered_combinations = [
-            combo for combo in self.combinations
-            if combo.ev_per_dollar >= thresholds["min_ev"] and
-            (thresholds["max_combined_odds"] is None or combo.combined_odds <= thresholds["max_combined_odds"])
-        ]
-
-        # Sort combinations
-        filtered_combinations.sort(key=lambda combo: combo.ev_per_dollar, reverse=True)
-
-        # Limit the number of combinations
-        K = 500
-        self.combinations = filtered_combinations[:K]
+    combinations: CombinationSet = field(default_factory=CombinationSet.empty)
+    stake_allocation: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    # Unfiltered set `combinations` was selected from, and the rows selected
+    candidates: Optional[CombinationSet] = field(default=None, repr=False)
+    candidate_rows: Optional[np.ndarray] = field(default=None, repr=False)
+    # Covariance model of the last mean-variance allocation (None if not allocated in this session)
+    covariance: Optional[str] = None
+
+    def __post_init__(self):
+        if not isinstance(self.combinations, CombinationSet):
+            self.combinations = CombinationSet.from_combinations(self.combinations)
+        if len(self.stake_allocation):
+            self.set_stake_allocation(self.stake_allocation)
+        else:
+            self.stake_allocation = self.combinations.stake_allocation
+        self._selection = None
+
+    def set_stake_allocation(self, stakes):
+        """Store the stakes in the combinations' stake column and expose it as `stake_allocation`."""
+        self.combinations.stake_allocation = np.asarray(stakes, dtype=np.float64).copy()
+        self.stake_allocation = self.combinations.stake_allocation
+
+    def candidate_pool(self) -> CombinationSet:
+        """The unfiltered set the current combinations were selected from.
+
+        The stakes and Kelly fractions of the selected rows are copied back to
+        the pool (other rows get zero). When the combinations were replaced
+        since the last filtering, they are their own pool.
+        """
+        if self.candidates is None or self._selection is not self.combinations:
+            return self.combinations
+        pool, rows = self.candidates, self.candidate_rows
+        for name in ("stake_allocation", "kelly_fraction"):
+            column = np.zeros(len(pool))
+            column[rows] = getattr(self.combinations, name)
+            setattr(pool, name, column)
+        return pool
+
+    def filter_and_sort_combinations(self, combinations: Iterable[Combination] = None):
+        """Filter and sort combinations based on risk preference.
+
+        A `CombinationSet` (default: the candidate pool of the current
+        combinations) is filtered and ranked on its columns, and kept as the
+        candidate pool, so later filterings can bring back rows dropped by
+        this one. Any other iterable, such as a generator, is consumed in one
+        pass, so only the best `MAX_COMBINATIONS` are ever held in memory.
+        """
+        if combinations is None:
+            combinations = self.candidate_pool()
+        thresholds = get_risk_thresholds(self.risk_preference)
+        if isinstance(combinations, CombinationSet):
+            self.candidate_rows = combinations.top_rows(thresholds, MAX_COMBINATIONS)
+            self.candidates = combinations
+            self.combinations = combinations.take(self.candidate_rows)
+        else:
+            self.candidates = self.candidate_rows = None
+            self.combinations = CombinationSet.from_combinations(
+                select_top_combinations(combinations, thresholds, MAX_COMBINATIONS)
+            )
+        self._selection = self.combinations
+        self.stake_allocation = self.combinations.stake_allocation
+
+    def rescore_bet(self, leg: int, odds: float = None, confidence: float = None) -> np.ndarray:
+        """Update one bet and repair the filtered ranking.
+
+        Only the candidate pool rows containing the bet are re-scored; the
+        risk thresholds and top-K are then re-applied to the whole pool,
+        keeping the stakes of the rows that stay. Rows dropped by an earlier
+        update come back once their scores qualify again (restoring the
+        original odds restores the original selection). Subsets that were
+        never in the pool, such as those a System enumeration discarded while
+        generating, need a full re-run. Returns the re-scored pool rows.
+        """
+        return self.rescore_bets({leg: (odds, confidence)})
+
+    def rescore_bets(self, updates: Dict[int, Tuple[Optional[float], Optional[float]]]) -> np.ndarray:
+        """Apply several `leg -> (odds, confidence)` updates, then re-filter and re-rank once.
+
+        Same semantics as `rescore_bet`; returns the union of the re-scored rows.
+        """
+        pool = self.candidate_pool()
+        rows = [pool.update_bet(leg, odds, confidence) for leg, (odds, confidence) in updates.items()]
+        self.filter_and_sort_combinations(pool)
+        return np.unique(np.concatenate(rows)) if rows else np.zeros(0, dtype=np.intp)
 
     def get_unique_bets(self):
-        unique_bets = {}
-        for combo in self.combinations:
-            for bet in combo.bets:
-                unique_bets[bet.name] = bet
-        return unique_bets.values()
+        return self.combinations.used_bets()
@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import List
+from typing import List, Tuple
 from .bet import Bet
 
 
@@ -7,6 +7,7 @@ from .bet import Bet
 class Combination:
     """Represents a combination of bets."""
     bets: List[Bet]
+    legs: Tuple[int, ...] = ()  # Positions of the bets in the slate they were drawn from
     combined_odds: float = field(init=False)
     combined_prob: float = field(init=False)
     ev_per_dollar: float = field(init=False)
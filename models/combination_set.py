@@ -0,0 +1,257 @@
+from dataclasses import dataclass, field, replace
+from typing import Iterable, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from .bet import Bet
+from .combination import Combination
+
+# dtype of the leg-index matrix; unused trailing slots hold -1
+LEG_DTYPE = np.int16
+
+
+class CombinationView:
+    """Read-only view of one row of a `CombinationSet`, with the attributes of a `Combination`."""
+    __slots__ = ("_set", "_row")
+
+    def __init__(self, combination_set: "CombinationSet", row: int):
+        self._set = combination_set
+        self._row = row
+
+    @property
+    def legs(self) -> Tuple[int, ...]:
+        return self._set.leg_tuple(self._row)
+
+    @property
+    def bets(self) -> List[Bet]:
+        return [self._set.bets[i] for i in self.legs]
+
+    @property
+    def combined_odds(self) -> float:
+        return float(self._set.combined_odds[self._row])
+
+    @property
+    def combined_prob(self) -> float:
+        return float(self._set.combined_prob[self._row])
+
+    @property
+    def ev_per_dollar(self) -> float:
+        return float(self._set.ev_per_dollar[self._row])
+
+    @property
+    def stake_allocation(self) -> float:
+        return float(self._set.stake_allocation[self._row])
+
+    @property
+    def kelly_fraction(self) -> float:
+        return float(self._set.kelly_fraction[self._row])
+
+    def to_combination(self) -> Combination:
+        return Combination(self.bets, self.legs)
+
+
+@dataclass(eq=False)
+class CombinationSet:
+    """Struct-of-arrays container for combinations drawn from one table of bets.
+
+    Row i uses the bets `legs[i, :sizes[i]]` (indices into `bets`); the float
+    columns are contiguous float64 arrays. Iterating yields `CombinationView`s,
+    so code written against `List[Combination]` keeps working, while hot paths
+    read the columns directly.
+    """
+    bets: List[Bet]
+    legs: np.ndarray
+    combined_odds: np.ndarray = None
+    combined_prob: np.ndarray = None
+    ev_per_dollar: np.ndarray = None
+    stake_allocation: np.ndarray = None
+    kelly_fraction: np.ndarray = None
+    sizes: np.ndarray = field(init=False)
+    _leg_index: tuple = field(init=False, default=None, repr=False)
+    # Sparse covariance cached by `shared_leg_covariance`; reset when a bet is updated
+    shared_covariance: object = field(init=False, default=None, repr=False)
+
+    def __post_init__(self):
+        self.bets = list(self.bets)
+        self.legs = np.asarray(self.legs, dtype=LEG_DTYPE)
+        if self.legs.ndim != 2:
+            self.legs = self.legs.reshape(len(self.legs), -1)
+        self.sizes = (self.legs >= 0).sum(axis=1)
+        if self.combined_odds is None or self.combined_prob is None:
+            self.combined_odds, self.combined_prob = self._leg_products()
+        if self.ev_per_dollar is None:
+            self.ev_per_dollar = self.combined_prob * self.combined_odds - 1.0
+        if self.stake_allocation is None:
+            self.stake_allocation = np.zeros(len(self))
+        if self.kelly_fraction is None:
+            self.kelly_fraction = np.zeros(len(self))
+
+    def _leg_products(self, rows: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Multiply the leg odds and probabilities column by column, in leg order.
+
+        This matches `Combination.__post_init__` bit for bit (padding multiplies by 1.0).
+        """
+        legs = self.legs if rows is None else self.legs[rows]
+        odds = np.array([bet.odds for bet in self.bets] + [1.0], dtype=np.float64)
+        probs = np.array([bet.confidence for bet in self.bets] + [1.0], dtype=np.float64)
+        combined_odds = np.ones(len(legs))
+        combined_prob = np.ones(len(legs))
+        for column in legs.T:
+            # -1 (unused slot) picks the trailing 1.0
+            combined_odds = combined_odds * odds[column]
+            combined_prob = combined_prob * probs[column]
+        return combined_odds, combined_prob
+
+    @classmethod
+    def from_legs(cls, bets: Sequence[Bet], legs: Iterable[Tuple[int, ...]]) -> "CombinationSet":
+        """Build a set from leg-index tuples into `bets`."""
+        legs = list(legs)
+        width = max((len(row) for row in legs), default=0)
+        matrix = np.full((len(legs), width), -1, dtype=LEG_DTYPE)
+        for row, leg_tuple in enumerate(legs):
+            matrix[row, :len(leg_tuple)] = leg_tuple
+        return cls(list(bets), matrix)
+
+    @classmethod
+    def from_combinations(cls, combinations: Iterable[Combination], bets: Sequence[Bet] = None) -> "CombinationSet":
+        """Build a set from `Combination` objects.
+
+        Without `bets`, the bet table is rebuilt from the combinations: from
+        their slate positions when they all have legs, otherwise by
+        de-duplicating bets on (name, odds, confidence).
+        """
+        combinations = list(combinations)
+        if bets is not None:
+            return cls.from_legs(bets, [combo.legs for combo in combinations])
+
+        if combinations and all(combo.legs for combo in combinations):
+            slate = {}
+            for combo in combinations:
+                slate.update(zip(combo.legs, combo.bets))
+            positions = {position: index for index, position in enumerate(sorted(slate))}
+            table = [slate[position] for position in sorted(slate)]
+            legs = [tuple(positions[leg] for leg in combo.legs) for combo in combinations]
+        else:
+            keys = {}
+            table = []
+            legs = []
+            for combo in combinations:
+                row = []
+                for bet in combo.bets:
+                    key = (bet.name, bet.odds, bet.confidence)
+                    if key not in keys:
+                        keys[key] = len(table)
+                        table.append(bet)
+                    row.append(keys[key])
+                legs.append(tuple(row))
+        return cls.from_legs(table, legs)
+
+    @classmethod
+    def empty(cls, bets: Sequence[Bet] = ()) -> "CombinationSet":
+        return cls(list(bets), np.empty((0, 0), dtype=LEG_DTYPE))
+
+    def __len__(self) -> int:
+        return self.legs.shape[0]
+
+    def __iter__(self) -> Iterator[CombinationView]:
+        for row in range(len(self)):
+            yield CombinationView(self, row)
+
+    def __getitem__(self, row: int) -> CombinationView:
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("combination index out of range")
+        return CombinationView(self, row)
+
+    def leg_tuple(self, row: int) -> Tuple[int, ...]:
+        return tuple(self.legs[row, :self.sizes[row]].tolist())
+
+    def bet_names(self, row: int) -> str:
+        """Comma separated names of the bets in a row, as shown in the results table."""
+        return ", ".join(self.bets[i].name for i in self.leg_tuple(row))
+
+    def rows_with_leg(self, leg: int) -> np.ndarray:
+        """Rows containing bet `leg`, from a leg -> rows inverted index built on first use."""
+        if self._leg_index is None:
+            valid = self.legs >= 0
+            legs = self.legs[valid].astype(np.intp)
+            rows = np.nonzero(valid)[0]
+            order = np.argsort(legs, kind="stable")
+            offsets = np.concatenate(([0], np.cumsum(np.bincount(legs, minlength=len(self.bets)))))
+            self._leg_index = (offsets, rows[order])
+        offsets, rows = self._leg_index
+        return rows[offsets[leg]:offsets[leg + 1]]
+
+    def update_bet(self, leg: int, odds: float = None, confidence: float = None) -> np.ndarray:
+        """Change one bet's odds and/or confidence and re-score only the rows containing it.
+
+        Returns the affected rows. The bet is replaced, not mutated, since bet
+        objects may be shared with other sets.
+        """
+        changes = {}
+        if odds is not None:
+            changes["odds"] = odds
+        if confidence is not None:
+            changes["confidence"] = confidence
+        self.bets[leg] = replace(self.bets[leg], **changes)
+        self.shared_covariance = None
+
+        rows = self.rows_with_leg(leg)
+        combined_odds, combined_prob = self._leg_products(rows)
+        self.combined_odds[rows] = combined_odds
+        self.combined_prob[rows] = combined_prob
+        self.ev_per_dollar[rows] = combined_prob * combined_odds - 1.0
+        return rows
+
+    def take(self, rows) -> "CombinationSet":
+        """Return a new set holding the given rows (indices or boolean mask), in that order."""
+        rows = np.asarray(rows)
+        legs = self.legs[rows]
+        # Drop padding columns no longer used by any row
+        width = int((legs >= 0).sum(axis=1).max()) if len(legs) else 0
+        return CombinationSet(
+            self.bets, legs[:, :width],
+            self.combined_odds[rows], self.combined_prob[rows], self.ev_per_dollar[rows],
+            self.stake_allocation[rows], self.kelly_fraction[rows],
+        )
+
+    def threshold_mask(self, thresholds: dict) -> np.ndarray:
+        """Boolean mask of the rows passing the risk thresholds."""
+        mask = self.ev_per_dollar >= thresholds["min_ev"]
+        if thresholds["max_combined_odds"] is not None:
+            mask &= self.combined_odds <= thresholds["max_combined_odds"]
+        return mask
+
+    def rank_order(self, rows: np.ndarray = None) -> np.ndarray:
+        """Order `rows` (default: all) by EV descending, then size, then leg positions."""
+        if rows is None:
+            rows = np.arange(len(self))
+        legs = self.legs[rows]
+        # np.lexsort uses the last key as the primary one
+        keys = [legs[:, column] for column in range(legs.shape[1] - 1, -1, -1)]
+        keys += [self.sizes[rows], -self.ev_per_dollar[rows]]
+        return rows[np.lexsort(keys)]
+
+    def top_rows(self, thresholds: dict, limit: int) -> np.ndarray:
+        """Indices of the rows passing the thresholds, sorted by EV per dollar, limited to `limit`."""
+        return self.rank_order(np.flatnonzero(self.threshold_mask(thresholds)))[:limit]
+
+    def top(self, thresholds: dict, limit: int) -> "CombinationSet":
+        """Rows passing the thresholds, sorted by EV per dollar, limited to `limit`."""
+        return self.take(self.top_rows(thresholds, limit))
+
+    def used_bets(self) -> List[Bet]:
+        """Bets referenced by at least one row, in table order."""
+        used = np.unique(self.legs[self.legs >= 0])
+        return [self.bets[i] for i in used]
+
+    def to_combinations(self) -> List[Combination]:
+        return [view.to_combination() for view in self]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in (
+            self.legs, self.combined_odds, self.combined_prob, self.ev_per_dollar,
+            self.stake_allocation, self.kelly_fraction,
+        ))
@@ -0,0 +1,72 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.bet import Bet
+from models.betting_strategy import BettingStrategy
+from utils.allocation_cache import AllocationCache
+from utils.combination_utils import generate_combinations
+from utils.stake_allocation_utils import allocate_stakes
+
+
+def random_bets(count, rng):
+    return [
+        Bet(f"Bet {i + 1}", round(rng.uniform(1.1, 3.5), 2), rng.choice([0.5, 0.7, 0.9]))
+        for i in range(count)
+    ]
+
+
+def build_strategy(bets, args):
+    strategy = BettingStrategy(args.budget, "System", args.folds, args.risk_preference)
+    strategy.filter_and_sort_combinations(
+        generate_combinations(bets, "System", args.risk_preference, folds=args.folds, backend="auto")
+    )
+    return strategy
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay Process clicks on a slate, with occasional odds edits, with and without the allocation cache."
+    )
+    parser.add_argument('--bets', type=int, default=12, help="Slate size")
+    parser.add_argument('--runs', type=int, default=20, help="Number of Process clicks replayed")
+    parser.add_argument('--edit-every', type=int, default=4, help="Change one bet's odds every this many runs")
+    parser.add_argument('--risk-preference', type=str, default="Moderate")
+    parser.add_argument('--folds', type=int, default=None)
+    parser.add_argument('--budget', type=float, default=100.0)
+    parser.add_argument('--covariance', type=str, default="shared_legs", choices=["diagonal", "shared_legs"])
+    parser.add_argument('--seed', type=int, default=0)
+
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    bets = random_bets(args.bets, rng)
+    slates = []
+    for run in range(args.runs):
+        if run and run % args.edit_every == 0:
+            leg = rng.randrange(len(bets))
+            bets = list(bets)
+            bets[leg] = Bet(bets[leg].name, round(bets[leg].odds + rng.choice([-0.05, 0.05]), 2), bets[leg].confidence)
+        slates.append(bets)
+
+    for label, cache in (("cold", None), ("cached", AllocationCache())):
+        iterations = 0
+        elapsed = 0.0
+        for slate in slates:
+            strategy = build_strategy(slate, args)
+            start = time.perf_counter()
+            iterations += allocate_stakes(strategy, covariance=args.covariance, cache=cache)
+            elapsed += time.perf_counter() - start
+        print(f"{label:>7}: {iterations:>7} solver iterations, {elapsed:.3f}s allocating over {len(slates)} runs")
+        if cache is not None:
+            stats = cache.stats()
+            print(f"         hit rate {stats['hit_rate']:.0%} ({stats['hits']} hits, "
+                  f"{stats['near_hits']} warm starts, {stats['misses']} misses)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+from collections import deque
+from math import comb
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.bet import Bet
+from models.combination import Combination
+from utils.combination_utils import system_sizes
+from utils.prefix_enumeration import iter_prefix_products
+
+
+def enumerate_combinations(bets, sizes):
+    """Current approach: one Combination (full product over its legs) per subset."""
+    for r in sizes:
+        for legs in itertools.combinations(range(len(bets)), r):
+            yield Combination([bets[i] for i in legs], legs)
+
+
+def enumerate_prefix_products(bets, sizes):
+    """Prefix-product walk: the parent's running products are extended by one leg."""
+    for r in sizes:
+        yield from iter_prefix_products(bets, r)
+
+
+ENUMERATORS = {
+    "combination": enumerate_combinations,
+    "prefix": enumerate_prefix_products,
+}
+
+
+def random_bets(count, seed):
+    rng = random.Random(seed)
+    return [
+        Bet(f"Bet {i + 1}", round(rng.uniform(1.1, 3.5), 2), rng.choice([0.5, 0.7, 0.9]))
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark System combination enumeration backends.")
+    parser.add_argument('--min-bets', type=int, default=10, help="Smallest slate size")
+    parser.add_argument('--max-bets', type=int, default=25, help="Largest slate size")
+    parser.add_argument('--risk-preference', type=str, default="Conservative", help="Sets the smallest combination size")
+    parser.add_argument('--folds', type=int, default=None, help="Largest combination size (default: all legs)")
+    parser.add_argument('--max-seconds', type=float, default=60.0,
+                        help="Stop timing a backend on larger slates once one run exceeds this")
+    parser.add_argument('--seed', type=int, default=0)
+
+    args = parser.parse_args()
+
+    print(f"{'bets':>5} {'subsets':>12} " + " ".join(f"{name + ' (s)':>16} {'ns/subset':>10}" for name in ENUMERATORS))
+    slow = set()
+    for count in range(args.min_bets, args.max_bets + 1):
+        bets = random_bets(count, args.seed)
+        sizes = system_sizes(count, args.risk_preference, args.folds)
+        subsets = sum(comb(count, r) for r in sizes)
+        columns = []
+        for name, enumerate_subsets in ENUMERATORS.items():
+            if name in slow:
+                columns.append(f"{'skipped':>16} {'':>10}")
+                continue
+            start = time.perf_counter()
+            deque(enumerate_subsets(bets, sizes), maxlen=0)
+            elapsed = time.perf_counter() - start
+            columns.append(f"{elapsed:>16.3f} {elapsed / max(subsets, 1) * 1e9:>10.0f}")
+            if elapsed > args.max_seconds:
+                slow.add(name)
+        print(f"{count:>5} {subsets:>12} " + " ".join(columns))
+
+
+if __name__ == '__main__':
+    main()
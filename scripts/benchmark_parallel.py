@@ -0,0 +1,74 @@
+import argparse
+import heapq
+import os
+import random
+import sys
+import time
+from math import comb
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.bet import Bet
+from models.betting_strategy import MAX_COMBINATIONS, get_risk_thresholds
+from utils.combination_utils import system_sizes
+from utils.parallel_combinations import SHARD_STRATEGIES, SHARDS_PER_WORKER, build_shards, parallel_top_combinations
+
+
+def random_bets(count, seed):
+    rng = random.Random(seed)
+    return [
+        Bet(f"Bet {i + 1}", round(rng.uniform(1.1, 3.5), 2), rng.choice([0.5, 0.7, 0.9]))
+        for i in range(count)
+    ]
+
+
+def shard_subsets(num_bets, shard):
+    """Number of subsets in a `build_shards` shard."""
+    sizes, leading, ranks = shard
+    if ranks is not None:
+        return ranks[1] - ranks[0]
+    if leading is not None:
+        return sum(comb(num_bets - leading - 1, size - 1) for size in sizes)
+    return sum(comb(num_bets, size) for size in sizes)
+
+
+def speedup_bound(work, workers):
+    """Speed-up of handing out shards in order to the first free worker, if work were the only cost."""
+    finish = [0] * workers
+    for amount in work:
+        heapq.heappush(finish, heapq.heappop(finish) + amount)
+    return sum(work) / max(finish)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scaling of the parallel System enumeration.")
+    parser.add_argument('--bets', type=int, default=22, help="Slate size")
+    parser.add_argument('--risk-preference', type=str, default="Aggressive")
+    parser.add_argument('--workers', type=str, default="1,2,4,8,16,32", help="Comma separated worker counts")
+    parser.add_argument('--shard-by', type=str, default=",".join(SHARD_STRATEGIES),
+                        help="Comma separated shard strategies")
+    parser.add_argument('--seed', type=int, default=0)
+
+    args = parser.parse_args()
+    bets = random_bets(args.bets, args.seed)
+    sizes = system_sizes(len(bets), args.risk_preference)
+    thresholds = get_risk_thresholds(args.risk_preference)
+    worker_counts = [int(count) for count in args.workers.split(",")]
+    print(f"{len(bets)} bets, {sum(comb(len(bets), size) for size in sizes)} subsets, {os.cpu_count()} CPUs")
+
+    print(f"{'shard by':>9} {'workers':>8} {'shards':>7} {'largest':>9} {'bound':>7} {'time (s)':>9} {'speed-up':>9}")
+    for shard_by in args.shard_by.split(","):
+        baseline = None
+        for workers in worker_counts:
+            shards = build_shards(len(bets), sizes, shard_by, workers * SHARDS_PER_WORKER)
+            work = [shard_subsets(len(bets), shard) for shard in shards]
+            start = time.perf_counter()
+            parallel_top_combinations(bets, sizes, thresholds, MAX_COMBINATIONS, workers, shard_by)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{shard_by:>9} {workers:>8} {len(shards):>7} {max(work) / sum(work):>8.1%} "
+                  f"{speedup_bound(work, workers):>7.1f} {elapsed:>9.2f} {baseline / elapsed:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,34 @@
 import json
 import argparse
-from datetime import datetime
+import bisect
+import glob
+import hashlib
+import os
+import re
+import shutil
+import sys
+import tempfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+# Characters read from the input at a time in streaming mode
+READ_SIZE = 1 << 20
+
+# Fields shown in the report header; streaming writes the header as soon as all of them are known
+HEADER_FIELDS = ("total_budget", "total_stake", "total_potential_payout", "strategy_type", "date", "risk_preference")
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+NUMBER_CHARACTERS = re.compile(r"[0-9.eE+\-]*")
+
+# Upper edges of the EV-per-dollar buckets of the aggregate summary (the last bucket is open)
+EV_BINS = (-0.5, -0.25, -0.1, 0.0, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# Legs listed in the aggregate summary
+TOP_LEGS = 10
+
+# Files written to the output directory in batch mode, next to the reports
+MANIFEST_FILE = "manifest.json"
+SUMMARY_FILE = "summary.txt"
 
 
 def format_combination(combination):
@@ -19,11 +47,8 @@ def format_combination(combination):
     )
 
 
-def generate_report(json_file, output_file):
-    """Generate a report from the JSON file and save it to a text file."""
-    with open(json_file, 'r') as file:
-        data = json.load(file)
-
+def format_header(data):
+    """Format the report header from the top-level fields of a result file."""
     total_budget = data.get("total_budget", 0)
     total_stake = data.get("total_stake", 0)
     total_payout = data.get("total_potential_payout", 0)
@@ -31,8 +56,7 @@ def generate_report(json_file, output_file):
     date = data.get("date", "Unknown")
     risk_preference = data.get("risk_preference", "Moderate")
 
-    # Header
-    report = (
+    return (
         f"Betting Report\n"
         f"==============\n"
         f"Date: {date}\n"
@@ -44,31 +68,383 @@ def generate_report(json_file, output_file):
         f"-----------------------------------\n\n"
     )
 
-    # Format each combination
+
+def write_combinations(output, combinations, start=1):
+    """Write one block per combination with a stake greater than zero; returns the next block number."""
+    index = start
+    for combination in combinations:
+        if combination.get("stake_allocation", 0) > 0:
+            output.write(f"Combination {index}:\n{format_combination(combination)}\n")
+            index += 1
+    return index
+
+
+def new_summary():
+    """Aggregate figures over the staked combinations of one or more result files."""
+    return {
+        "files": 0,
+        "combinations": 0,
+        "total_stake": 0.0,
+        "total_potential_payout": 0.0,
+        "stake_weighted_ev": 0.0,
+        "ev_histogram": [0] * (len(EV_BINS) + 1),
+        "legs": {},
+    }
+
+
+def summarize(combinations, summary):
+    """Pass the combinations through, adding the staked ones to `summary`."""
+    legs = summary["legs"]
+    for combination in combinations:
+        stake = combination.get("stake_allocation", 0)
+        if stake > 0:
+            summary["combinations"] += 1
+            summary["total_stake"] += stake
+            summary["total_potential_payout"] += combination.get("potential_payout", combination["combined_odds"] * stake)
+            summary["stake_weighted_ev"] += stake * combination["ev_per_dollar"]
+            summary["ev_histogram"][bisect.bisect_left(EV_BINS, combination["ev_per_dollar"])] += 1
+            for bet in combination["bets"]:
+                legs[bet["name"]] = legs.get(bet["name"], 0) + 1
+        yield combination
+
+
+def merge_summaries(summaries):
+    total = new_summary()
+    legs = Counter()
+    for summary in summaries:
+        for key in ("files", "combinations", "total_stake", "total_potential_payout", "stake_weighted_ev"):
+            total[key] += summary[key]
+        total["ev_histogram"] = [a + b for a, b in zip(total["ev_histogram"], summary["ev_histogram"])]
+        legs.update(summary["legs"])
+    total["legs"] = dict(legs)
+    return total
+
+
+def format_summary(summary, top_legs=TOP_LEGS):
+    """Format the aggregate summary of a batch run."""
+    mean_ev = summary["stake_weighted_ev"] / summary["total_stake"] if summary["total_stake"] else 0.0
+    edges = ("-inf",) + tuple(f"{edge:.2f}" for edge in EV_BINS) + ("inf",)
+    histogram = "".join(
+        f"    ({low}, {high}]: {count}\n" for low, high, count in zip(edges, edges[1:], summary["ev_histogram"])
+    )
+    legs = Counter(summary["legs"]).most_common(top_legs)
+    legs_info = "".join(f"    {name}: {count}\n" for name, count in legs) or "    None\n"
+    return (
+        f"Aggregate Betting Report\n"
+        f"========================\n"
+        f"Files: {summary['files']}\n"
+        f"Staked Combinations: {summary['combinations']}\n"
+        f"Total Stake: {summary['total_stake']:.2f}\n"
+        f"Total Potential Payout: {summary['total_potential_payout']:.2f}\n"
+        f"Stake-Weighted Expected Value per Dollar: {mean_ev:.4f}\n"
+        f"-----------------------------------\n\n"
+        f"Expected Value per Dollar Distribution:\n{histogram}\n"
+        f"Most Used Legs:\n{legs_info}"
+    )
+
+
+def generate_report(json_file, output_file, summary=None):
+    """Generate a report from the JSON file and save it to a text file.
+
+    When a `summary` (see `new_summary`) is given, the staked combinations are added to it.
+    """
+    with open(json_file, 'r') as file:
+        data = json.load(file)
+
     combinations = data.get("combinations", [])
-    combinations_with_stake = [comb for comb in combinations if comb.get("stake_allocation", 0) > 0]
+    if summary is not None:
+        combinations = summarize(combinations, summary)
+    with open(output_file, 'w') as output:
+        output.write(format_header(data))
+        if write_combinations(output, combinations) == 1:
+            output.write("No combinations with stake allocation greater than zero.\n")
+
 
-    if not combinations_with_stake:
-        report += "No combinations with stake allocation greater than zero.\n"
+class JSONStream:
+    """Reads a JSON document from a file a chunk at a time.
+
+    Scalars and small containers are decoded with `JSONDecoder.raw_decode`
+    on the buffered text; `members` and `items` walk an object or array
+    without materializing it, so memory is bounded by the largest element.
+    """
+
+    def __init__(self, file, read_size=READ_SIZE):
+        self.file = file
+        self.read_size = read_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+
+    def fill(self):
+        """Read one more chunk, dropping the consumed text; returns False at end of file."""
+        chunk = self.file.read(self.read_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return True
+
+    def peek(self):
+        """Skip whitespace and return the next character ("" at end of file)."""
+        while True:
+            self.position = WHITESPACE.match(self.buffer, self.position).end()
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self.fill():
+                return ""
+
+    def expect(self, characters):
+        character = self.peek()
+        if not character or character not in characters:
+            raise ValueError(f"Expected one of {characters!r} at offset {self.position} of the buffered input")
+        self.position += 1
+        return character
+
+    def value(self):
+        """Decode the next complete value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # A number running to the end of the buffer (e.g. "1." of "1.5") may continue in the next chunk
+            if (isinstance(value, (int, float)) and not self.eof
+                    and NUMBER_CHARACTERS.match(self.buffer, end).end() == len(self.buffer) and self.fill()):
+                continue
+            self.position = end
+            return value
+
+    def members(self):
+        """Yield the keys of the next object; the caller consumes each member's value before resuming."""
+        self.expect("{")
+        if self.peek() == "}":
+            self.position += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.expect(",}") == "}":
+                return
+
+    def items(self):
+        """Yield the elements of the next array, decoding one at a time."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.position += 1
+            return
+        while True:
+            yield self.value()
+            if self.expect(",]") == "]":
+                return
+
+
+def generate_report_streaming(json_file, output_file, summary=None, read_size=READ_SIZE):
+    """Generate the same report as `generate_report`, parsing the combinations incrementally.
+
+    Each combination is decoded, formatted and written before the next one
+    is read, so memory stays flat and time is linear in the file size. The
+    header is written once its fields have been read; when the combinations
+    come first in the file, their blocks are spooled to a temporary file
+    and copied after the header.
+    """
+    with open(json_file, 'r') as file, open(output_file, 'w') as output:
+        stream = JSONStream(file, read_size)
+        header = {}
+        spool = None
+        header_written = False
+        next_index = 1
+        for key in stream.members():
+            if key != "combinations":
+                header[key] = stream.value()
+                continue
+            if spool is None and next_index == 1 and all(field in header for field in HEADER_FIELDS):
+                output.write(format_header(header))
+                header_written = True
+                target = output
+            else:
+                spool = spool or tempfile.TemporaryFile('w+')
+                target = spool
+            combinations = stream.items()
+            if summary is not None:
+                combinations = summarize(combinations, summary)
+            next_index = write_combinations(target, combinations, next_index)
+        if stream.peek():
+            raise ValueError("Extra data after the JSON document")
+
+        if not header_written:
+            output.write(format_header(header))
+        if next_index == 1:
+            output.write("No combinations with stake allocation greater than zero.\n")
+        elif spool is not None:
+            spool.seek(0)
+            shutil.copyfileobj(spool, output)
+            spool.close()
+
+
+def file_hash(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(READ_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def batch_inputs(pattern, output_dir=None):
+    """Result files of a directory (its *.json files) or a glob pattern, sorted.
+
+    Files written by the batch are skipped: the manifest and summary of
+    `output_dir`, and anything below `output_dir` when it is a separate
+    directory inside the inputs (e.g. `results/**/*.json` into `results/reports`).
+    """
+    if os.path.isdir(pattern):
+        root, pattern = pattern, os.path.join(pattern, "*.json")
     else:
-        for idx, combination in enumerate(combinations_with_stake, start=1):
-            report += f"Combination {idx}:\n{format_combination(combination)}\n"
+        root = pattern[:len(pattern) - len(pattern.lstrip("/"))]
+        for part in pattern.lstrip("/").split("/"):
+            if glob.has_magic(part):
+                break
+            root = os.path.join(root, part)
+        else:
+            root = os.path.dirname(pattern)  # A single file
+    paths = [path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path)]
+    if output_dir is not None:
+        output_dir = os.path.abspath(output_dir)
+        written = {os.path.join(output_dir, MANIFEST_FILE), os.path.join(output_dir, SUMMARY_FILE)}
+        nested = output_dir != os.path.abspath(root or ".")
+        paths = [
+            path for path in paths
+            if os.path.abspath(path) not in written
+            and not (nested and os.path.commonpath([os.path.abspath(path), output_dir]) == output_dir)
+        ]
+    return sorted(paths)
+
+
+def is_up_to_date(entry, path, report_path):
+    """Whether a manifest entry still describes `path` and its report exists.
+
+    The modification time and size are compared first; the content hash is
+    only computed when they changed (e.g. after a copy or a touch), and the
+    entry is refreshed in place when the content turns out to be the same.
+    """
+    if entry is None or not os.path.exists(report_path):
+        return False
+    stat = os.stat(path)
+    if entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+        return True
+    if entry["size"] != stat.st_size or entry["hash"] != file_hash(path):
+        return False
+    entry["mtime_ns"] = stat.st_mtime_ns
+    return True
+
+
+def process_file(task):
+    """Worker entry point: write one report; returns `(path, manifest entry or None, error or None)`."""
+    path, report_path, stream = task
+    try:
+        stat = os.stat(path)
+        summary = new_summary()
+        summary["files"] = 1
+        os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
+        if stream:
+            generate_report_streaming(path, report_path, summary)
+        else:
+            generate_report(path, report_path, summary)
+        entry = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "hash": file_hash(path),
+                 "report": report_path, "summary": summary}
+    except Exception as e:
+        # Do not leave a partial or stale report behind
+        if os.path.exists(report_path):
+            os.remove(report_path)
+        return path, None, f"{path}: {e}"
+    return path, entry, None
 
-    # Save to file
-    with open(output_file, 'w') as file:
-        file.write(report)
 
-    print(f"Report generated successfully: {output_file}")
+def generate_reports(pattern, output_dir, workers=1, stream=False, force=False):
+    """Write a report per result file, plus the aggregate summary, into `output_dir`.
+
+    Reports mirror the input layout below the inputs' common directory. The
+    manifest records each input's modification time, size, hash and summary,
+    so later runs only process new or changed files (all of them with
+    `force`) and still aggregate over every input. Returns
+    `(processed, up_to_date, errors)`.
+    """
+    paths = batch_inputs(pattern, output_dir)
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    try:
+        with open(manifest_path, 'r') as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        manifest = {}
+
+    base = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in paths]) if paths else ""
+    entries, tasks = {}, []
+    for path in paths:
+        key = os.path.abspath(path)
+        report_path = os.path.join(output_dir, os.path.splitext(os.path.relpath(key, base))[0] + ".txt")
+        entry = manifest.get(key)
+        if not force and is_up_to_date(entry, path, report_path):
+            entries[key] = entry
+        else:
+            tasks.append((path, report_path, stream))
+
+    up_to_date = len(entries)
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(process_file, tasks, chunksize=16))
+    else:
+        results = [process_file(task) for task in tasks]
+    errors = []
+    for path, entry, error in results:
+        if error:
+            errors.append(error)
+        else:
+            entries[os.path.abspath(path)] = entry
+
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, SUMMARY_FILE), 'w') as file:
+        file.write(format_summary(merge_summaries(entry["summary"] for entry in entries.values())))
+    # Inputs that disappeared are dropped; failed ones are retried on the next run
+    with open(manifest_path, 'w') as file:
+        json.dump(dict(sorted(entries.items())), file, indent=4)
+    return len(tasks) - len(errors), up_to_date, errors
 
 
 def main():
     parser = argparse.ArgumentParser(description="Generate a betting report from a JSON file.")
-    parser.add_argument('input_file', type=str, help="The input JSON file containing betting data")
-    parser.add_argument('output_file', type=str, help="The output text file for the betting report")
+    parser.add_argument('input_file', type=str,
+                        help="The input JSON file containing betting data (a directory or glob with --batch)")
+    parser.add_argument('output_file', type=str,
+                        help="The output text file for the betting report (the output directory with --batch)")
+    parser.add_argument('--stream', action='store_true',
+                        help="Parse the combinations incrementally (flat memory for very large result files)")
+    parser.add_argument('--batch', action='store_true',
+                        help="Report on every result file of a directory or glob, plus an aggregate summary")
+    parser.add_argument('--workers', type=int, default=1, help="Processes generating reports in batch mode")
+    parser.add_argument('--force', action='store_true', help="Regenerate reports that are up to date")
 
     args = parser.parse_args()
 
-    generate_report(args.input_file, args.output_file)
+    if args.batch:
+        processed, up_to_date, errors = generate_reports(
+            args.input_file, args.output_file, args.workers, args.stream, args.force
+        )
+        for error in errors:
+            print(error, file=sys.stderr)
+        print(f"Generated {processed} reports ({up_to_date} up to date, {len(errors)} failed) "
+              f"and {os.path.join(args.output_file, SUMMARY_FILE)}")
+        sys.exit(1 if errors else 0)
+
+    if args.stream:
+        generate_report_streaming(args.input_file, args.output_file)
+    else:
+        generate_report(args.input_file, args.output_file)
+    print(f"Report generated successfully: {args.output_file}")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,104 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import numpy as np
+
+
+def random_slate(rng, count):
+    return [
+        {"name": f"Bet {i + 1}", "odds": round(rng.uniform(1.1, 3.5), 2),
+         "confidence": rng.choice(["Not Confident", "Moderately Confident", "Super Confident"])}
+        for i in range(count)
+    ]
+
+
+async def open_connection(args):
+    if args.unix_socket:
+        return await asyncio.open_unix_connection(args.unix_socket)
+    return await asyncio.open_connection(args.host, args.port)
+
+
+async def request(reader, writer, method, path, payload=None):
+    """Send one keep-alive HTTP request and return `(status, decoded JSON body)`."""
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def client(args, payloads, latencies, failures):
+    reader, writer = await open_connection(args)
+    try:
+        while payloads:
+            payload = payloads.pop()
+            start = time.perf_counter()
+            status, _ = await request(reader, writer, "POST", "/strategy", payload)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                failures.append(status)
+    finally:
+        writer.close()
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    # A pool of distinct slates; requests draw from it, so repeats exercise the cache and coalescing
+    slates = [
+        {"bets": random_slate(rng, rng.randint(args.min_bets, args.max_bets)),
+         "risk_preference": rng.choice(["Conservative", "Moderate", "Aggressive"]),
+         "total_budget": 100.0}
+        for _ in range(args.distinct)
+    ]
+    payloads = [rng.choice(slates) for _ in range(args.requests)]
+    latencies, failures = [], []
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(args, payloads, latencies, failures) for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await open_connection(args)
+    _, stats = await request(reader, writer, "GET", "/stats")
+    writer.close()
+
+    latencies = np.array(latencies) * 1000.0
+    print(f"{len(latencies)} requests in {elapsed:.2f}s: {len(latencies) / elapsed:.1f} req/s "
+          f"({len(failures)} non-200 responses)")
+    print(f"latency ms: p50 {np.percentile(latencies, 50):.1f}  p90 {np.percentile(latencies, 90):.1f}  "
+          f"p99 {np.percentile(latencies, 99):.1f}  max {latencies.max():.1f}")
+    print(f"server: {stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test a local strategy service (service/server.py).")
+    parser.add_argument('--host', type=str, default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix-socket', type=str, default=None)
+    parser.add_argument('--requests', type=int, default=500, help="Total number of strategy requests")
+    parser.add_argument('--concurrency', type=int, default=16, help="Concurrent keep-alive connections")
+    parser.add_argument('--distinct', type=int, default=50, help="Number of distinct slates requested")
+    parser.add_argument('--min-bets', type=int, default=4)
+    parser.add_argument('--max-bets', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.allocation_cache import AllocationCache
+from utils.odds_feed import DEBOUNCE_INTERVAL, OddsFeedProcessor, serve_socket, tail_jsonl
+from utils.pipeline import normalize_settings, run_settings
+from utils.strategy_io import load_slate, save_strategy_file
+
+
+async def report_metrics(processor, interval):
+    while True:
+        await asyncio.sleep(interval)
+        print(json.dumps(processor.metrics.stats()), flush=True)
+
+
+async def run(args):
+    bets, settings = load_slate(args.slate)
+    if args.risk_preference:
+        settings["risk_preference"] = args.risk_preference
+    settings = normalize_settings(settings)
+    cache = AllocationCache()
+    strategy = run_settings(bets, settings, cache=cache)
+
+    def on_update(strategy, ticks):
+        if args.output:
+            save_strategy_file(strategy, args.output)
+
+    processor = OddsFeedProcessor(
+        strategy, debounce=args.debounce, method=settings["allocation"], cache=cache, on_update=on_update
+    )
+    worker = asyncio.create_task(processor.run())
+    reporter = asyncio.create_task(report_metrics(processor, args.metrics_interval)) if args.metrics_interval else None
+    try:
+        if args.feed:
+            await tail_jsonl(processor, args.feed, from_start=not args.from_end, follow=not args.replay)
+            await processor.drain()
+        else:
+            server = await serve_socket(processor, args.host, args.port, args.unix_socket)
+            addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+            print(f"Odds feed listening on {addresses}", flush=True)
+            async with server:
+                await server.serve_forever()
+    finally:
+        for task in (worker, reporter):
+            if task is not None:
+                task.cancel()
+        print(json.dumps(processor.metrics.stats()), flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Keep a slate's strategy re-optimized from a stream of JSON-lines odds updates."
+    )
+    parser.add_argument('slate', help="Slate file (JSON or CSV) giving the bets and settings")
+    parser.add_argument('--feed', type=str, help="JSON-lines file of ticks to tail (default: listen on a socket)")
+    parser.add_argument('--replay', action='store_true', help="Stop at the end of the feed file instead of following it")
+    parser.add_argument('--from-end', action='store_true', help="Skip the ticks already in the feed file")
+    parser.add_argument('--host', type=str, default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--unix-socket', type=str, default=None, help="Listen on a Unix socket instead of TCP")
+    parser.add_argument('--debounce', type=float, default=DEBOUNCE_INTERVAL, help="Batching window in seconds")
+    parser.add_argument('--risk-preference', type=str, choices=["Conservative", "Moderate", "Aggressive"])
+    parser.add_argument('--output', type=str, help="Strategy file rewritten after every applied batch")
+    parser.add_argument('--metrics-interval', type=float, default=0.0, help="Seconds between metric reports")
+
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+import argparse
+import glob
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.pipeline import run_settings
+from utils.strategy_io import BINARY_EXTENSION, load_slate, save_strategy_file
+
+
+def slate_files(paths):
+    """Expand directories into the JSON and CSV slates they contain."""
+    for path in paths:
+        if os.path.isdir(path):
+            yield from sorted(glob.glob(os.path.join(path, "*.json")) + glob.glob(os.path.join(path, "*.csv")))
+        else:
+            yield path
+
+
+def run_slate(task):
+    """Run one slate through the pipeline and save the result; returns an error message or None."""
+    slate_path, output_path, overrides = task
+    try:
+        bets, settings = load_slate(slate_path)
+        strategy = run_settings(bets, {**settings, **overrides})
+        save_strategy_file(strategy, output_path)
+    except Exception as e:
+        return f"{slate_path}: {e}"
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compute betting strategies for JSON/CSV slates without starting the GUI."
+    )
+    parser.add_argument('slates', nargs='+', help="Slate files, or directories of .json/.csv slates")
+    parser.add_argument('--output-dir', type=str, default="results",
+                        help="Directory receiving one <slate name>.json strategy per slate")
+    parser.add_argument('--format', type=str, choices=["json", "binary"], default="json",
+                        help=f"Strategy file format (binary writes <slate name>{BINARY_EXTENSION})")
+    parser.add_argument('--budget', type=float, help="Total budget (overrides the slate file)")
+    parser.add_argument('--strategy-type', type=str, choices=["Accumulator", "Parlay", "System"])
+    parser.add_argument('--risk-preference', type=str, choices=["Conservative", "Moderate", "Aggressive"])
+    parser.add_argument('--folds', type=int, help="Legs per combination in System mode")
+    parser.add_argument('--allocation', type=str, choices=["mean_variance", "kelly", "simultaneous_kelly"])
+    parser.add_argument('--workers', type=int, default=1, help="Processes running slates in parallel")
+
+    args = parser.parse_args()
+
+    overrides = {
+        key: value for key, value in (
+            ("total_budget", args.budget),
+            ("strategy_type", args.strategy_type),
+            ("risk_preference", args.risk_preference),
+            ("folds", args.folds),
+            ("allocation", args.allocation),
+        ) if value is not None
+    }
+    extension = BINARY_EXTENSION if args.format == "binary" else ".json"
+    tasks = [
+        (path, os.path.join(args.output_dir, os.path.splitext(os.path.basename(path))[0] + extension), overrides)
+        for path in slate_files(args.slates)
+    ]
+    if args.workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            errors = [error for error in executor.map(run_slate, tasks, chunksize=16) if error]
+    else:
+        errors = [error for error in map(run_slate, tasks) if error]
+
+    for error in errors:
+        print(error, file=sys.stderr)
+    print(f"Processed {len(tasks) - len(errors)} of {len(tasks)} slates into {args.output_dir}")
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.strategy_io import save_strategy_file
+from utils.strategy_store import DEFAULT_DATABASE, StrategyStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index saved strategies in SQLite and query them.")
+    parser.add_argument('--database', type=str, default=DEFAULT_DATABASE)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser("import", help="Index the strategy files of a directory")
+    import_parser.add_argument('directory', nargs='?', default="results")
+
+    find_parser = commands.add_parser("find", help="List matching strategies, most recent first")
+    find_parser.add_argument('--from', dest="date_from", type=str, help="Earliest date (inclusive), e.g. 2024-10")
+    find_parser.add_argument('--to', dest="date_to", type=str, help="Latest date (exclusive), e.g. 2024-11")
+    find_parser.add_argument('--strategy-type', type=str, choices=["Accumulator", "Parlay", "System"])
+    find_parser.add_argument('--risk-preference', type=str, choices=["Conservative", "Moderate", "Aggressive"])
+    find_parser.add_argument('--leg', type=str, help="Name of a bet the strategy stakes")
+    find_parser.add_argument('--min-ev', type=float, help="Minimum stake-weighted EV per dollar")
+    find_parser.add_argument('--max-ev', type=float, help="Maximum stake-weighted EV per dollar")
+    find_parser.add_argument('--limit', type=int, default=50)
+
+    export_parser = commands.add_parser("export", help="Write a stored strategy to a JSON or binary file")
+    export_parser.add_argument('id', type=int)
+    export_parser.add_argument('output_file', type=str)
+
+    args = parser.parse_args()
+
+    with StrategyStore(args.database) as store:
+        if args.command == "import":
+            imported, skipped, errors = store.import_directory(args.directory)
+            for error in errors:
+                print(error, file=sys.stderr)
+            print(f"Imported {imported} strategies ({skipped} already indexed, {len(errors)} failed)")
+            sys.exit(1 if errors else 0)
+        elif args.command == "find":
+            records = store.find(args.date_from, args.date_to, args.strategy_type, args.risk_preference,
+                                 args.leg, args.min_ev, args.max_ev, args.limit)
+            for record in records:
+                print(record.label())
+        else:
+            try:
+                save_strategy_file(store.load(args.id), args.output_file)
+            except KeyError as e:
+                print(e.args[0], file=sys.stderr)
+                sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
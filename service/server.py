@@ -0,0 +1,222 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from http import HTTPStatus
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.pipeline import normalize_settings, run_settings
+from utils.strategy_io import parse_bet, strategy_to_dict
+
+# Number of computed strategies kept, and how long they stay valid (seconds)
+CACHE_SIZE = 1024
+CACHE_TTL = 300.0
+
+# Largest request body accepted (bytes)
+MAX_BODY_SIZE = 1 << 20
+
+
+def normalize_request(payload: dict) -> dict:
+    """Validate a strategy request and put it in canonical form (raises ValueError)."""
+    if not isinstance(payload, dict) or not isinstance(payload.get("bets"), list):
+        raise ValueError("Request must be a JSON object with a \"bets\" list.")
+    bets = []
+    for index, bet_data in enumerate(payload["bets"], start=1):
+        try:
+            bet = parse_bet(bet_data)
+        except (ValueError, AttributeError) as e:
+            raise ValueError(f"Bet {index}: {e}")
+        bets.append({"name": bet.name, "odds": bet.odds, "confidence": bet.confidence})
+    return {"bets": bets, **normalize_settings(payload)}
+
+
+def request_key(request: dict) -> str:
+    """Hash of a normalized request; identical slates and settings share it."""
+    return hashlib.blake2b(json.dumps(request, sort_keys=True).encode(), digest_size=16).hexdigest()
+
+
+def compute_strategy(request: dict) -> dict:
+    """Worker entry point: run the pipeline on a normalized request."""
+    bets = [parse_bet(bet) for bet in request["bets"]]
+    strategy = run_settings(bets, request)
+    return strategy_to_dict(strategy)
+
+
+@dataclass
+class ServiceStats:
+    requests: int = 0
+    computed: int = 0
+    cache_hits: int = 0
+    coalesced: int = 0
+    errors: int = 0
+
+
+@dataclass
+class StrategyService:
+    """Computes strategies on a process pool, coalescing identical in-flight requests.
+
+    A request whose key is already being computed awaits the same future
+    instead of being computed again; finished results are kept in a TTL/LRU
+    cache.
+    """
+    executor: ProcessPoolExecutor
+    cache_size: int = CACHE_SIZE
+    cache_ttl: float = CACHE_TTL
+    stats: ServiceStats = field(default_factory=ServiceStats)
+    _cache: OrderedDict = field(default_factory=OrderedDict, repr=False)
+    _in_flight: dict = field(default_factory=dict, repr=False)
+
+    @property
+    def cached(self) -> int:
+        """Number of strategies in the cache, including expired ones not yet evicted."""
+        return len(self._cache)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of strategies being computed."""
+        return len(self._in_flight)
+
+    async def strategy(self, payload: dict) -> dict:
+        self.stats.requests += 1
+        request = normalize_request(payload)
+        key = request_key(request)
+
+        cached = self._cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.cache_ttl:
+            self._cache.move_to_end(key)
+            self.stats.cache_hits += 1
+            return cached[1]
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.stats.coalesced += 1
+            return await asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, compute_strategy, request)
+        self._in_flight[key] = future
+        try:
+            result = await asyncio.shield(future)
+        finally:
+            del self._in_flight[key]
+        self.stats.computed += 1
+        self._cache[key] = (time.monotonic(), result)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+
+async def read_request(reader: asyncio.StreamReader):
+    """Read one HTTP/1.1 request; returns `(method, path, headers, body)` or None at end of stream."""
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    method, path, _ = request_line.decode("latin-1").split(" ", 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", 0))
+    if length > MAX_BODY_SIZE:
+        raise ValueError("Request body too large.")
+    body = await reader.readexactly(length) if length else b""
+    return method, path, headers, body
+
+
+def write_response(writer: asyncio.StreamWriter, status: HTTPStatus, payload, keep_alive: bool):
+    body = json.dumps(payload).encode()
+    writer.write(
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + body
+    )
+
+
+async def dispatch(service: StrategyService, method: str, path: str, body: bytes):
+    """Route one request; returns `(status, payload)`."""
+    if method == "GET" and path == "/health":
+        return HTTPStatus.OK, {"status": "ok"}
+    if method == "GET" and path == "/stats":
+        return HTTPStatus.OK, {**vars(service.stats), "cached": service.cached, "in_flight": service.in_flight}
+    if method == "POST" and path == "/strategy":
+        try:
+            return HTTPStatus.OK, await service.strategy(json.loads(body or b"null"))
+        except (TypeError, ValueError) as e:  # Invalid requests, JSON decoding errors and pipeline warnings
+            service.stats.errors += 1
+            return HTTPStatus.UNPROCESSABLE_ENTITY, {"error": str(e)}
+        except Exception as e:  # Worker failures: a broken process pool, running out of memory, pipeline bugs
+            service.stats.errors += 1
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(e).__name__}: {e}"}
+    return HTTPStatus.NOT_FOUND, {"error": f"No route for {method} {path}"}
+
+
+async def handle_connection(service: StrategyService, reader, writer):
+    """Serve requests on one connection until the client closes it (keep-alive)."""
+    try:
+        while True:
+            try:
+                request = await read_request(reader)
+            except (ValueError, asyncio.IncompleteReadError):
+                write_response(writer, HTTPStatus.BAD_REQUEST, {"error": "Malformed request."}, False)
+                break
+            if request is None:
+                break
+            method, path, headers, body = request
+            keep_alive = headers.get("connection", "keep-alive").lower() != "close"
+            status, payload = await dispatch(service, method, path, body)
+            write_response(writer, status, payload, keep_alive)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host: str = "127.0.0.1", port: int = 8765, unix_socket: str = None, workers: int = None):
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        service = StrategyService(executor)
+
+        async def on_connection(reader, writer):
+            await handle_connection(service, reader, writer)
+
+        if unix_socket:
+            server = await asyncio.start_unix_server(on_connection, path=unix_socket)
+        else:
+            server = await asyncio.start_server(on_connection, host, port)
+        addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+        print(f"Strategy service listening on {addresses}", flush=True)
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve strategy computations over HTTP.")
+    parser.add_argument('--host', type=str, default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix-socket', type=str, default=None, help="Listen on a Unix socket instead of TCP")
+    parser.add_argument('--workers', type=int, default=None, help="Processes computing strategies")
+
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix_socket, args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
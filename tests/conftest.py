@@ -0,0 +1,16 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.bet import Bet
+
+
+def random_bets(count, seed):
+    """`count` bets with random odds and confidences, the same for the same seed."""
+    rng = random.Random(seed)
+    return [
+        Bet(f"Bet {i + 1}", round(rng.uniform(1.1, 3.5), 2), rng.choice([0.5, 0.7, 0.9]))
+        for i in range(count)
+    ]
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from models.betting_strategy import BettingStrategy
+from utils.allocation_cache import AllocationCache
+from utils.combination_utils import generate_combinations
+from utils.stake_allocation_utils import allocate_stakes
+
+from conftest import random_bets
+
+COLUMNS = ("legs", "combined_odds", "combined_prob", "ev_per_dollar", "stake_allocation", "kelly_fraction")
+
+
+def build_strategy(bets):
+    strategy = BettingStrategy(100.0, "System", None, "Moderate")
+    strategy.filter_and_sort_combinations(generate_combinations(bets, "System", "Moderate", backend="numpy"))
+    return strategy
+
+
+@pytest.mark.parametrize("method", ["mean_variance", "kelly", "simultaneous_kelly"])
+@pytest.mark.parametrize("covariance", ["diagonal", "shared_legs"])
+def test_cache_hit_matches_cold_solve(method, covariance):
+    bets = random_bets(9, seed=9)
+    cache = AllocationCache()
+    cold, warm = build_strategy(bets), build_strategy(bets)
+
+    assert allocate_stakes(cold, covariance=covariance, cache=cache, method=method) > 0
+    assert allocate_stakes(warm, covariance=covariance, cache=cache, method=method) == 0
+    assert cache.hits == 1
+
+    for column in COLUMNS:
+        np.testing.assert_array_equal(getattr(warm.combinations, column), getattr(cold.combinations, column))
+    np.testing.assert_array_equal(warm.stake_allocation, cold.stake_allocation)
+    assert warm.covariance == cold.covariance
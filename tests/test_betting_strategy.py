@@ -0,0 +1,42 @@
+import random
+
+import numpy as np
+import pytest
+
+from models.betting_strategy import BettingStrategy
+from utils.combination_utils import generate_combinations
+
+from conftest import random_bets
+
+
+@pytest.mark.parametrize("backend", ["itertools", "auto"])
+def test_restoring_odds_restores_selection(backend):
+    bets = random_bets(12, seed=7)
+    rng = random.Random(7)
+    strategy = BettingStrategy(100.0, "System", None, "Moderate")
+    strategy.filter_and_sort_combinations(generate_combinations(bets, "System", "Moderate", backend=backend))
+    original_legs = strategy.combinations.legs.copy()
+    assert len(original_legs)
+
+    for _ in range(200):
+        leg = rng.randrange(len(bets))
+        strategy.rescore_bet(leg, odds=round(bets[leg].odds * rng.uniform(0.5, 1.5) + 0.01, 2))
+    for leg, bet in enumerate(bets):
+        strategy.rescore_bet(leg, odds=bet.odds, confidence=bet.confidence)
+
+    assert len(strategy.combinations) == len(original_legs)
+    np.testing.assert_array_equal(strategy.combinations.legs, original_legs)
+
+
+def test_rescore_keeps_stakes_of_retained_rows():
+    bets = random_bets(8, seed=3)
+    strategy = BettingStrategy(100.0, "System", None, "Aggressive")
+    strategy.filter_and_sort_combinations(generate_combinations(bets, "System", "Aggressive", backend="itertools"))
+    strategy.set_stake_allocation(np.arange(len(strategy.combinations), dtype=np.float64))
+    stakes = {strategy.combinations.leg_tuple(row): strategy.stake_allocation[row]
+              for row in range(len(strategy.combinations))}
+
+    strategy.rescore_bet(0, odds=bets[0].odds + 0.5)
+
+    for row in range(len(strategy.combinations)):
+        assert strategy.stake_allocation[row] == stakes.get(strategy.combinations.leg_tuple(row), 0.0)
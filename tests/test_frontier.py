@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from utils.frontier_utils import DEFAULT_RISK_AVERSIONS, efficient_frontier, portfolio_point
+from utils.pipeline import run_pipeline
+from utils.stake_allocation_utils import get_risk_aversion
+
+from conftest import random_bets
+
+
+@pytest.mark.parametrize("risk_preference", ["Conservative", "Moderate", "Aggressive"])
+def test_allocation_lies_on_frontier_of_its_covariance(risk_preference):
+    bets = random_bets(12, seed=3)
+    strategy = run_pipeline(bets, 100.0, "System", risk_preference)
+    matrix = strategy.combinations.shared_covariance
+    assert strategy.covariance == "shared_legs" and matrix is not None
+
+    risk_aversion = get_risk_aversion(risk_preference)
+    frontier = efficient_frontier(strategy.combinations, np.union1d(DEFAULT_RISK_AVERSIONS, [risk_aversion]),
+                                  budgets=[strategy.total_budget], covariance=strategy.covariance)
+    point = int(np.argmin(np.abs(frontier.risk_aversions - risk_aversion)))
+    profit, risk = portfolio_point(strategy.combinations, strategy.stake_allocation, strategy.covariance)
+
+    assert strategy.combinations.shared_covariance is matrix
+    assert profit == pytest.approx(frontier.expected_profits[0, point], rel=1e-6)
+    assert risk == pytest.approx(frontier.standard_deviations[0, point], rel=1e-6)
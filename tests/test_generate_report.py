@@ -0,0 +1,47 @@
+import importlib.util
+import json
+import os
+
+from utils.pipeline import run_pipeline
+from utils.strategy_io import save_strategy_file
+
+from conftest import random_bets
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts", "generate_report.py")
+spec = importlib.util.spec_from_file_location("generate_report", SCRIPT)
+generate_report = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(generate_report)
+
+
+def write_strategies(directory, count):
+    for index in range(count):
+        bets = random_bets(6, seed=index)
+        save_strategy_file(run_pipeline(bets, 100.0, "System", "Aggressive"), str(directory / f"strategy_{index}.json"))
+
+
+def test_batch_twice_into_the_input_directory(tmp_path):
+    write_strategies(tmp_path, 3)
+
+    assert generate_report.generate_reports(str(tmp_path), str(tmp_path)) == (3, 0, [])
+    assert generate_report.generate_reports(str(tmp_path), str(tmp_path)) == (0, 3, [])
+
+    assert not (tmp_path / "manifest.txt").exists()
+    with open(tmp_path / generate_report.MANIFEST_FILE) as file:
+        assert sorted(os.path.basename(path) for path in json.load(file)) == [
+            f"strategy_{index}.json" for index in range(3)
+        ]
+    with open(tmp_path / generate_report.SUMMARY_FILE) as file:
+        assert "Files: 3" in file.read()
+
+
+def test_batch_skips_nested_output_directory(tmp_path):
+    write_strategies(tmp_path, 2)
+    output = tmp_path / "reports"
+    pattern = os.path.join(str(tmp_path), "**", "*.json")
+
+    generate_report.generate_reports(pattern, str(output))
+    (output / "extra.json").write_text("{}")
+
+    assert generate_report.batch_inputs(pattern, str(output)) == sorted(
+        str(tmp_path / f"strategy_{index}.json") for index in range(2)
+    )
@@ -0,0 +1,27 @@
+import pytest
+
+from models.betting_strategy import BettingStrategy
+from utils.combination_utils import generate_combinations
+from utils.monte_carlo import simulate_strategy
+
+from conftest import random_bets
+
+
+def make_strategy():
+    strategy = BettingStrategy(100.0, "System", None, "Aggressive")
+    strategy.filter_and_sort_combinations(generate_combinations(random_bets(6, seed=5), "System", "Aggressive"))
+    strategy.stake_allocation[:] = 100.0 / len(strategy.combinations)
+    return strategy
+
+
+@pytest.mark.parametrize("trials", [0, -1])
+def test_simulate_strategy_rejects_no_trials(trials):
+    strategy = make_strategy()
+    with pytest.raises(ValueError, match="at least 1"):
+        simulate_strategy(strategy.combinations, strategy.stake_allocation, trials=trials)
+
+
+def test_simulate_strategy_single_trial():
+    strategy = make_strategy()
+    result = simulate_strategy(strategy.combinations, strategy.stake_allocation, trials=1, seed=0)
+    assert result.trials == 1 and result.mean >= -100.0
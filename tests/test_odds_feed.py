@@ -0,0 +1,65 @@
+import asyncio
+import json
+import random
+
+import pytest
+
+from utils.odds_feed import OddsFeedProcessor, OddsTick, parse_tick, tail_jsonl
+from utils.pipeline import run_pipeline
+
+from conftest import random_bets
+
+
+def make_strategy(seed):
+    bets = random_bets(12, seed)
+    return bets, run_pipeline(bets, 100.0, "System", "Moderate")
+
+
+def test_replay_applies_every_tick_and_restores_slate(tmp_path):
+    bets, strategy = make_strategy(11)
+    rng = random.Random(11)
+    original_legs = strategy.combinations.legs.copy()
+
+    feed = tmp_path / "ticks.jsonl"
+    with open(feed, "w") as file:
+        for _ in range(1000):
+            bet = rng.choice(bets)
+            file.write(json.dumps({"name": bet.name, "odds": round(bet.odds * rng.uniform(0.5, 1.5) + 0.01, 2)}) + "\n")
+        for bet in bets:
+            file.write(json.dumps({"name": bet.name, "odds": bet.odds}) + "\n")
+
+    processor = OddsFeedProcessor(strategy, debounce=0.001, queue_size=100)
+
+    async def replay():
+        worker = asyncio.create_task(processor.run())
+        await tail_jsonl(processor, str(feed), follow=False)
+        await processor.drain()
+        worker.cancel()
+
+    asyncio.run(replay())
+    metrics = processor.metrics
+    assert metrics.received == 1000 + len(bets)
+    assert metrics.dropped == 0
+    assert metrics.applied + metrics.merged + metrics.unchanged + metrics.unknown + metrics.invalid == metrics.received
+    assert (strategy.combinations.legs.shape == original_legs.shape
+            and (strategy.combinations.legs == original_legs).all())
+
+
+def test_socket_submit_drops_oldest_tick():
+    processor = OddsFeedProcessor(None, queue_size=2)
+
+    async def submit():
+        results = [processor.submit(OddsTick(name, 2.0)) for name in ("a", "b", "c")]
+        return results, [processor.queue.get_nowait().name for _ in range(2)]
+
+    results, queued = asyncio.run(submit())
+    assert results == [True, True, False]
+    assert queued == ["b", "c"]
+    assert processor.metrics.dropped == 1
+
+
+def test_parse_tick_rejects_non_finite_values():
+    for line in ('{"name": "A", "odds": "nan"}', '{"name": "A", "odds": Infinity}',
+                 '{"name": "A", "confidence": "nan"}', '{"name": null, "odds": 2.0}'):
+        with pytest.raises(ValueError):
+            parse_tick(line)
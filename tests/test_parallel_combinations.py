@@ -0,0 +1,33 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from utils.combination_engine import unrank_combinations
+from utils.combination_utils import generate_combinations
+from utils.parallel_combinations import build_shards
+
+from conftest import random_bets
+
+
+@pytest.mark.parametrize("num_bets", [1, 6, 12])
+def test_unranking_follows_itertools_order(num_bets):
+    for size in range(1, num_bets + 1):
+        expected = np.array(list(itertools.combinations(range(num_bets), size)))
+        np.testing.assert_array_equal(unrank_combinations(num_bets, size, np.arange(len(expected))), expected)
+
+
+def test_rank_shards_cover_every_subset_once():
+    shards = build_shards(14, range(2, 15), "ranks", 16)
+    for size in range(2, 15):
+        ranges = sorted(ranks for sizes, _, ranks in shards if sizes == (size,))
+        assert ranges[0][0] == 0 and ranges[-1][1] == len(list(itertools.combinations(range(14), size)))
+        assert all(previous[1] == following[0] for previous, following in zip(ranges, ranges[1:]))
+
+
+@pytest.mark.parametrize("shard_by", ["ranks", "size", "leading"])
+def test_parallel_matches_single_process(shard_by):
+    bets = random_bets(13, seed=4)
+    expected = generate_combinations(bets, "System", "Aggressive", backend="numpy")
+    result = generate_combinations(bets, "System", "Aggressive", backend="parallel", workers=2, shard_by=shard_by)
+    np.testing.assert_array_equal(result.legs, expected.legs)
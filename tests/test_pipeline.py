@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from utils import pipeline
+from utils.pipeline import run_pipeline
+
+from conftest import random_bets
+
+
+@pytest.mark.parametrize("risk_preference", ["Conservative", "Moderate", "Aggressive"])
+def test_partial_results_for_every_preset(monkeypatch, risk_preference):
+    monkeypatch.setattr(pipeline, "PROGRESS_INTERVAL", 0.0)
+    monkeypatch.setattr(pipeline, "PARTIAL_INTERVAL", 0.0)
+    monkeypatch.setattr(pipeline, "PRUNED_CHECK_INTERVAL", 16)
+    bets = random_bets(14, seed=2)
+    partials = []
+
+    def progress(report):
+        if report.partial is not None:
+            partials.append(report.partial)
+
+    strategy = run_pipeline(bets, 100.0, "System", risk_preference, progress=progress, cancelled=lambda: False)
+    expected = run_pipeline(bets, 100.0, "System", risk_preference)
+
+    assert partials
+    for partial in partials:
+        assert len(partial.combinations) and partial.stake_allocation.sum() == pytest.approx(100.0)
+    np.testing.assert_array_equal(strategy.combinations.legs, expected.combinations.legs)
+
+
+def test_normalize_settings():
+    assert pipeline.normalize_settings({"bets": [], "total_budget": "50", "folds": "3"}) == {
+        **pipeline.DEFAULT_SETTINGS, "total_budget": 50.0, "folds": 3
+    }
+    assert pipeline.normalize_settings({"strategy_type": "Parlay", "folds": 3})["folds"] is None
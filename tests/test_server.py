@@ -0,0 +1,60 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+from service import server
+from service.server import StrategyService, dispatch
+
+REQUEST = {"bets": [{"name": "A", "odds": 2.1, "confidence": 0.7}, {"name": "B", "odds": 1.8, "confidence": 0.9}]}
+
+
+def test_worker_failure_returns_server_error(monkeypatch):
+    def fail(request):
+        raise RuntimeError("worker died")
+
+    monkeypatch.setattr(server, "compute_strategy", fail)
+
+    async def post():
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            service = StrategyService(executor)
+            status, payload = await dispatch(service, "POST", "/strategy", json.dumps(REQUEST).encode())
+            _, stats = await dispatch(service, "GET", "/stats", b"")
+            return status, payload, stats
+
+    status, payload, stats = asyncio.run(post())
+    assert status == HTTPStatus.INTERNAL_SERVER_ERROR
+    assert "worker died" in payload["error"]
+    assert stats["errors"] == 1 and stats["computed"] == 0
+    assert stats["cached"] == 0 and stats["in_flight"] == 0
+
+
+def test_connection_reports_worker_failure(monkeypatch):
+    def fail(request):
+        raise MemoryError()
+
+    monkeypatch.setattr(server, "compute_strategy", fail)
+
+    async def roundtrip():
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            service = StrategyService(executor)
+            listener = await asyncio.start_server(
+                lambda reader, writer: server.handle_connection(service, reader, writer), "127.0.0.1", 0
+            )
+            port = listener.sockets[0].getsockname()[1]
+            async with listener:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                body = json.dumps(REQUEST).encode()
+                writer.write(
+                    f"POST /strategy HTTP/1.1\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+                    + body
+                )
+                await writer.drain()
+                response = await reader.read()
+                writer.close()
+            return response, service.stats.errors
+
+    response, errors = asyncio.run(roundtrip())
+    assert response.startswith(b"HTTP/1.1 500 Internal Server Error")
+    assert b"MemoryError" in response.split(b"\r\n\r\n", 1)[1]
+    assert errors == 1
@@ -0,0 +1,37 @@
+import numpy as np
+
+from utils import stake_allocation_utils
+from utils.stake_allocation_utils import solve_diagonal_qp, verify_against_slsqp
+
+
+def diagonal_problem(count=466, seed=5):
+    rng = np.random.default_rng(seed)
+    probabilities = rng.uniform(0.05, 0.9, count)
+    returns = probabilities * rng.uniform(1.2, 40.0, count) - 1.0
+    return returns, probabilities * (1 - probabilities), 1.0
+
+
+def test_verify_ignores_slightly_infeasible_slsqp_answer(monkeypatch):
+    returns, variances, risk_aversion = diagonal_problem()
+    weights = solve_diagonal_qp(returns, variances, risk_aversion)
+    # SLSQP meets sum(w) == 1 only to its tolerance; overshooting it beats the true optimum
+    overshoot = weights * 1.0000034
+    monkeypatch.setattr(stake_allocation_utils, "solve_slsqp", lambda *args: (overshoot, 1))
+    assert stake_allocation_utils.mean_variance_objective(overshoot, returns, variances, risk_aversion) < \
+        stake_allocation_utils.mean_variance_objective(weights, returns, variances, risk_aversion)
+
+    verify_against_slsqp(weights, returns, variances, risk_aversion, np.full(len(returns), 1 / len(returns)))
+
+
+def test_verify_rejects_a_worse_allocation(monkeypatch):
+    returns, variances, risk_aversion = diagonal_problem(count=40)
+    weights = solve_diagonal_qp(returns, variances, risk_aversion)
+    uniform = np.full(len(returns), 1 / len(returns))
+    monkeypatch.setattr(stake_allocation_utils, "solve_slsqp", lambda *args: (weights, 1))
+
+    try:
+        verify_against_slsqp(uniform, returns, variances, risk_aversion, uniform)
+    except ValueError as e:
+        assert "disagrees with SLSQP" in str(e)
+    else:
+        raise AssertionError("a sub-optimal allocation passed verification")
@@ -0,0 +1,81 @@
+import random
+
+import pytest
+
+from utils.strategy_io import parse_bet, read_bet_columns, validate_bet_columns
+
+
+@pytest.mark.parametrize("odds", ["nan", "inf", "-inf", float("nan"), float("inf")])
+def test_parse_bet_rejects_non_finite_odds(odds):
+    with pytest.raises(ValueError, match="Odds must be a number."):
+        parse_bet({"name": "A", "odds": odds, "confidence": "Confident"})
+
+
+@pytest.mark.parametrize("confidence", ["nan", "inf", float("nan")])
+def test_parse_bet_rejects_non_finite_confidence(confidence):
+    with pytest.raises(ValueError, match="Confidence must be"):
+        parse_bet({"name": "A", "odds": 2.0, "confidence": confidence})
+
+
+@pytest.mark.parametrize("name", [None, "", "  "])
+def test_parse_bet_rejects_missing_name(name):
+    with pytest.raises(ValueError, match="Bet name cannot be empty."):
+        parse_bet({"name": name, "odds": 2.0, "confidence": 0.5})
+
+
+NAMES = [None, "", " ", "A", " B ", 0, 1.5, float("nan")]
+ODDS = [None, "", "x", "nan", "inf", "-inf", " 2.5 ", "1.0", "1", "0.5", 2.0, 1, True, [[1]], [1.5], "1e400",
+        float("nan"), float("inf"), "2,5"]
+CONFIDENCES = [None, "", "Confident", " Very Confident ", "nan", "inf", "0.5", " 0.7 ", "0", "1", "1.5", 0.3, 1,
+               [0.5], float("nan"), "maybe", -0.1]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_validate_bet_columns_matches_parse_bet(seed):
+    rng = random.Random(seed)
+    rows = [(rng.choice(NAMES), rng.choice(ODDS), rng.choice(CONFIDENCES)) for _ in range(rng.randint(1, 8))]
+    bets, errors = validate_bet_columns(*zip(*rows))
+
+    valid = iter(bets)
+    for index, (name, odds, confidence) in enumerate(rows):
+        try:
+            expected = parse_bet({"name": name, "odds": odds, "confidence": confidence})
+        except ValueError as e:
+            assert errors[index].endswith(f": {e}")
+        else:
+            assert index not in errors
+            bet = next(valid)
+            assert (bet.name, bet.odds, bet.confidence) == (expected.name, expected.odds, expected.confidence)
+    assert next(valid, None) is None
+
+
+def test_read_bet_columns_csv(tmp_path):
+    path = tmp_path / "bets.csv"
+    path.write_text("Confidence,Name,Odds,Extra\nConfident,A,2.5\n\n0.7,B\n")
+    columns, errors = read_bet_columns(str(path))
+    assert columns == {"name": ["A", "B"], "odds": ["2.5", ""], "confidence": ["Confident", "0.7"]}
+    assert errors == []
+
+
+def test_read_bet_columns_csv_missing_column(tmp_path):
+    path = tmp_path / "bets.csv"
+    path.write_text("name,confidence\nA,Confident\n")
+    with pytest.raises(ValueError, match="no odds column"):
+        read_bet_columns(str(path))
+
+
+def test_read_bet_columns_json_lines(tmp_path):
+    path = tmp_path / "bets.jsonl"
+    path.write_text('{"name": "A", "odds": 2.5, "confidence": "Confident"}\n\n{"name": "B"\n[1, 2]\n{"odds": 3}\n')
+    columns, errors = read_bet_columns(str(path))
+    assert columns == {"name": ["A", None], "odds": [2.5, 3], "confidence": ["Confident", None]}
+    assert len(errors) == 2
+    assert errors[0].startswith("Line 3: invalid JSON") and errors[1] == "Line 4: expected a bet object."
+
+
+def test_read_bet_columns_json(tmp_path):
+    path = tmp_path / "bets.json"
+    path.write_text('{"bets": [{"name": "A", "odds": 2.5}, "B"], "total_budget": 50}')
+    columns, errors = read_bet_columns(str(path))
+    assert columns == {"name": ["A", None], "odds": [2.5, None], "confidence": [None, None]}
+    assert errors == []
@@ -0,0 +1,125 @@
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional, Tuple
+
+import numpy as np
+
+from models.combination_set import CombinationSet
+
+# Number of solved allocations kept before the least recently used one is evicted
+CACHE_SIZE = 32
+
+
+@dataclass
+class CacheEntry:
+    """One solved allocation: normalized weights keyed by each row's bet names.
+
+    `kelly_fractions` is the Kelly fraction column the Kelly methods fill in
+    alongside the weights (None for mean-variance).
+    """
+    rows: dict
+    weights: np.ndarray
+    iterations: int
+    kelly_fractions: Optional[np.ndarray] = None
+
+
+@dataclass
+class AllocationCache:
+    """LRU cache of solved stake allocations.
+
+    Exact hits skip the solver. On a miss, `nearest` returns the weights of the
+    cached allocation sharing the most combinations (matched by bet names),
+    which `allocate_stakes` uses to warm-start the solver.
+    """
+    max_size: int = CACHE_SIZE
+    hits: int = 0
+    near_hits: int = 0
+    misses: int = 0
+    iterations: int = 0
+    solves: int = 0
+    _entries: OrderedDict = field(default_factory=OrderedDict, repr=False)
+
+    @staticmethod
+    def key(combinations: CombinationSet, risk_preference: str, total_budget: float, *options) -> str:
+        """Hash of the leg structure, probabilities, odds, risk preference, budget and solver options."""
+        digest = hashlib.blake2b(digest_size=16)
+        for column in (combinations.legs, combinations.combined_prob, combinations.combined_odds):
+            digest.update(str(column.shape).encode())
+            digest.update(np.ascontiguousarray(column).tobytes())
+        digest.update(repr((risk_preference, float(total_budget)) + options).encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def row_keys(combinations: CombinationSet) -> Tuple[tuple, ...]:
+        return tuple(
+            tuple(combinations.bets[leg].name for leg in combinations.leg_tuple(row))
+            for row in range(len(combinations))
+        )
+
+    def get(self, key: str) -> Optional[Tuple[np.ndarray, Optional[np.ndarray]]]:
+        """Cached `(weights, kelly_fractions)` for `key` (counted as a hit), or None (counted as a miss)."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        kelly_fractions = None if entry.kelly_fractions is None else entry.kelly_fractions.copy()
+        return entry.weights.copy(), kelly_fractions
+
+    def nearest(self, combinations: CombinationSet) -> Optional[np.ndarray]:
+        """Warm-start weights from the cached allocation sharing the most rows with `combinations`.
+
+        Rows without a cached counterpart start at 0. Returns None when no
+        cached allocation shares a row.
+        """
+        rows = self.row_keys(combinations)
+        best, overlap = None, 0
+        # Most recent first, so ties go to the latest allocation
+        for entry in reversed(self._entries.values()):
+            shared = sum(1 for row in rows if row in entry.rows)
+            if shared > overlap:
+                best, overlap = entry, shared
+        if best is None:
+            return None
+        weights = np.array([best.weights[best.rows[row]] if row in best.rows else 0.0 for row in rows])
+        if not np.sum(weights) > 0:
+            return None
+        self.near_hits += 1
+        return weights
+
+    def put(self, key: str, combinations: CombinationSet, weights: np.ndarray, iterations: int,
+            kelly_fractions: np.ndarray = None):
+        """Store a solved allocation and record the solver iterations it took."""
+        rows = {row: index for index, row in enumerate(self.row_keys(combinations))}
+        if kelly_fractions is not None:
+            kelly_fractions = np.array(kelly_fractions, dtype=np.float64)
+        self._entries[key] = CacheEntry(rows, np.array(weights, dtype=np.float64), iterations, kelly_fractions)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        self.solves += 1
+        self.iterations += iterations
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self),
+            "hits": self.hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "solves": self.solves,
+            "iterations": self.iterations,
+        }
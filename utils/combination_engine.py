@@ -0,0 +1,157 @@
+import heapq
+import itertools
+from math import comb
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from models.bet import Bet
+from models.combination_set import CombinationSet
+
+# Number of subsets scored per NumPy pass; bounds the size of the index matrices
+CHUNK_SIZE = 65536
+
+
+def leg_arrays(bets: List[Bet]) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the odds and probabilities of each bet as arrays."""
+    odds = np.array([bet.odds for bet in bets], dtype=np.float64)
+    probs = np.array([bet.confidence for bet in bets], dtype=np.float64)
+    return odds, probs
+
+
+def index_chunks(num_bets: int, size: int, chunk_size: int = CHUNK_SIZE,
+                 leading: Optional[int] = None) -> Iterator[np.ndarray]:
+    """Yield leg-index matrices of `size`-subsets in itertools.combinations order.
+
+    If `leading` is given, only the subsets whose first leg is `leading` are produced.
+    """
+    if leading is None:
+        subsets = itertools.combinations(range(num_bets), size)
+    else:
+        subsets = (
+            (leading,) + rest
+            for rest in itertools.combinations(range(leading + 1, num_bets), size - 1)
+        )
+    while True:
+        flat = np.fromiter(
+            itertools.chain.from_iterable(itertools.islice(subsets, chunk_size)), dtype=np.intp
+        )
+        if flat.size == 0:
+            return
+        yield flat.reshape(-1, size)
+
+
+def unrank_combinations(num_bets: int, size: int, ranks: np.ndarray) -> np.ndarray:
+    """Leg-index rows of the `size`-subsets at the given ranks in itertools.combinations order.
+
+    Combinatorial number system, one vectorized step per position: the
+    subsets starting with leg c at that position number C(num_bets - c - 1,
+    remaining legs), so the leg is found by a search in their prefix sums.
+    """
+    ranks = np.asarray(ranks, dtype=np.int64)
+    legs = np.empty((len(ranks), size), dtype=np.intp)
+    first = np.zeros(len(ranks), dtype=np.intp)
+    for position in range(size):
+        remaining = size - position - 1
+        counts = [comb(num_bets - leg - 1, remaining) for leg in range(num_bets)]
+        offsets = np.concatenate(([0], np.cumsum(counts, dtype=np.int64)))
+        # Ranks are relative to the first leg still allowed at this position
+        targets = ranks + offsets[first]
+        leg = np.searchsorted(offsets, targets, side="right") - 1
+        legs[:, position] = leg
+        ranks = targets - offsets[leg]
+        first = leg + 1
+    return legs
+
+
+def ranked_chunks(num_bets: int, size: int, start: int, stop: int,
+                  chunk_size: int = CHUNK_SIZE) -> Iterator[np.ndarray]:
+    """Yield leg-index matrices of the `size`-subsets ranked `start` to `stop - 1` (see `unrank_combinations`)."""
+    for chunk_start in range(start, stop, chunk_size):
+        yield unrank_combinations(
+            num_bets, size, np.arange(chunk_start, min(chunk_start + chunk_size, stop), dtype=np.int64)
+        )
+
+
+def score_chunk(odds: np.ndarray, probs: np.ndarray, legs: np.ndarray):
+    """Compute combined odds, combined probability and EV per dollar for each row of `legs`.
+
+    The products are accumulated one leg column at a time, in the same order as
+    `Combination.__post_init__`, so the values match it bit for bit.
+    """
+    combined_odds = odds[legs[:, 0]]
+    combined_prob = probs[legs[:, 0]]
+    for column in range(1, legs.shape[1]):
+        combined_odds = combined_odds * odds[legs[:, column]]
+        combined_prob = combined_prob * probs[legs[:, column]]
+    ev_per_dollar = combined_prob * combined_odds - 1.0
+    return combined_odds, combined_prob, ev_per_dollar
+
+
+def threshold_mask(combined_odds: np.ndarray, ev_per_dollar: np.ndarray, thresholds: dict) -> np.ndarray:
+    """Boolean mask of the rows passing the risk thresholds."""
+    mask = ev_per_dollar >= thresholds["min_ev"]
+    if thresholds["max_combined_odds"] is not None:
+        mask &= combined_odds <= thresholds["max_combined_odds"]
+    return mask
+
+
+def iter_select_top_legs(bets: List[Bet], sizes: Iterable[int], thresholds: dict, limit: int,
+                         chunk_size: int = CHUNK_SIZE, leading: Optional[int] = None,
+                         ranks: Optional[Tuple[int, int]] = None) -> Iterator[Tuple[int, int, List[tuple]]]:
+    """Run `select_top_legs` one chunk at a time.
+
+    After each chunk yields `(subsets scored, subsets passing the thresholds,
+    best rows so far)`; the best rows are unsorted and must not be modified.
+    """
+    odds, probs = leg_arrays(bets)
+    best = []
+    scored = passed = 0
+    for size in sizes:
+        if ranks is None:
+            chunks = index_chunks(len(bets), size, chunk_size, leading)
+        else:
+            chunks = ranked_chunks(len(bets), size, *ranks, chunk_size)
+        for legs in chunks:
+            combined_odds, _, ev_per_dollar = score_chunk(odds, probs, legs)
+            rows = np.flatnonzero(threshold_mask(combined_odds, ev_per_dollar, thresholds))
+            scored += len(legs)
+            passed += rows.size
+            if rows.size > limit:
+                rows = rows[np.argsort(-ev_per_dollar[rows], kind="stable")[:limit]]
+            best.extend(
+                (-float(ev_per_dollar[row]), size, tuple(legs[row].tolist())) for row in rows
+            )
+            if len(best) > limit:
+                best = heapq.nsmallest(limit, best)
+            yield scored, passed, best
+
+
+def select_top_legs(bets: List[Bet], sizes: Iterable[int], thresholds: dict, limit: int,
+                    chunk_size: int = CHUNK_SIZE, leading: Optional[int] = None,
+                    ranks: Optional[Tuple[int, int]] = None) -> List[tuple]:
+    """Score every subset of the given sizes and keep the best `limit` passing the thresholds.
+
+    `leading` restricts the subsets to those starting with that leg, and
+    `ranks` (a `(start, stop)` range) to those ranked in it, for each size.
+    Returns sorted `(-ev_per_dollar, size, legs)` tuples, so ties are broken in
+    the same order itertools.combinations enumerates the subsets.
+    """
+    best = []
+    for _, _, best in iter_select_top_legs(bets, sizes, thresholds, limit, chunk_size, leading, ranks):
+        pass
+    return sorted(best)
+
+
+def materialize(bets: List[Bet], selected: Iterable[tuple]) -> CombinationSet:
+    """Build a `CombinationSet` from selected `(..., legs)` rows."""
+    return CombinationSet.from_legs(bets, [legs for *_, legs in selected])
+
+
+def top_combinations(bets: List[Bet], sizes: Iterable[int], thresholds: dict, limit: int,
+                     chunk_size: int = CHUNK_SIZE) -> CombinationSet:
+    """Return the best `limit` combinations passing the thresholds, sorted by EV per dollar.
+
+    Subsets are scored in NumPy chunks; only the surviving rows are kept.
+    """
+    return materialize(bets, select_top_legs(bets, sizes, thresholds, limit, chunk_size))
@@ -0,0 +1,94 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from math import comb
+from typing import Iterator, List
+
+from models.bet import Bet
+from models.combination import Combination
+
+# Relative slack on the pruning tests, so that rounding in the running products
+# never cuts a subset the exact threshold check would keep
+PRUNING_SLACK = 1e-9
+
+
+@dataclass
+class EnumerationStats:
+    """Counters reported by the pruned System enumerator."""
+    visited: int = 0  # Subsets reached by the depth-first walk
+    emitted: int = 0  # Subsets yielded as combinations
+    pruned_by_odds: int = 0  # Subsets skipped because the combined odds cap was exceeded
+    pruned_by_ev: int = 0  # Subsets skipped because their EV could not reach min_ev
+
+    @property
+    def skipped(self) -> int:
+        return self.pruned_by_odds + self.pruned_by_ev
+
+
+def iter_pruned_combinations(bets: List[Bet], sizes: range, thresholds: dict,
+                             stats: EnumerationStats = None) -> Iterator[Combination]:
+    """Yield the System combinations that can pass the risk thresholds.
+
+    Subsets are walked depth-first over the bets sorted by odds. Since every
+    leg has odds > 1, combined odds only grow as legs are added, so once a
+    leg pushes the running product past `max_combined_odds` that subtree and
+    all of its (higher odds) siblings are cut. A subtree is also cut when even
+    adding every remaining leg that improves odds * probability cannot lift
+    the EV to `min_ev`. Yielded combinations are not guaranteed to pass the
+    exact threshold check; they are meant for `select_top_combinations`.
+    """
+    if stats is None:
+        stats = EnumerationStats()
+    if not sizes:
+        return
+    min_size, max_size = sizes[0], sizes[-1]
+
+    order = sorted(range(len(bets)), key=lambda i: bets[i].odds)
+    odds = [bets[i].odds for i in order]
+    gains = [bets[i].odds * bets[i].confidence for i in order]
+    count = len(order)
+
+    # best_tail[j]: the most the EV factor can still grow using positions j and later
+    best_tail = [1.0] * (count + 1)
+    for j in range(count - 1, -1, -1):
+        best_tail[j] = best_tail[j + 1] * max(1.0, gains[j])
+
+    odds_cap = thresholds["max_combined_odds"]
+    odds_limit = None if odds_cap is None else odds_cap * (1 + PRUNING_SLACK)
+    ev_floor = thresholds["min_ev"] - PRUNING_SLACK
+
+    @lru_cache(maxsize=None)
+    def subtree_size(size: int, remaining: int) -> int:
+        """Number of subsets within the size range below a node of `size` legs."""
+        return sum(
+            comb(remaining, extra) for extra in range(remaining + 1)
+            if min_size <= size + extra <= max_size
+        )
+
+    # Each entry: (next position, running odds, running odds * probability, chosen positions)
+    stack = [(0, 1.0, 1.0, ())]
+    while stack:
+        start, running_odds, running_gain, chosen = stack.pop()
+        size = len(chosen)
+        if size >= min_size and running_gain - 1.0 >= ev_floor:
+            legs = tuple(sorted(order[position] for position in chosen))
+            stats.emitted += 1
+            yield Combination([bets[i] for i in legs], legs)
+        if size == max_size:
+            continue
+
+        children = []
+        for position in range(start, count):
+            child_odds = running_odds * odds[position]
+            if odds_limit is not None and child_odds > odds_limit:
+                # Later positions have higher odds, so they overflow the cap too
+                stats.pruned_by_odds += sum(
+                    subtree_size(size + 1, count - 1 - later) for later in range(position, count)
+                )
+                break
+            child_gain = running_gain * gains[position]
+            if child_gain * best_tail[position + 1] - 1.0 < ev_floor:
+                stats.pruned_by_ev += subtree_size(size + 1, count - 1 - position)
+                continue
+            children.append((position + 1, child_odds, child_gain, chosen + (position,)))
+        stats.visited += len(children)
+        stack.extend(reversed(children))
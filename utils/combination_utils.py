@@ -1,20 +1,82 @@
 import itertools
-from typing import List
+from typing import Iterator, List
 from models.bet import Bet
 from models.combination import Combination
+from models.combination_set import CombinationSet
+from models.betting_strategy import MAX_COMBINATIONS, get_risk_thresholds, select_top_combinations
+from .combination_engine import top_combinations
+from .combination_pruning import EnumerationStats, iter_pruned_combinations
+from .parallel_combinations import parallel_top_combinations
+from .prefix_enumeration import prefix_combination_set
 
-def generate_combinations(bets: List[Bet], strategy_type: str, risk_preference: str, folds: int = None, max_combination_size: int = None) -> List[Combination]:
-    """Generate bet combinations based on the strategy type."""
-    combinations = []
-    if strategy_type == "System":
-        max_size = folds or max_combination_size or len(bets)
-        min_size = {
-            "Conservative": 1,
-            "Moderate": 2,
-            "Aggressive": 3
-        }.get(risk_preference, 2)
-        for r in range(min_size, max_size + 1):
-            combinations.extend([Combination(list(combo)) for combo in itertools.combinations(bets, r)])
-    else:
-        combinations = [Combination(bets)]
-    return combinations
+
+def system_sizes(num_bets: int, risk_preference: str, folds: int = None, max_combination_size: int = None) -> range:
+    """Return the range of combination sizes enumerated in System mode."""
+    max_size = folds or max_combination_size or num_bets
+    min_size = {
+        "Conservative": 1,
+        "Moderate": 2,
+        "Aggressive": 3
+    }.get(risk_preference, 2)
+    return range(min_size, min(max_size, num_bets) + 1)
+
+
+def generate_combinations(bets: List[Bet], strategy_type: str, risk_preference: str, folds: int = None,
+                          max_combination_size: int = None, backend: str = "itertools",
+                          stats: EnumerationStats = None, workers: int = None,
+                          shard_by: str = "ranks") -> CombinationSet:
+    """Generate bet combinations based on the strategy type, as a `CombinationSet`.
+
+    Backends for System mode:
+    - "itertools": every subset, unfiltered.
+    - "prefix": every subset, unfiltered, walked in lexicographic order and
+      scored by extending the running products of the parent subset.
+    - "numpy": subsets scored as arrays; only the ones surviving
+      `BettingStrategy.filter_and_sort_combinations` are returned, sorted.
+    - "pruned": branch-and-bound enumeration (see `iter_pruned_combinations`)
+      streamed into the same top-K selection; `stats` receives its counters.
+    - "parallel": the "numpy" scoring split into shards (`shard_by` "ranks",
+      equal ranges of subsets, or "size" or "leading" leg) over a pool of
+      `workers` processes; same output as "numpy".
+    - "auto": "pruned" when the risk preference caps the combined odds,
+      "numpy" otherwise.
+    """
+    if strategy_type != "System":
+        return CombinationSet.from_legs(bets, [tuple(range(len(bets)))])
+
+    thresholds = get_risk_thresholds(risk_preference)
+    sizes = system_sizes(len(bets), risk_preference, folds, max_combination_size)
+    if backend == "auto":
+        backend = "numpy" if thresholds["max_combined_odds"] is None else "pruned"
+
+    if backend == "numpy":
+        return top_combinations(bets, sizes, thresholds, MAX_COMBINATIONS)
+    if backend == "parallel":
+        return parallel_top_combinations(bets, sizes, thresholds, MAX_COMBINATIONS, workers, shard_by)
+    if backend == "pruned":
+        return CombinationSet.from_combinations(select_top_combinations(
+            iter_pruned_combinations(bets, sizes, thresholds, stats), thresholds, MAX_COMBINATIONS
+        ), bets)
+    if backend == "prefix":
+        return prefix_combination_set(bets, sizes)
+    if backend != "itertools":
+        raise ValueError(f"Unknown combination backend: {backend}")
+
+    return CombinationSet.from_legs(
+        bets, itertools.chain.from_iterable(itertools.combinations(range(len(bets)), r) for r in sizes)
+    )
+
+
+def iter_combinations(bets: List[Bet], strategy_type: str, risk_preference: str, folds: int = None,
+                      max_combination_size: int = None, stats: EnumerationStats = None) -> Iterator[Combination]:
+    """Lazily yield candidate combinations, one at a time.
+
+    System subsets come from the pruned enumerator, so subsets that cannot pass
+    the risk thresholds are never built. Meant to be fed straight into
+    `BettingStrategy.filter_and_sort_combinations`.
+    """
+    if strategy_type != "System":
+        yield Combination(bets, tuple(range(len(bets))))
+        return
+    sizes = system_sizes(len(bets), risk_preference, folds, max_combination_size)
+    yield from iter_pruned_combinations(bets, sizes, get_risk_thresholds(risk_preference), stats)
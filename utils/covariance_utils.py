@@ -0,0 +1,42 @@
+import numpy as np
+from scipy import sparse
+
+from models.combination_set import CombinationSet
+
+# Probabilities are clipped to this floor before taking logs
+MIN_PROBABILITY = 1e-300
+
+
+def leg_incidence_matrix(combinations: CombinationSet) -> sparse.csr_matrix:
+    """Sparse combinations x bets 0/1 matrix; its columns are the leg -> combinations inverted index."""
+    rows, slots = np.nonzero(combinations.legs >= 0)
+    legs = combinations.legs[rows, slots].astype(np.intp)
+    return sparse.csr_matrix(
+        (np.ones(len(rows)), (rows, legs)), shape=(len(combinations), len(combinations.bets))
+    )
+
+
+def shared_leg_covariance(combinations: CombinationSet) -> sparse.csr_matrix:
+    """Exact covariance of the combinations' win indicators, as a sparse matrix.
+
+    Cov(A, B) = P(all legs of A and B win) - P(A) P(B) = P(A) P(B) (1 / P(A n B) - 1),
+    where A n B are the shared legs. With S the incidence matrix and
+    W = diag(-log p_leg), -log P(A n B) is (S W S^T)[A, B], so the covariance is
+    D_P expm1(S W S^T) D_P, non-zero only for combinations sharing a leg.
+
+    The matrix is cached on the set (until one of its bets is updated), so
+    the allocation and the charts of a strategy build it once; it must not
+    be modified.
+    """
+    if combinations.shared_covariance is not None:
+        return combinations.shared_covariance
+    probs = np.array([bet.confidence for bet in combinations.bets], dtype=np.float64)
+    weights = -np.log(np.clip(probs, MIN_PROBABILITY, 1.0))
+    incidence = leg_incidence_matrix(combinations)
+    shared = (incidence @ sparse.diags(weights) @ incidence.T).tocsr()
+    shared.data = np.expm1(shared.data)
+    scale = sparse.diags(combinations.combined_prob)
+    covariance = (scale @ shared @ scale).tocsr()
+    covariance.eliminate_zeros()
+    combinations.shared_covariance = covariance
+    return covariance
@@ -0,0 +1,139 @@
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+from models.combination_set import CombinationSet
+
+# Largest group of connected legs whose 2^k outcomes are enumerated (2^20 states ~ 8 MB per array)
+MAX_EXACT_LEGS = 20
+
+# Largest number of distinct P&L values kept while convolving independent groups
+MAX_SUPPORT = 2000000
+
+# P&L values are merged after rounding to this many decimals (far below a cent)
+VALUE_DECIMALS = 9
+
+
+@dataclass
+class PnLDistribution:
+    """Exact discrete distribution of a strategy's P&L: sorted distinct values and their probabilities."""
+    values: np.ndarray
+    probabilities: np.ndarray
+
+    @property
+    def mean(self) -> float:
+        return float(self.values @ self.probabilities)
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(max(((self.values - self.mean) ** 2) @ self.probabilities, 0.0)))
+
+    @property
+    def probability_of_loss(self) -> float:
+        return float(self.probabilities[self.values < 0].sum())
+
+    def quantile(self, q: float) -> float:
+        """Smallest value whose cumulative probability reaches `q`."""
+        cumulative = np.cumsum(self.probabilities)
+        return float(self.values[min(np.searchsorted(cumulative, q * cumulative[-1]), len(self.values) - 1)])
+
+    def value_at_risk(self, confidence_level: float) -> float:
+        """Loss exceeded with probability at most 1 - confidence_level, as a positive number."""
+        return -self.quantile(1 - confidence_level)
+
+    def conditional_value_at_risk(self, confidence_level: float) -> float:
+        """Mean loss over the worst 1 - confidence_level of the probability mass, as a positive number."""
+        tail = 1 - confidence_level
+        cutoff = self.quantile(tail)
+        below = self.values < cutoff
+        mass = self.probabilities[below].sum()
+        expected = self.values[below] @ self.probabilities[below] + (tail - mass) * cutoff
+        return -float(expected / tail)
+
+
+def merge_atoms(values: np.ndarray, probabilities: np.ndarray) -> PnLDistribution:
+    """Sort values and add up the probabilities of values equal after rounding."""
+    distinct, inverse = np.unique(np.round(values, VALUE_DECIMALS), return_inverse=True)
+    return PnLDistribution(distinct, np.bincount(inverse.ravel(), weights=probabilities, minlength=len(distinct)))
+
+
+def leg_groups(combinations: CombinationSet, rows: np.ndarray) -> List[np.ndarray]:
+    """Split the legs used by `rows` into groups connected through shared combinations.
+
+    Groups have independent outcomes, so their P&Ls are independent.
+    """
+    legs = combinations.legs[rows]
+    used = np.unique(legs[legs >= 0])
+    row_ids, slots = np.nonzero(legs >= 0)
+    incidence = sparse.csr_matrix(
+        (np.ones(len(row_ids)), (row_ids, np.searchsorted(used, legs[row_ids, slots]))),
+        shape=(len(rows), len(used)),
+    )
+    count, labels = connected_components(incidence.T @ incidence, directed=False)
+    return [used[labels == group] for group in range(count)]
+
+
+def group_distribution(combinations: CombinationSet, rows: np.ndarray, stakes: np.ndarray,
+                       group: np.ndarray) -> PnLDistribution:
+    """P&L distribution of the combinations in `rows`, whose legs are all in `group`.
+
+    Outcomes are bitmasks over the group's k legs. Their probabilities are
+    built one leg at a time, and a combination pays on every outcome
+    containing its mask, so the payout per outcome is a sum over subsets
+    (zeta transform), computed in k vectorized passes.
+    """
+    size = len(group)
+    if size > MAX_EXACT_LEGS:
+        raise ValueError(
+            f"{size} legs are linked by shared combinations; at most {MAX_EXACT_LEGS} can be enumerated exactly."
+        )
+    probabilities = np.ones(1)
+    for leg in group:
+        confidence = combinations.bets[leg].confidence
+        probabilities = np.concatenate([probabilities * (1 - confidence), probabilities * confidence])
+
+    legs = combinations.legs[rows]
+    bits = np.where(legs >= 0, np.left_shift(1, np.searchsorted(group, legs)), 0)
+    masks = np.bitwise_or.reduce(bits, axis=1)
+    payouts = np.bincount(masks, weights=stakes[rows] * combinations.combined_odds[rows], minlength=1 << size)
+    for bit in range(size):
+        # Outcomes with this leg won also collect the payouts of the same outcome with it lost
+        halves = payouts.reshape(-1, 2, 1 << bit)
+        halves[:, 1, :] += halves[:, 0, :]
+    return merge_atoms(payouts - stakes[rows].sum(), probabilities)
+
+
+def convolve(first: PnLDistribution, second: PnLDistribution) -> PnLDistribution:
+    """Distribution of the sum of two independent P&Ls."""
+    if len(first.values) * len(second.values) > MAX_SUPPORT:
+        raise ValueError("The exact P&L distribution has too many distinct values; use the Monte Carlo simulator.")
+    return merge_atoms(
+        np.add.outer(first.values, second.values).ravel(),
+        np.multiply.outer(first.probabilities, second.probabilities).ravel(),
+    )
+
+
+def exact_pnl_distribution(combinations: CombinationSet, stakes: np.ndarray) -> PnLDistribution:
+    """Exact P&L distribution of staking `stakes` on `combinations`.
+
+    Legs are split into groups that no staked combination links; each group's
+    outcomes are enumerated exactly and the independent group distributions
+    are convolved. Raises ValueError when a group has more than
+    MAX_EXACT_LEGS legs or the support grows beyond MAX_SUPPORT values.
+    """
+    stakes = np.asarray(stakes, dtype=np.float64)
+    staked = np.flatnonzero(stakes > 0)
+    distribution = PnLDistribution(np.zeros(1), np.ones(1))
+    if not len(staked):
+        return distribution
+
+    groups = leg_groups(combinations, staked)
+    # Each combination belongs to the group of its first leg
+    first_legs = combinations.legs[staked, 0]
+    for group in groups:
+        rows = staked[np.isin(first_legs, group)]
+        distribution = convolve(distribution, group_distribution(combinations, rows, stakes, group))
+    return distribution
@@ -0,0 +1,106 @@
+from dataclasses import dataclass
+from typing import Sequence, Tuple
+
+import numpy as np
+
+from models.combination_set import CombinationSet
+from .covariance_utils import shared_leg_covariance
+from .stake_allocation_utils import RISK_AVERSION, solve_structured_qp, water_fill
+
+# Risk aversions swept by default: log-spaced around the per-preference values
+DEFAULT_RISK_AVERSIONS = np.geomspace(0.1, 50.0, 40)
+
+
+@dataclass
+class Frontier:
+    """Mean-variance allocations for a sweep of risk aversions and budgets.
+
+    `weights[j]` is the optimal fraction of the budget on each combination for
+    `risk_aversions[j]`. Weights do not depend on the budget, so stakes for
+    every budget are a scaling of the same matrix.
+    """
+    risk_aversions: np.ndarray
+    budgets: np.ndarray
+    weights: np.ndarray
+    expected_returns: np.ndarray  # Expected profit per dollar staked, per risk aversion
+    variances: np.ndarray  # w.C.w of the allocation objective, per risk aversion
+    iterations: int = 1
+
+    @property
+    def stakes(self) -> np.ndarray:
+        """Stake matrix indexed by (budget, risk aversion, combination)."""
+        return self.budgets[:, None, None] * self.weights[None, :, :]
+
+    @property
+    def expected_profits(self) -> np.ndarray:
+        """Expected profit indexed by (budget, risk aversion)."""
+        return np.outer(self.budgets, self.expected_returns)
+
+    @property
+    def standard_deviations(self) -> np.ndarray:
+        """Risk (square root of the objective's variance term, in stake units) by (budget, risk aversion)."""
+        return np.outer(self.budgets, np.sqrt(np.maximum(self.variances, 0.0)))
+
+    def point(self, risk_preference: str) -> int:
+        """Index of the sweep point closest to the risk aversion used for `risk_preference`."""
+        target = RISK_AVERSION.get(risk_preference, 2.5)
+        return int(np.argmin(np.abs(np.log(self.risk_aversions) - np.log(target))))
+
+
+def portfolio_point(combinations: CombinationSet, stakes: np.ndarray,
+                    covariance: str = "diagonal") -> Tuple[float, float]:
+    """Expected profit and risk of given stakes, measured as on the frontier (same covariance model)."""
+    stakes = np.asarray(stakes, dtype=np.float64)
+    if covariance == "diagonal":
+        probabilities = combinations.combined_prob
+        variance = np.dot(stakes * stakes, probabilities * (1 - probabilities))
+    elif covariance == "shared_legs":
+        variance = stakes @ (shared_leg_covariance(combinations) @ stakes)
+    else:
+        raise ValueError(f"Unknown covariance model: {covariance}")
+    return float(stakes @ combinations.ev_per_dollar), float(np.sqrt(max(variance, 0.0)))
+
+
+def efficient_frontier(combinations: CombinationSet, risk_aversions: Sequence[float] = None,
+                       budgets: Sequence[float] = (1.0,), covariance: str = "diagonal") -> Frontier:
+    """Solve the stake allocation for every risk aversion in one batch.
+
+    With the diagonal covariance, each point is the water-filling problem with
+    curvature 2 * risk_aversion * variance; all points are solved in a single
+    vectorized `water_fill` pass. With `covariance="shared_legs"` the sparse
+    covariance is built once and the points are solved in increasing risk
+    aversion, each warm-started from the previous solution; the matrix is
+    the one cached on `combinations` when the allocation already built it.
+    """
+    risk_aversions = np.asarray(DEFAULT_RISK_AVERSIONS if risk_aversions is None else risk_aversions,
+                                dtype=np.float64)
+    if np.any(risk_aversions <= 0):
+        raise ValueError("Risk aversions must be positive.")
+    budgets = np.atleast_1d(np.asarray(budgets, dtype=np.float64))
+    returns = combinations.ev_per_dollar
+    probabilities = combinations.combined_prob
+    variances = probabilities * (1 - probabilities)
+
+    if not len(combinations):
+        empty = np.zeros(len(risk_aversions))
+        return Frontier(risk_aversions, budgets, np.zeros((len(risk_aversions), 0)), empty, empty, 0)
+    if covariance == "diagonal":
+        # Riskless combinations get a tiny curvature, i.e. they fill up first when profitable
+        curvature = 2.0 * risk_aversions[:, None] * np.maximum(variances, np.finfo(float).tiny)[None, :]
+        weights = water_fill(returns, curvature)
+        portfolio_variances = np.sum(weights * weights * variances, axis=1)
+        iterations = 1
+    elif covariance == "shared_legs":
+        matrix = shared_leg_covariance(combinations)
+        weights = np.empty((len(risk_aversions), len(combinations)))
+        iterations = 0
+        previous = None
+        for point in np.argsort(risk_aversions, kind="stable"):
+            previous, used = solve_structured_qp(returns, matrix, risk_aversions[point], previous)
+            weights[point] = previous
+            iterations += used
+        portfolio_variances = np.einsum("ij,ij->i", weights, (matrix @ weights.T).T)
+    else:
+        raise ValueError(f"Unknown covariance model: {covariance}")
+
+    return Frontier(risk_aversions, budgets, weights, weights @ returns, portfolio_variances, iterations)
@@ -1,3 +1,32 @@
+import numpy as np
+from scipy import linalg, sparse
+
+from models.combination_set import CombinationSet
+
+# Fraction of the full Kelly stake used for each risk preference
+RISK_FRACTION = {
+    "Conservative": 0.25,
+    "Moderate": 0.5,
+    "Aggressive": 1.0
+}
+
+# Bookmaker margin taken off the combined odds before sizing
+DEFAULT_MARGIN = 0.05
+
+# Up to this many distinct legs every joint outcome is enumerated; above it outcomes are sampled
+EXACT_OUTCOME_LEGS = 14
+OUTCOME_SAMPLES = 16384
+# Outcomes are int64 bitmasks over the legs
+MAX_OUTCOME_LEGS = 62
+
+# Convergence tolerance of the simultaneous optimizer and Newton step cap per barrier weight
+KELLY_TOLERANCE = 1e-9
+KELLY_NEWTON_STEPS = 50
+
+# Win matrices with fewer non-zeros than this share are handled as sparse matrices
+SPARSE_DENSITY = 0.2
+
+
 def kelly_criterion(odds: float, probability: float, fraction: float = 1.0) -> float:
     """Calculate the Kelly fraction with optional scaling."""
     b = odds - 1
@@ -7,3 +36,147 @@ def kelly_criterion(odds: float, probability: float, fraction: float = 1.0) -> f
         return 0.0
     kelly = (b * p - q) / b
     return max(fraction * kelly, 0.0)
+
+
+def kelly_fractions(odds, probabilities, fraction: float = 1.0) -> np.ndarray:
+    """Vectorized `kelly_criterion` over arrays of decimal odds and probabilities."""
+    odds = np.asarray(odds, dtype=np.float64)
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    b = odds - 1
+    valid = (b > 0) & (probabilities > 0) & (probabilities < 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        kelly = (b * probabilities - (1 - probabilities)) / b
+    return np.where(valid, np.maximum(fraction * kelly, 0.0), 0.0)
+
+
+def get_risk_fraction(risk_preference: str) -> float:
+    return RISK_FRACTION.get(risk_preference, 0.5)
+
+
+def joint_outcomes(combinations: CombinationSet, seed: int = 0):
+    """Win matrix of the combinations over the joint outcomes of their legs.
+
+    Returns `(wins, weights)`: `wins[s, i]` is True when combination i wins in
+    outcome s and `weights` are the outcome probabilities. All 2^k outcomes of
+    the k legs in use are enumerated when k <= EXACT_OUTCOME_LEGS; otherwise
+    OUTCOME_SAMPLES outcomes are drawn with equal weights. Outcomes with the
+    same win pattern are merged, adding up their probabilities.
+    """
+    used = np.unique(combinations.legs[combinations.legs >= 0])
+    if len(used) > MAX_OUTCOME_LEGS:
+        raise ValueError(f"Simultaneous Kelly supports at most {MAX_OUTCOME_LEGS} distinct bets.")
+    probs = np.array([combinations.bets[leg].confidence for leg in used], dtype=np.float64)
+    # Combination -> bitmask over the used legs
+    position = np.full(len(combinations.bets), -1, dtype=np.int64)
+    position[used] = np.arange(len(used))
+    bits = np.where(combinations.legs >= 0, np.left_shift(1, position[combinations.legs]), 0)
+    masks = np.bitwise_or.reduce(bits, axis=1) if len(combinations) else np.zeros(0, dtype=np.int64)
+
+    if len(used) <= EXACT_OUTCOME_LEGS:
+        outcomes = np.arange(1 << len(used), dtype=np.int64)
+        won = (outcomes[:, None] >> np.arange(len(used))) & 1
+        weights = np.prod(np.where(won == 1, probs, 1 - probs), axis=1)
+    else:
+        rng = np.random.default_rng(seed)
+        won = (rng.random((OUTCOME_SAMPLES, len(used))) < probs).astype(np.int64)
+        outcomes = won @ np.left_shift(1, np.arange(len(used), dtype=np.int64))
+        weights = np.full(OUTCOME_SAMPLES, 1.0 / OUTCOME_SAMPLES)
+    wins = (outcomes[:, None] & masks[None, :]) == masks[None, :]
+    patterns, inverse = np.unique(np.packbits(wins, axis=1), axis=0, return_inverse=True)
+    merged = np.bincount(inverse.ravel(), weights=weights, minlength=len(patterns))
+    return np.unpackbits(patterns, axis=1, count=len(combinations)).astype(bool), merged
+
+
+def simultaneous_kelly(odds: np.ndarray, wins: np.ndarray, weights: np.ndarray):
+    """Maximize the expected log-growth sum_s weights[s] * log(wealth_s(f)).
+
+    wealth_s(f) = 1 - sum(f) + sum_i odds_i * f_i * wins[s, i], over
+    {f >= 0, sum(f) <= 1} (the unstaked remainder is kept). The optimum often
+    sits next to the boundary where some outcome's wealth nearly vanishes,
+    which stalls first-order methods, so this is a log-barrier method: Newton
+    steps on the growth plus barrier_weight * (sum(log f) + log(1 - sum(f))),
+    with the barrier weight shrunk until it is below KELLY_TOLERANCE.
+    Returns `(fractions, newton_steps)`.
+    """
+    count = len(odds)
+    possible = weights > 0
+    payouts = wins[possible] * odds
+    if np.count_nonzero(payouts) < SPARSE_DENSITY * payouts.size:
+        payouts = sparse.csr_matrix(payouts)
+    weights = weights[possible]
+    if count == 0:
+        return np.zeros(0), 0
+
+    def barrier_value(fractions, barrier_weight):
+        cash = 1.0 - fractions.sum()
+        wealth = cash + payouts @ fractions
+        if cash <= 0 or np.any(fractions <= 0) or np.any(wealth <= 0):
+            return -np.inf
+        return weights @ np.log(wealth) + barrier_weight * (np.log(fractions).sum() + np.log(cash))
+
+    fractions = np.full(count, 0.5 / count)
+    barrier_weight = 1e-3
+    steps = 0
+    while True:
+        for _ in range(KELLY_NEWTON_STEPS):
+            cash = 1.0 - fractions.sum()
+            wealth = cash + payouts @ fractions
+            marginal = weights / wealth
+            curvature = weights / wealth ** 2
+            gradient = payouts.T @ marginal - marginal.sum() + barrier_weight * (1.0 / fractions - 1.0 / cash)
+            # Negated Hessian: A^T diag(curvature) A with A = payouts - 1, plus the barrier terms
+            weighted = payouts.T @ sparse.diags(curvature) if sparse.issparse(payouts) else payouts.T * curvature
+            column = np.asarray(weighted.sum(axis=1)).ravel()
+            hessian = weighted @ payouts
+            if sparse.issparse(hessian):
+                hessian = hessian.toarray()
+            hessian -= column[:, None] + column[None, :]
+            hessian += curvature.sum() + barrier_weight / cash ** 2
+            hessian[np.diag_indices(count)] += barrier_weight / fractions ** 2
+            direction = linalg.solve(hessian, gradient, assume_a="pos")
+            decrement = gradient @ direction
+            steps += 1
+            if decrement < KELLY_TOLERANCE:
+                break
+            # Largest step keeping the fractions and cash positive, then backtrack
+            shrinking = direction < 0
+            limit = np.min(-fractions[shrinking] / direction[shrinking], initial=np.inf)
+            if direction.sum() > 0:
+                limit = min(limit, cash / direction.sum())
+            step = min(1.0, 0.99 * limit)
+            value = barrier_value(fractions, barrier_weight)
+            while barrier_value(fractions + step * direction, barrier_weight) < value + 0.25 * step * decrement:
+                step /= 2.0
+                if step < 1e-12:
+                    break
+            fractions = fractions + step * direction
+        if barrier_weight * (count + 1) < KELLY_TOLERANCE:
+            break
+        barrier_weight /= 100.0
+    # Fractions held up only by the barrier are zero
+    fractions[fractions < KELLY_TOLERANCE] = 0.0
+    return fractions, steps
+
+
+def kelly_stakes(combinations: CombinationSet, risk_preference: str, simultaneous: bool = True,
+                 margin: float = DEFAULT_MARGIN, seed: int = 0):
+    """Fraction of the budget staked on each combination under the Kelly criterion.
+
+    Odds are reduced by `margin` and the full-Kelly fractions scaled by the
+    risk preference's fraction. Independent fractions are normalized to the
+    whole budget, as the per-combination allocation always did; simultaneous
+    ones maximize the joint log-growth and may leave part of the budget
+    unstaked. Also stores the fractions in `combinations.kelly_fraction`.
+    Returns `(weights, iterations)`.
+    """
+    adjusted_odds = combinations.combined_odds * (1 - margin)
+    fraction = get_risk_fraction(risk_preference)
+    if not simultaneous:
+        combinations.kelly_fraction[:] = kelly_fractions(adjusted_odds, combinations.combined_prob, fraction)
+        total = combinations.kelly_fraction.sum()
+        return (combinations.kelly_fraction / total if total > 0 else np.zeros(len(combinations))), 1
+
+    wins, weights = joint_outcomes(combinations, seed)
+    full_kelly, iterations = simultaneous_kelly(adjusted_odds, wins, weights)
+    combinations.kelly_fraction[:] = fraction * full_kelly
+    return combinations.kelly_fraction.copy(), iterations
@@ -0,0 +1,108 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict
+
+import numpy as np
+
+from models.combination_set import CombinationSet
+
+# Trials simulated by default, and per chunk (bounds the trials x legs and trials x combinations matrices)
+DEFAULT_TRIALS = 100000
+CHUNK_TRIALS = 16384
+
+# Quantiles of the P&L reported by default, and the confidence level of VaR / CVaR
+DEFAULT_QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+CONFIDENCE_LEVEL = 0.95
+
+
+@dataclass
+class SimulationResult:
+    """Bankroll P&L distribution of a strategy over simulated leg outcomes.
+
+    VaR and CVaR are reported as positive losses at `confidence_level`: the loss
+    exceeded in only 1 - confidence_level of the trials, and the mean loss over
+    those worst trials.
+    """
+    trials: int
+    mean: float
+    std: float
+    quantiles: Dict[float, float]
+    probability_of_loss: float
+    value_at_risk: float
+    conditional_value_at_risk: float
+    confidence_level: float
+    pnl: np.ndarray = None
+
+
+def summarize_pnl(pnl: np.ndarray, quantiles=DEFAULT_QUANTILES, confidence_level: float = CONFIDENCE_LEVEL,
+                  keep_samples: bool = False) -> SimulationResult:
+    """Summary statistics of simulated P&L values."""
+    tail = int(np.ceil((1 - confidence_level) * len(pnl)))
+    worst = np.partition(pnl, tail - 1)[:tail] if tail else pnl[:0]
+    cutoff = float(np.quantile(pnl, 1 - confidence_level))
+    return SimulationResult(
+        trials=len(pnl),
+        mean=float(pnl.mean()),
+        std=float(pnl.std()),
+        quantiles={q: float(value) for q, value in zip(quantiles, np.quantile(pnl, quantiles))},
+        probability_of_loss=float(np.mean(pnl < 0)),
+        value_at_risk=-cutoff,
+        conditional_value_at_risk=-float(worst.mean()) if tail else -cutoff,
+        confidence_level=confidence_level,
+        pnl=pnl if keep_samples else None,
+    )
+
+
+def _simulate_chunk(args) -> np.ndarray:
+    """Worker entry point: P&L of one chunk of trials.
+
+    Legs are drawn as a trials x legs boolean matrix; multiplying the lost legs
+    by the legs x combinations incidence matrix counts each combination's lost
+    legs, and the combinations with none pay out.
+    """
+    probabilities, incidence, payouts, total_stake, trials, seed = args
+    rng = np.random.default_rng(seed)
+    lost = rng.random((trials, len(probabilities))) >= probabilities
+    won = (lost.astype(np.float32) @ incidence) == 0
+    return won @ payouts - total_stake
+
+
+def simulate_strategy(combinations: CombinationSet, stakes: np.ndarray, trials: int = DEFAULT_TRIALS,
+                      seed: int = None, chunk_size: int = CHUNK_TRIALS, workers: int = 1,
+                      quantiles=DEFAULT_QUANTILES, confidence_level: float = CONFIDENCE_LEVEL,
+                      keep_samples: bool = False) -> SimulationResult:
+    """Simulate the bankroll P&L of staking `stakes` on `combinations`.
+
+    Each leg wins independently with its bet's confidence. Trials are split
+    into chunks of `chunk_size`, each with its own generator spawned from
+    `SeedSequence(seed)`, so the result for a given seed does not depend on
+    `workers`; with `workers` > 1 the chunks run on a process pool. Raises
+    ValueError when `trials` is less than 1.
+    """
+    if trials < 1:
+        raise ValueError(f"Number of trials must be at least 1 (got {trials}).")
+    stakes = np.asarray(stakes, dtype=np.float64)
+    staked = np.flatnonzero(stakes > 0)
+    legs = combinations.legs[staked]
+    used = np.unique(legs[legs >= 0])
+    probabilities = np.array([combinations.bets[leg].confidence for leg in used], dtype=np.float64)
+
+    incidence = np.zeros((len(used), len(staked)), dtype=np.float32)
+    rows, slots = np.nonzero(legs >= 0)
+    incidence[np.searchsorted(used, legs[rows, slots]), rows] = 1.0
+    payouts = stakes[staked] * combinations.combined_odds[staked]
+    total_stake = float(stakes[staked].sum())
+
+    counts = [min(chunk_size, trials - start) for start in range(0, trials, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(counts))
+    tasks = [(probabilities, incidence, payouts, total_stake, count, chunk_seed)
+             for count, chunk_seed in zip(counts, seeds)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) <= 1:
+        chunks = [_simulate_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            chunks = list(executor.map(_simulate_chunk, tasks))
+
+    return summarize_pnl(np.concatenate(chunks), quantiles, confidence_level, keep_samples)
@@ -0,0 +1,311 @@
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from data.bets_data import CONFIDENCE_MAPPING
+from models.betting_strategy import BettingStrategy
+from .allocation_cache import AllocationCache
+from .stake_allocation_utils import allocate_stakes
+
+# Time (seconds) a batch stays open after its first tick, so bursts are applied together
+DEBOUNCE_INTERVAL = 0.05
+
+# Most distinct bets applied in one batch
+MAX_BATCH_SIZE = 256
+
+# Ticks waiting to be batched; when full, sockets drop the oldest tick and files wait
+QUEUE_SIZE = 10000
+
+# Latencies kept for the percentile metrics
+LATENCY_WINDOW = 10000
+
+# Interval (seconds) between polls of a tailed file at end of file
+POLL_INTERVAL = 0.05
+
+
+@dataclass
+class OddsTick:
+    """One odds update for a bet, identified by name.
+
+    `received` is the wall-clock time the tick entered the feed, or the
+    source's own `timestamp` when the feed line gives one, so latencies are
+    measured end to end.
+    """
+    name: str
+    odds: Optional[float] = None
+    confidence: Optional[float] = None
+    received: float = field(default_factory=time.time)
+
+
+def parse_tick(line) -> OddsTick:
+    """Parse one JSON line `{"name", "odds", "confidence"?, "timestamp"?}` (raises ValueError).
+
+    The confidence is a label of `CONFIDENCE_MAPPING` or a probability between 0 and 1.
+    """
+    data = json.loads(line)
+    if not isinstance(data, dict):
+        raise ValueError("Tick must be a JSON object.")
+    name = data.get("name")
+    name = "" if name is None else str(name).strip()
+    if not name:
+        raise ValueError("Tick has no bet name.")
+
+    odds = data.get("odds")
+    if odds is not None:
+        odds = float(odds)
+        if not (math.isfinite(odds) and odds > 1.0):
+            raise ValueError("Odds must be greater than 1.0.")
+
+    confidence = data.get("confidence")
+    if isinstance(confidence, str) and confidence.strip() in CONFIDENCE_MAPPING:
+        confidence = CONFIDENCE_MAPPING[confidence.strip()]
+    elif confidence is not None:
+        confidence = float(confidence)
+        if not (math.isfinite(confidence) and 0.0 < confidence <= 1.0):
+            raise ValueError("Confidence must be one of the labels or a probability between 0 and 1.")
+
+    if odds is None and confidence is None:
+        raise ValueError("Tick changes neither the odds nor the confidence.")
+    timestamp = data.get("timestamp")
+    return OddsTick(name, odds, confidence, float(timestamp) if timestamp is not None else time.time())
+
+
+@dataclass
+class FeedMetrics:
+    """Counters of an odds feed.
+
+    Every received tick ends up in exactly one of `applied`, `merged` (replaced
+    by a later tick for the same bet within its batch), `unchanged`,
+    `unknown` (no bet of that name), `invalid` or `dropped` (the oldest queued
+    tick, when a socket client found the queue full).
+    """
+    received: int = 0
+    applied: int = 0
+    merged: int = 0
+    unchanged: int = 0
+    unknown: int = 0
+    invalid: int = 0
+    dropped: int = 0
+    batches: int = 0
+    allocation_iterations: int = 0
+    latencies: deque = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW), repr=False)
+
+    def latency_percentiles(self, percentiles=(50, 90, 99)) -> Dict[str, float]:
+        """Tick-to-allocation latency percentiles in milliseconds (empty before the first batch)."""
+        if not self.latencies:
+            return {}
+        values = np.percentile(np.fromiter(self.latencies, dtype=np.float64), percentiles) * 1000.0
+        return {f"p{p:g}": float(value) for p, value in zip(percentiles, values)}
+
+    def stats(self) -> dict:
+        counts = {name: value for name, value in vars(self).items() if name != "latencies"}
+        return {**counts, "latency_ms": self.latency_percentiles()}
+
+
+@dataclass
+class OddsFeedProcessor:
+    """Applies a stream of odds ticks to a strategy, re-scoring and re-allocating per batch.
+
+    Ticks are queued by `submit`; `run` waits for a tick, keeps the batch open
+    for `debounce` seconds (or until `max_batch` distinct bets), keeps the last
+    tick of each bet, then re-scores every changed bet with one re-filtering
+    and re-allocates warm-started from the previous stakes. Batches are
+    applied in a worker thread, so ticks arriving meanwhile are queued and
+    merged into the next batch. `on_update(strategy, ticks)` is called after
+    each applied batch.
+
+    As with `BettingStrategy.rescore_bet`, the candidate pool the strategy was
+    filtered from is re-scored, so combinations dropped by one batch come back
+    once their prices recover; subsets outside the pool need a full re-run.
+    """
+    strategy: BettingStrategy
+    debounce: float = DEBOUNCE_INTERVAL
+    max_batch: int = MAX_BATCH_SIZE
+    queue_size: int = QUEUE_SIZE
+    method: str = "mean_variance"
+    covariance: str = "shared_legs"
+    cache: Optional[AllocationCache] = None
+    on_update: Optional[Callable[[BettingStrategy, List[OddsTick]], None]] = None
+    metrics: FeedMetrics = field(default_factory=FeedMetrics)
+    _queue: Optional[asyncio.Queue] = field(default=None, repr=False)
+    _busy: bool = field(default=False, repr=False)
+
+    @property
+    def queue(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue(self.queue_size)
+        return self._queue
+
+    def submit(self, tick: OddsTick) -> bool:
+        """Queue a tick without waiting; when the queue is full the oldest queued tick is dropped (and counted).
+
+        Returns False when a tick was dropped.
+        """
+        self.metrics.received += 1
+        dropped = self.queue.full()
+        if dropped:
+            self.queue.get_nowait()
+            self.metrics.dropped += 1
+        self.queue.put_nowait(tick)
+        return not dropped
+
+    async def put(self, tick: OddsTick):
+        """Queue a tick, waiting for room when the queue is full, so the source is slowed down instead."""
+        self.metrics.received += 1
+        await self.queue.put(tick)
+
+    def parse_line(self, line) -> Optional[OddsTick]:
+        """Parse one JSON line; invalid lines are counted (as received and invalid) and give None."""
+        try:
+            return parse_tick(line)
+        except (TypeError, ValueError):
+            self.metrics.received += 1
+            self.metrics.invalid += 1
+            return None
+
+    def submit_line(self, line) -> bool:
+        """Parse and queue one JSON line with `submit`; invalid lines are counted, not raised."""
+        tick = self.parse_line(line)
+        return tick is not None and self.submit(tick)
+
+    async def put_line(self, line):
+        """Parse and queue one JSON line with `put`; invalid lines are counted, not raised."""
+        tick = self.parse_line(line)
+        if tick is not None:
+            await self.put(tick)
+
+    async def next_batch(self) -> Dict[str, OddsTick]:
+        """Wait for a tick and collect the ticks following it within the debounce window."""
+        first = await self.queue.get()
+        self._busy = True
+        batch = {first.name: first}
+        deadline = time.monotonic() + self.debounce
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                tick = await asyncio.wait_for(self.queue.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            previous = batch.get(tick.name)
+            if previous is not None:
+                self.metrics.merged += 1
+                # Keep the earliest receipt time, so the latency covers the whole wait
+                tick = OddsTick(
+                    tick.name,
+                    tick.odds if tick.odds is not None else previous.odds,
+                    tick.confidence if tick.confidence is not None else previous.confidence,
+                    min(tick.received, previous.received),
+                )
+            batch[tick.name] = tick
+        return batch
+
+    def apply(self, batch: Dict[str, OddsTick]) -> List[OddsTick]:
+        """Re-score and re-allocate the strategy for one batch; returns the ticks applied."""
+        combinations = self.strategy.combinations
+        legs = {bet.name: leg for leg, bet in enumerate(combinations.bets)}
+        updates, applied = {}, []
+        for name, tick in batch.items():
+            leg = legs.get(name)
+            if leg is None:
+                self.metrics.unknown += 1
+                continue
+            bet = combinations.bets[leg]
+            if tick.odds in (None, bet.odds) and tick.confidence in (None, bet.confidence):
+                self.metrics.unchanged += 1
+                continue
+            updates[leg] = (tick.odds, tick.confidence)
+            applied.append(tick)
+        if not updates:
+            return applied
+
+        self.strategy.rescore_bets(updates)
+        if self.strategy.combinations:
+            self.metrics.allocation_iterations += allocate_stakes(
+                self.strategy, initial_weights=self.strategy.stake_allocation,
+                covariance=self.covariance, cache=self.cache, method=self.method
+            )
+        now = time.time()
+        self.metrics.latencies.extend(now - tick.received for tick in applied)
+        self.metrics.applied += len(applied)
+        self.metrics.batches += 1
+        return applied
+
+    async def run(self):
+        """Apply batches until cancelled."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self.next_batch()
+            try:
+                applied = await loop.run_in_executor(None, self.apply, batch)
+            finally:
+                self._busy = False
+            if applied and self.on_update is not None:
+                self.on_update(self.strategy, applied)
+
+    async def drain(self):
+        """Wait until every queued tick has been applied (`run` must be running)."""
+        while self._busy or not self.queue.empty():
+            await asyncio.sleep(POLL_INTERVAL)
+
+
+async def tail_jsonl(processor: OddsFeedProcessor, path: str, from_start: bool = True,
+                     follow: bool = True, poll_interval: float = POLL_INTERVAL):
+    """Feed the JSON lines of a file to the processor, like `tail -f`.
+
+    Lines are read as they are appended; a partial last line waits for its
+    newline. With `follow=False` the file is replayed once and the coroutine
+    returns at end of file. Ticks are queued with `put`, so reading pauses
+    while the queue is full and a replay never drops ticks; control returns
+    to the event loop after each line so batches start while reading.
+    """
+    with open(path, "rb") as file:
+        if not from_start:
+            file.seek(0, 2)
+        pending = b""
+        while True:
+            chunk = file.readline()
+            if chunk:
+                pending += chunk
+                if pending.endswith(b"\n"):
+                    if pending.strip():
+                        await processor.put_line(pending)
+                        await asyncio.sleep(0)
+                    pending = b""
+                continue
+            if not follow:
+                if pending.strip():
+                    await processor.put_line(pending)
+                return
+            await asyncio.sleep(poll_interval)
+
+
+async def serve_socket(processor: OddsFeedProcessor, host: str = "127.0.0.1", port: int = 8766,
+                       unix_socket: str = None):
+    """Accept connections sending JSON lines and feed them to the processor; returns the server.
+
+    Clients are never blocked: when the queue is full, the oldest queued tick is dropped.
+    """
+    async def on_connection(reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    processor.submit_line(line)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    if unix_socket:
+        return await asyncio.start_unix_server(on_connection, path=unix_socket)
+    return await asyncio.start_server(on_connection, host, port)
@@ -0,0 +1,71 @@
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+from math import comb
+from typing import List
+
+from models.bet import Bet
+from models.combination_set import CombinationSet
+from .combination_engine import materialize, select_top_legs
+
+# Ways of splitting the System subset space into shards
+SHARD_STRATEGIES = ("ranks", "size", "leading")
+
+# Shards per worker with "ranks", so that uneven worker speeds even out
+SHARDS_PER_WORKER = 4
+
+
+def build_shards(num_bets: int, sizes: range, shard_by: str = "ranks", shards: int = 1) -> List[tuple]:
+    """Split the subsets into `(sizes, leading leg, ranks)` shards.
+
+    "ranks" cuts the subsets of all sizes into about `shards` ranges of
+    equally many subsets, as `(start, stop)` ranks within one size (see
+    `unrank_combinations`). "size" makes one shard per combination size and
+    "leading" one per first leg index, each covering every size; their
+    shards are as uneven as the binomial coefficients (the largest "leading"
+    shard holds about half of the subsets).
+    """
+    if shard_by == "ranks":
+        counts = {size: comb(num_bets, size) for size in sizes}
+        length = max(-(-sum(counts.values()) // max(shards, 1)), 1)
+        return [
+            ((size,), None, (start, min(start + length, count)))
+            for size, count in counts.items()
+            for start in range(0, count, length)
+        ]
+    if shard_by == "size":
+        return [((size,), None, None) for size in sizes]
+    if shard_by == "leading":
+        return [(tuple(sizes), leading, None) for leading in range(num_bets)]
+    raise ValueError(f"Unknown shard strategy: {shard_by}")
+
+
+def _score_shard(args) -> List[tuple]:
+    """Worker entry point: local top-K of one shard."""
+    bets, sizes, leading, ranks, thresholds, limit = args
+    return select_top_legs(bets, sizes, thresholds, limit, leading=leading, ranks=ranks)
+
+
+def parallel_top_combinations(bets: List[Bet], sizes: range, thresholds: dict, limit: int,
+                              workers: int = None, shard_by: str = "ranks") -> CombinationSet:
+    """Score the System subsets on a process pool and return the global top `limit`.
+
+    Each worker returns only the best `limit` rows of its shard under the
+    thresholds; since rows are ranked on a total order (EV, size, legs), the
+    merged result is identical to `top_combinations` on a single process.
+    The pool hands out shards one at a time, so with "ranks" a worker that
+    finishes early takes the next range.
+    """
+    workers = workers or os.cpu_count() or 1
+    tasks = [
+        (bets, shard_sizes, leading, ranks, thresholds, limit)
+        for shard_sizes, leading, ranks in build_shards(len(bets), sizes, shard_by, workers * SHARDS_PER_WORKER)
+    ]
+    if workers == 1 or len(tasks) <= 1:
+        shard_results = [_score_shard(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            shard_results = list(executor.map(_score_shard, tasks))
+
+    selected = heapq.nsmallest(limit, heapq.merge(*shard_results))
+    return materialize(bets, selected)
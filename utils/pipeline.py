@@ -0,0 +1,204 @@
+import time
+from dataclasses import dataclass
+from math import comb
+from typing import Callable, Dict, List, Optional
+
+from models.bet import Bet
+from models.combination_set import CombinationSet
+from models.betting_strategy import MAX_COMBINATIONS, BettingStrategy, get_risk_thresholds, select_top_combinations
+from .allocation_cache import AllocationCache
+from .combination_engine import iter_select_top_legs, materialize
+from .combination_pruning import EnumerationStats, iter_pruned_combinations
+from .combination_utils import generate_combinations, system_sizes
+from .stake_allocation_utils import allocate_stakes
+
+# Minimum time (seconds) between two progress reports while enumerating
+PROGRESS_INTERVAL = 0.1
+
+# Minimum time (seconds) between two partial results while enumerating
+PARTIAL_INTERVAL = 0.5
+
+# Candidates drawn from the pruned enumerator between two cancellation checks
+PRUNED_CHECK_INTERVAL = 4096
+
+# Settings used when neither the slate file, the request nor the command line gives them
+DEFAULT_SETTINGS = {
+    "total_budget": 100.0,
+    "strategy_type": "System",
+    "risk_preference": "Moderate",
+    "folds": None,
+    "allocation": "mean_variance",
+}
+
+
+class PipelineCancelled(Exception):
+    """Raised by `run_pipeline` when its cancellation check returns True."""
+
+
+@dataclass
+class PipelineProgress:
+    """Progress report of `run_pipeline`.
+
+    `stage` is "enumerating", "optimizing" or "done". While enumerating,
+    `enumerated` of `total` subsets have been scored and `kept` of them pass
+    the risk thresholds; `partial`, when set, is the current top-K with a
+    provisional closed-form allocation.
+    """
+    stage: str
+    enumerated: int = 0
+    total: int = 0
+    kept: int = 0
+    partial: Optional[BettingStrategy] = None
+
+
+def check_cancelled(cancelled: Optional[Callable[[], bool]]):
+    if cancelled is not None and cancelled():
+        raise PipelineCancelled("Strategy processing was cancelled.")
+
+
+def enumerate_with_progress(bets: List[Bet], strategy: BettingStrategy, backend: str,
+                            progress: Optional[Callable[[PipelineProgress], None]],
+                            cancelled: Optional[Callable[[], bool]]):
+    """Fill `strategy.combinations` with the System top-K, checking for cancellation as it goes.
+
+    The "pruned" backend ("auto" with capped combined odds) reports the
+    subsets walked or pruned so far, with the candidates it emitted as
+    `kept`. Any other backend is replaced by the chunked "numpy" scan (same
+    result). Both report a partial result whenever the top-K changed and
+    `PARTIAL_INTERVAL` has elapsed.
+    """
+    thresholds = get_risk_thresholds(strategy.risk_preference)
+    sizes = system_sizes(len(bets), strategy.risk_preference, strategy.folds)
+    total = sum(comb(len(bets), size) for size in sizes)
+    last_progress = last_partial = time.monotonic()
+
+    def partial_strategy(combinations: CombinationSet) -> BettingStrategy:
+        """Provisional strategy over the current top-K, with the closed-form diagonal allocation."""
+        partial = BettingStrategy(
+            strategy.total_budget, strategy.strategy_type, strategy.folds, strategy.risk_preference, combinations
+        )
+        allocate_stakes(partial, covariance="diagonal")
+        return partial
+
+    if backend == "pruned" or (backend == "auto" and thresholds["max_combined_odds"] is not None):
+        stats = EnumerationStats()
+        # Filled in place by select_top_combinations while it consumes `monitored`
+        heap = []
+
+        def monitored():
+            nonlocal last_progress, last_partial
+            partial_legs = None
+            for count, combo in enumerate(iter_pruned_combinations(bets, sizes, thresholds, stats)):
+                if count % PRUNED_CHECK_INTERVAL == 0:
+                    check_cancelled(cancelled)
+                    now = time.monotonic()
+                    if progress is not None and now - last_progress >= PROGRESS_INTERVAL:
+                        last_progress = now
+                        enumerated = min(stats.visited + stats.skipped, total)
+                        report = PipelineProgress("enumerating", enumerated, total, stats.emitted)
+                        legs = None
+                        if now - last_partial >= PARTIAL_INTERVAL:
+                            legs = sorted(entry[-1].legs for entry in heap)
+                        if heap and legs is not None and legs != partial_legs:
+                            last_partial, partial_legs = now, legs
+                            best = [entry[-1] for entry in sorted(heap, reverse=True)]
+                            report.partial = partial_strategy(CombinationSet.from_combinations(best, bets))
+                        progress(report)
+                yield combo
+
+        strategy.combinations = CombinationSet.from_combinations(
+            select_top_combinations(monitored(), thresholds, MAX_COMBINATIONS, heap), bets
+        )
+        check_cancelled(cancelled)
+        if progress is not None:
+            progress(PipelineProgress("enumerating", total, total, stats.emitted))
+        return
+
+    partial_rows = None
+    best = []
+    for scored, passed, best in iter_select_top_legs(bets, sizes, thresholds, MAX_COMBINATIONS):
+        check_cancelled(cancelled)
+        now = time.monotonic()
+        if progress is None or now - last_progress < PROGRESS_INTERVAL:
+            continue
+        last_progress = now
+        report = PipelineProgress("enumerating", scored, total, passed)
+        rows = sorted(best)
+        if best and now - last_partial >= PARTIAL_INTERVAL and rows != partial_rows:
+            last_partial, partial_rows = now, rows
+            report.partial = partial_strategy(materialize(bets, rows))
+        progress(report)
+    strategy.combinations = materialize(bets, sorted(best))
+    if progress is not None:
+        progress(PipelineProgress("enumerating", total, total, len(best)))
+
+
+def run_pipeline(bets: List[Bet], total_budget: float, strategy_type: str, risk_preference: str,
+                 folds: int = None, method: str = "mean_variance", covariance: str = "shared_legs",
+                 backend: str = "auto", cache: AllocationCache = None,
+                 progress: Callable[[PipelineProgress], None] = None,
+                 cancelled: Callable[[], bool] = None) -> BettingStrategy:
+    """Generate, filter and allocate a strategy, as the Process button does.
+
+    Raises ValueError with the message shown to the user when the inputs are
+    invalid or no combination passes the risk thresholds.
+
+    With a `progress` callback or a `cancelled` check (e.g. from a worker
+    thread), System combinations are enumerated by `enumerate_with_progress`;
+    `progress` receives `PipelineProgress` reports and PipelineCancelled is
+    raised once `cancelled()` returns True. The stake optimization itself is
+    not interrupted; cancellation is checked before and after it.
+    """
+    if total_budget <= 0:
+        raise ValueError("Total budget must be greater than zero.")
+    if not bets:
+        raise ValueError("Please enter at least one bet.")
+
+    # Generate combinations
+    strategy = BettingStrategy(total_budget, strategy_type, folds, risk_preference)
+    if strategy_type == "System" and (progress is not None or cancelled is not None):
+        enumerate_with_progress(bets, strategy, backend, progress, cancelled)
+    else:
+        strategy.combinations = generate_combinations(
+            bets, strategy_type, risk_preference, folds=folds, backend=backend
+        )
+
+    # Filter and sort combinations based on risk preference
+    strategy.filter_and_sort_combinations()
+    if not strategy.combinations:
+        raise ValueError("No suitable combinations found based on your risk preference.")
+
+    # Allocate stakes
+    check_cancelled(cancelled)
+    if progress is not None:
+        progress(PipelineProgress("optimizing", kept=len(strategy.combinations)))
+    allocate_stakes(strategy, covariance=covariance, cache=cache, method=method)
+    check_cancelled(cancelled)
+    if progress is not None:
+        progress(PipelineProgress("done", kept=len(strategy.combinations)))
+    return strategy
+
+
+def normalize_settings(settings: Dict) -> Dict:
+    """The `DEFAULT_SETTINGS` keys of `settings`, with defaults for the missing ones, in canonical form.
+
+    The budget becomes a float and the folds an int, or None outside System
+    strategies; other keys are ignored. Raises TypeError or ValueError when a
+    value cannot be converted.
+    """
+    settings = {key: settings.get(key, default) for key, default in DEFAULT_SETTINGS.items()}
+    settings["total_budget"] = float(settings["total_budget"])
+    if settings["strategy_type"] != "System" or not settings["folds"]:
+        settings["folds"] = None
+    else:
+        settings["folds"] = int(settings["folds"])
+    return settings
+
+
+def run_settings(bets: List[Bet], settings: Dict, **options) -> BettingStrategy:
+    """Run `run_pipeline` with slate settings (see `normalize_settings`); `options` are passed on."""
+    settings = normalize_settings(settings)
+    return run_pipeline(
+        bets, settings["total_budget"], settings["strategy_type"], settings["risk_preference"],
+        folds=settings["folds"], method=settings["allocation"], **options
+    )
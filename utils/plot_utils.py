@@ -0,0 +1,31 @@
+from typing import Tuple
+
+import numpy as np
+
+
+def decimate_line(y: np.ndarray, max_points: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Reduce a line to at most about `max_points` points without losing its envelope.
+
+    The samples are split into `max_points // 2` buckets and each bucket keeps
+    its minimum and maximum, in index order, so spikes stay visible. Returns
+    `(indices, values)`; short lines are returned whole.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    if len(y) <= max_points:
+        return np.arange(len(y)), y
+    buckets = np.array_split(np.arange(len(y)), max(max_points // 2, 1))
+    starts = np.array([bucket[0] for bucket in buckets])
+    lowest = starts + np.array([np.argmin(y[bucket]) for bucket in buckets])
+    highest = starts + np.array([np.argmax(y[bucket]) for bucket in buckets])
+    indices = np.unique(np.concatenate([lowest, highest, [0, len(y) - 1]]))
+    return indices, y[indices]
+
+
+def largest_slices(values: np.ndarray, limit: int) -> Tuple[np.ndarray, float]:
+    """Indices (in order) of the `limit` largest positive values, and the sum of the other positive values."""
+    values = np.asarray(values, dtype=np.float64)
+    positive = np.flatnonzero(values > 0)
+    if len(positive) <= limit:
+        return positive, 0.0
+    order = positive[np.argsort(-values[positive], kind="stable")]
+    return np.sort(order[:limit]), float(values[order[limit:]].sum())
@@ -0,0 +1,66 @@
+from typing import Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+from models.bet import Bet
+from models.combination_set import LEG_DTYPE, CombinationSet
+
+
+def iter_prefix_products(bets: List[Bet], size: int) -> Iterator[Tuple[Tuple[int, ...], float, float]]:
+    """Yield `(legs, combined_odds, combined_prob)` for every `size`-subset in lexicographic order.
+
+    The running products of each prefix are kept on a stack, so moving to the
+    next subset only re-multiplies the legs after the position that changed
+    (one multiply for most subsets) instead of the full product. The products
+    are accumulated in leg order, so they match `Combination` exactly.
+    """
+    count = len(bets)
+    if size < 1 or size > count:
+        return
+    odds = [bet.odds for bet in bets]
+    probs = [bet.confidence for bet in bets]
+
+    legs = list(range(size))
+    # odds_prefix[k] / prob_prefix[k]: products of the first k legs
+    odds_prefix = [1.0] * (size + 1)
+    prob_prefix = [1.0] * (size + 1)
+    changed = 0
+    while True:
+        for k in range(changed, size):
+            odds_prefix[k + 1] = odds_prefix[k] * odds[legs[k]]
+            prob_prefix[k + 1] = prob_prefix[k] * probs[legs[k]]
+        yield tuple(legs), odds_prefix[size], prob_prefix[size]
+
+        # Advance the rightmost leg that still has room, then reset the ones after it
+        position = size - 1
+        while position >= 0 and legs[position] == count - size + position:
+            position -= 1
+        if position < 0:
+            return
+        legs[position] += 1
+        for k in range(position + 1, size):
+            legs[k] = legs[k - 1] + 1
+        changed = position
+
+
+def prefix_combination_set(bets: List[Bet], sizes: Iterable[int]) -> CombinationSet:
+    """Build every subset of the given sizes as a `CombinationSet` using prefix products."""
+    sizes = list(sizes)
+    width = max(sizes, default=0)
+    blocks = []
+    odds_column = []
+    prob_column = []
+    for size in sizes:
+        flat = []
+        for legs, combined_odds, combined_prob in iter_prefix_products(bets, size):
+            flat.extend(legs)
+            odds_column.append(combined_odds)
+            prob_column.append(combined_prob)
+        block = np.full((len(flat) // size, width), -1, dtype=LEG_DTYPE)
+        block[:, :size] = np.array(flat, dtype=LEG_DTYPE).reshape(-1, size)
+        blocks.append(block)
+
+    legs = np.concatenate(blocks) if blocks else np.empty((0, 0), dtype=LEG_DTYPE)
+    return CombinationSet(
+        bets, legs, np.array(odds_column, dtype=np.float64), np.array(prob_column, dtype=np.float64)
+    )
@@ -1,36 +1,263 @@
 import numpy as np
 from scipy.optimize import minimize
 from models.betting_strategy import BettingStrategy
+from .allocation_cache import AllocationCache
+from .covariance_utils import shared_leg_covariance
+from .kelly_criterion import kelly_stakes
 
-def allocate_stakes(strategy: BettingStrategy):
-    """Allocate stakes using Mean-Variance Optimization."""
-    returns = np.array([combo.ev_per_dollar for combo in strategy.combinations])
-    probabilities = np.array([combo.combined_prob for combo in strategy.combinations])
+# Risk aversion parameter of the mean-variance objective for each risk preference
+RISK_AVERSION = {
+    "Conservative": 5.0,
+    "Moderate": 2.5,
+    "Aggressive": 1.0
+}
 
+# Convergence tolerance (max weight change) and iteration cap of the structured solver
+STRUCTURED_TOLERANCE = 1e-10
+STRUCTURED_MAX_ITERATIONS = 5000
+
+# Largest objective gap tolerated between the closed-form and SLSQP solutions when verifying,
+# relative to the magnitude of the objective and of the returns
+OBJECTIVE_TOLERANCE = 1e-8
+
+
+def get_risk_aversion(risk_preference: str) -> float:
+    return RISK_AVERSION.get(risk_preference, 2.5)
+
+
+def mean_variance_objective(weights, returns, variances, risk_aversion):
+    """Negative expected return plus the risk penalty, for a diagonal covariance."""
+    return -np.dot(weights, returns) + risk_aversion * np.dot(weights * variances, weights)
+
+
+def water_fill(targets: np.ndarray, curvature: np.ndarray, total: float = 1.0) -> np.ndarray:
+    """Return w = clip((targets + nu) / curvature, 0, 1) with nu chosen so that sum(w) == total.
+
+    Each weight is a clipped linear function of nu, so sum(w) is piecewise
+    linear and non-decreasing with breakpoints where a weight leaves 0
+    (nu = -target) or reaches 1 (nu = curvature - target). Sorting the
+    breakpoints and sweeping them finds the crossing segment in O(n log n).
+
+    Leading dimensions are batch dimensions: each row along the last axis is
+    an independent problem (with its own nu), solved in the same vectorized pass.
+    """
+    targets, curvature = np.broadcast_arrays(
+        np.asarray(targets, dtype=np.float64), np.asarray(curvature, dtype=np.float64)
+    )
+    count = targets.shape[-1]
+    slopes = 1.0 / curvature
+    points = np.concatenate([-targets, curvature - targets], axis=-1)
+    order = np.argsort(points, axis=-1, kind="stable")
+
+    def sweep(lower, upper):
+        return np.take_along_axis(np.concatenate([lower, upper], axis=-1), order, axis=-1)
+
+    # Events at each breakpoint: change in slope, intercept and number of weights at 1
+    slope = np.cumsum(sweep(slopes, -slopes), axis=-1)
+    intercept = np.cumsum(sweep(targets * slopes, -targets * slopes), axis=-1)
+    capped = np.cumsum(sweep(np.zeros_like(targets), np.ones_like(targets)), axis=-1)
+    sums = slope * np.take_along_axis(points, order, axis=-1) + intercept + capped
+
+    # The first breakpoint has every weight at 0, so the crossing lies after it
+    reached = sums >= total
+    crossing = np.where(reached[..., -1], np.argmax(reached, axis=-1), 2 * count - 1)
+    segment = np.maximum(crossing - 1, 0)[..., None]
+
+    def at_segment(values):
+        return np.take_along_axis(values, segment, axis=-1)
+
+    nu = (total - at_segment(capped) - at_segment(intercept)) / at_segment(slope)
+    weights = np.clip((targets + nu) * slopes, 0.0, 1.0)
+
+    # Re-solve nu on the final active set to remove the rounding of the running sums
+    free = (weights > 0) & (weights < 1)
+    free_slope = np.sum(slopes, axis=-1, keepdims=True, where=free)
+    resolved = (
+        total - np.count_nonzero(weights >= 1, axis=-1, keepdims=True)
+        - np.sum(targets * slopes, axis=-1, keepdims=True, where=free)
+    ) / np.where(free_slope > 0, free_slope, 1.0)
+    nu = np.where(free_slope > 0, resolved, nu)
+    return np.clip((targets + nu) * slopes, 0.0, 1.0)
+
+
+def solve_diagonal_qp(returns: np.ndarray, variances: np.ndarray, risk_aversion: float) -> np.ndarray:
+    """Exact minimizer of the mean-variance objective over sum(w) == 1, 0 <= w <= 1.
+
+    With a diagonal covariance the KKT conditions give
+    w_i = clip((r_i + nu) / (2 * risk_aversion * v_i), 0, 1), so the whole
+    problem reduces to finding the Lagrange multiplier nu.
+    """
+    return water_fill(returns, 2.0 * risk_aversion * variances)
+
+
+def solve_slsqp(returns, variances, risk_aversion, initial_guess):
+    """Generic SLSQP solve of the same problem. Returns `(weights, iterations)`."""
     # Calculate covariance matrix (assuming independence)
-    covariance_matrix = np.diag(probabilities * (1 - probabilities))
+    covariance_matrix = np.diag(variances)
 
     # Objective function: minimize negative expected return adjusted for risk
     def objective(weights):
         portfolio_return = np.dot(weights, returns)
         portfolio_variance = np.dot(weights.T, np.dot(covariance_matrix, weights))
-        # Risk aversion parameter
-        risk_aversion = {
-            "Conservative": 5.0,
-            "Moderate": 2.5,
-            "Aggressive": 1.0
-        }.get(strategy.risk_preference, 2.5)
         return -portfolio_return + risk_aversion * portfolio_variance
 
     # Constraints: weights sum to 1, weights >= 0
     constraints = [{'type': 'eq', 'fun': lambda weights: np.sum(weights) - 1}]
-    bounds = [(0, 1) for _ in strategy.combinations]
-    initial_guess = np.array([1.0 / len(strategy.combinations)] * len(strategy.combinations))
+    bounds = [(0, 1)] * len(returns)
 
     result = minimize(objective, initial_guess, bounds=bounds, constraints=constraints)
 
     if not result.success:
         raise ValueError("Optimization failed: " + result.message)
+    return result.x, result.nit
+
+
+def solve_structured_qp(returns, covariance, risk_aversion, initial_weights=None):
+    """Minimize -r.w + risk_aversion * w.C.w over sum(w) == 1, 0 <= w <= 1 for a sparse C.
+
+    Accelerated projected gradient (FISTA): every iteration costs one sparse
+    product with C plus an exact projection onto the constraint set, which is
+    the same water-filling problem as the diagonal case. The step uses the
+    Gershgorin bound on the largest eigenvalue of C. The momentum is reset
+    whenever it points uphill (adaptive restart), which keeps the solver from
+    oscillating on ill-conditioned problems. Starts from the exact diagonal
+    solution unless `initial_weights` is given.
+    Returns `(weights, iterations)`.
+    """
+    variances = covariance.diagonal()
+    if initial_weights is None:
+        weights = solve_diagonal_qp(returns, np.maximum(variances, np.finfo(float).tiny), risk_aversion)
+    else:
+        weights = water_fill(np.asarray(initial_weights, dtype=np.float64), np.ones(len(returns)))
+
+    lipschitz = 2.0 * risk_aversion * max(abs(covariance).sum(axis=1).max(), np.finfo(float).tiny)
+    step = 1.0 / lipschitz
+    ones = np.ones(len(returns))
+    momentum_point = weights
+    momentum = 1.0
+    for iteration in range(1, STRUCTURED_MAX_ITERATIONS + 1):
+        gradient = -returns + 2.0 * risk_aversion * (covariance @ momentum_point)
+        next_weights = water_fill(momentum_point - step * gradient, ones)
+        if np.dot(momentum_point - next_weights, next_weights - weights) > 0:
+            next_momentum = 1.0
+            momentum_point = next_weights
+        else:
+            next_momentum = (1.0 + np.sqrt(1.0 + 4.0 * momentum ** 2)) / 2.0
+            momentum_point = next_weights + ((momentum - 1.0) / next_momentum) * (next_weights - weights)
+        change = np.max(np.abs(next_weights - weights))
+        weights, momentum = next_weights, next_momentum
+        if change < STRUCTURED_TOLERANCE:
+            break
+    return weights, iteration
+
+
+def verify_against_slsqp(weights, returns, variances, risk_aversion, initial_guess):
+    """Raise a ValueError if SLSQP finds a better objective than `weights`.
+
+    SLSQP only meets the constraints to its own tolerance, and a slightly
+    infeasible point can beat the true optimum, so its answer is projected
+    onto the feasible set first. The tolerated gap is `OBJECTIVE_TOLERANCE`
+    times the scale of the objective and of the returns.
+    """
+    try:
+        reference, _ = solve_slsqp(returns, variances, risk_aversion, initial_guess)
+    except ValueError:
+        return  # Nothing to compare against; the closed form stands
+    # Euclidean projection onto sum(w) == 1, 0 <= w <= 1
+    reference = water_fill(reference, np.ones(len(reference)))
+    exact_value = mean_variance_objective(weights, returns, variances, risk_aversion)
+    reference_value = mean_variance_objective(reference, returns, variances, risk_aversion)
+    scale = max(1.0, abs(exact_value), abs(reference_value), float(np.max(np.abs(returns), initial=0.0)))
+    if exact_value > reference_value + OBJECTIVE_TOLERANCE * scale:
+        raise ValueError(
+            f"Closed-form allocation disagrees with SLSQP: {exact_value:.10g} > {reference_value:.10g}"
+        )
+
+
+def allocate_stakes(strategy: BettingStrategy, initial_weights=None, solver: str = "water_filling",
+                    verify: bool = False, covariance: str = "diagonal", cache: AllocationCache = None,
+                    method: str = "mean_variance") -> int:
+    """Allocate stakes using Mean-Variance Optimization, or the Kelly criterion.
+
+    `method="kelly"` stakes the budget in proportion to each combination's
+    own Kelly fraction; `method="simultaneous_kelly"` maximizes the joint
+    log-growth over the legs' outcomes (see `kelly_stakes`). Both use the
+    margin-adjusted odds and ignore the mean-variance options.
+
+    With `covariance="shared_legs"` the exact covariance of combinations that
+    share legs is used (see `shared_leg_covariance`) and solved with
+    `solve_structured_qp`; `solver` and `verify` then do not apply.
+
+    With the default diagonal covariance (combinations treated as independent),
+    the "water_filling" solver finds the exact optimum in O(n log n).
+    SLSQP ("slsqp") is used as a fallback when a variance is not positive.
+    With `verify`, SLSQP is run as well and a ValueError is raised if the
+    closed-form objective is worse than its projected answer beyond the
+    tolerance of `verify_against_slsqp` (the check is skipped if SLSQP itself fails).
+
+    `initial_weights` (e.g. the previous stakes) warm-starts the iterative
+    solvers after an incremental update; it is normalized to the budget constraint.
+
+    With a `cache`, an identical problem is served from it without solving,
+    and otherwise the nearest cached allocation is the warm start when no
+    `initial_weights` are given. Returns the solver iterations (0 on a cache
+    hit, 1 for the closed form).
+    """
+    returns = strategy.combinations.ev_per_dollar
+    probabilities = strategy.combinations.combined_prob
+    variances = probabilities * (1 - probabilities)
+    risk_aversion = get_risk_aversion(strategy.risk_preference)
+
+    key = None
+    if cache is not None:
+        key = cache.key(
+            strategy.combinations, strategy.risk_preference, strategy.total_budget, method, solver, covariance
+        )
+        cached = cache.get(key)
+        if cached is not None:
+            weights, kelly_fractions = cached
+            # Restore every column the solve would have written
+            if kelly_fractions is not None:
+                strategy.combinations.kelly_fraction[:] = kelly_fractions
+            strategy.set_stake_allocation(weights * strategy.total_budget)
+            if method == "mean_variance":
+                strategy.covariance = covariance
+            return 0
+        if initial_weights is None:
+            initial_weights = cache.nearest(strategy.combinations)
+
+    count = len(strategy.combinations)
+    initial_guess = np.full(count, 1.0 / count)
+    if initial_weights is not None and len(initial_weights) == count and np.sum(initial_weights) > 0:
+        initial_guess = np.asarray(initial_weights, dtype=np.float64) / np.sum(initial_weights)
+
+    if method in ("kelly", "simultaneous_kelly"):
+        weights, iterations = kelly_stakes(
+            strategy.combinations, strategy.risk_preference, simultaneous=method == "simultaneous_kelly"
+        )
+    elif method != "mean_variance":
+        raise ValueError(f"Unknown allocation method: {method}")
+    elif covariance == "shared_legs":
+        weights, iterations = solve_structured_qp(
+            returns, shared_leg_covariance(strategy.combinations), risk_aversion,
+            None if initial_weights is None else initial_guess
+        )
+    elif covariance != "diagonal":
+        raise ValueError(f"Unknown covariance model: {covariance}")
+    elif solver == "water_filling" and np.all(variances > 0):
+        weights, iterations = solve_diagonal_qp(returns, variances, risk_aversion), 1
+        if verify:
+            verify_against_slsqp(weights, returns, variances, risk_aversion, initial_guess)
+    elif solver in ("water_filling", "slsqp"):
+        weights, iterations = solve_slsqp(returns, variances, risk_aversion, initial_guess)
+    else:
+        raise ValueError(f"Unknown allocation solver: {solver}")
 
-    weights = result.x
-    strategy.stake_allocation = weights * strategy.total_budget
+    if cache is not None:
+        kelly = method in ("kelly", "simultaneous_kelly")
+        cache.put(key, strategy.combinations, weights, iterations,
+                  strategy.combinations.kelly_fraction if kelly else None)
+    strategy.set_stake_allocation(weights * strategy.total_budget)
+    if method == "mean_variance":
+        strategy.covariance = covariance
+    return iterations
@@ -0,0 +1,392 @@
+import csv
+import json
+import math
+import os
+import struct
+from datetime import datetime
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from data.bets_data import CONFIDENCE_MAPPING
+from models.bet import Bet
+from models.combination import Combination
+from models.combination_set import CombinationSet
+from models.betting_strategy import BettingStrategy
+
+# Format of the "date" field of saved strategies
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Fields a strategy file must have
+REQUIRED_FIELDS = {"total_budget", "strategy_type", "folds", "combinations", "risk_preference"}
+
+# Extension selecting the binary columnar format in `save_strategy_file` and `load_strategy_file`
+BINARY_EXTENSION = ".bstrat"
+
+# Binary files start with the magic bytes and a little-endian u64 giving the JSON header length
+BINARY_MAGIC = b"BSTRAT01"
+BINARY_PREAMBLE = struct.Struct("<8sQ")
+
+# Columns start on multiples of this many bytes, so memory-mapped arrays are aligned
+BINARY_ALIGNMENT = 64
+
+# Columns of a bet table, as read by `read_bet_columns`
+BET_FIELDS = ("name", "odds", "confidence")
+
+# Extensions read as one JSON bet per line by `read_bet_columns`
+JSON_LINES_EXTENSIONS = (".jsonl", ".ndjson")
+
+# Columns of the binary format, stored little-endian in this order
+BINARY_COLUMNS = {
+    "legs": "<i2",
+    "combined_odds": "<f8",
+    "combined_prob": "<f8",
+    "ev_per_dollar": "<f8",
+    "stake_allocation": "<f8",
+    "kelly_fraction": "<f8",
+}
+
+
+def parse_bet(bet_data: dict) -> Bet:
+    """Validate the data of one bet and convert it to a Bet.
+
+    The confidence is a label of `CONFIDENCE_MAPPING` or a probability between 0 and 1.
+    """
+    name = bet_data.get("name")
+    name = "" if name is None else str(name).strip()
+    if not name:
+        raise ValueError("Bet name cannot be empty.")
+    try:
+        odds = float(bet_data["odds"])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("Odds must be a number.")
+    if not math.isfinite(odds):
+        raise ValueError("Odds must be a number.")
+    if odds <= 1.0:
+        raise ValueError("Odds must be greater than 1.0.")
+
+    confidence = bet_data.get("confidence")
+    if isinstance(confidence, str) and confidence.strip() in CONFIDENCE_MAPPING:
+        return Bet(name, odds, CONFIDENCE_MAPPING[confidence.strip()])
+    try:
+        probability = float(confidence)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid confidence selection.")
+    if not (math.isfinite(probability) and 0.0 < probability <= 1.0):
+        raise ValueError("Confidence must be one of the labels or a probability between 0 and 1.")
+    return Bet(name, odds, probability)
+
+
+def load_slate(file_path: str) -> Tuple[List[Bet], dict]:
+    """Read bets, and optional strategy settings, from a JSON or CSV file.
+
+    JSON files hold either a list of bets or an object with a "bets" list and
+    any of "total_budget", "strategy_type", "risk_preference", "folds" and
+    "allocation". CSV files have a header with name, odds and confidence
+    columns. Returns `(bets, settings)`; raises ValueError naming the first
+    invalid bet.
+    """
+    if file_path.lower().endswith(".csv"):
+        with open(file_path, newline="") as file:
+            rows = list(csv.DictReader(file))
+        settings = {}
+    else:
+        with open(file_path, "r") as file:
+            data = json.load(file)
+        if isinstance(data, list):
+            rows, settings = data, {}
+        else:
+            rows = data.get("bets", [])
+            settings = {key: value for key, value in data.items() if key != "bets"}
+
+    bets = []
+    for index, row in enumerate(rows, start=1):
+        try:
+            bets.append(parse_bet(row))
+        except ValueError as e:
+            raise ValueError(f"Bet {index} ({row.get('name', 'Unnamed')}): {e}")
+    return bets, settings
+
+
+def read_bet_columns(file_path: str) -> Tuple[Dict[str, list], List[str]]:
+    """Read a bet table from a CSV, JSON-lines or JSON file, without validating it.
+
+    CSV files have a header with name, odds and confidence columns; JSON-lines
+    files hold one bet object per line; JSON files are read as by `load_slate`.
+    Returns `(columns, errors)`: the raw values of each field of `BET_FIELDS`,
+    one entry per bet (None where missing), and a message for each line that
+    could not be read. Raises ValueError if a CSV file lacks a column.
+    """
+    errors = []
+    lowered = file_path.lower()
+    if lowered.endswith(".csv"):
+        with open(file_path, newline="") as file:
+            reader = csv.reader(file)
+            header = [field.strip().lower() for field in next(reader, [])]
+            missing = [field for field in BET_FIELDS if field not in header]
+            if missing:
+                raise ValueError(f"CSV file has no {', '.join(missing)} column.")
+            positions = [header.index(field) for field in BET_FIELDS]
+            width = max(positions) + 1
+            rows = [row + [""] * (width - len(row)) for row in reader if row]
+        return {field: [row[position] for row in rows] for field, position in zip(BET_FIELDS, positions)}, errors
+
+    if lowered.endswith(JSON_LINES_EXTENSIONS):
+        rows = []
+        with open(file_path, "r") as file:
+            for number, line in enumerate(file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    errors.append(f"Line {number}: invalid JSON ({e.msg}).")
+                    continue
+                if isinstance(row, dict):
+                    rows.append(row)
+                else:
+                    errors.append(f"Line {number}: expected a bet object.")
+    else:
+        with open(file_path, "r") as file:
+            data = json.load(file)
+        rows = data if isinstance(data, list) else data.get("bets", [])
+        rows = [row if isinstance(row, dict) else {} for row in rows]
+    return {field: [row.get(field) for row in rows] for field in BET_FIELDS}, errors
+
+
+def to_float_array(values: Sequence) -> Tuple[np.ndarray, np.ndarray]:
+    """Convert values to float64 as `float()` does; returns `(numbers, parsed)`.
+
+    `numbers` is NaN, and `parsed` False, where `float()` fails. Nested
+    sequences are not numbers, even if numpy could flatten them, and neither
+    is None, which numpy converts to NaN.
+    """
+    try:
+        result = np.asarray(values, dtype=np.float64)
+        if result.shape != (len(values),):
+            raise ValueError("Nested sequence.")
+        rows = np.flatnonzero(np.isnan(result))
+    except (TypeError, ValueError):
+        result = np.full(len(values), np.nan)
+        rows = range(len(values))
+    parsed = np.ones(len(values), dtype=bool)
+    for index in rows:
+        try:
+            result[index] = float(values[index])
+        except (TypeError, ValueError):
+            parsed[index] = False
+    return result, parsed
+
+
+def validate_bet_columns(names: Sequence, odds: Sequence, confidences: Sequence) -> Tuple[List[Bet], Dict[int, str]]:
+    """Validate a whole bet table at once, with the checks of `parse_bet`.
+
+    The checks run on arrays rather than row by row, so tables of thousands
+    of bets validate in a few milliseconds; each row gets the error
+    `parse_bet` would raise for it. Returns the bets of the valid rows, in
+    order, and the error of each invalid row by row index, worded as by
+    `load_slate` ("Bet 3 (Name): Odds must be greater than 1.0.").
+    """
+    names = np.array(["" if name is None else str(name).strip() for name in names], dtype=object)
+    odds, odds_parsed = to_float_array(odds)
+    text = np.array([c.strip() if isinstance(c, str) else "" for c in confidences], dtype=object)
+
+    # Labels are looked up once per distinct value
+    distinct, inverse = np.unique(text.astype(str), return_inverse=True)
+    probabilities = np.array([CONFIDENCE_MAPPING.get(label, np.nan) for label in distinct])[inverse]
+    is_label = np.array([label in CONFIDENCE_MAPPING for label in distinct], dtype=bool)[inverse]
+    numbers = ~is_label
+    values, parsed = to_float_array([c for c, number in zip(confidences, numbers) if number])
+    probabilities[numbers] = values
+    confidence_parsed = is_label.copy()
+    confidence_parsed[numbers] = parsed
+
+    # First failing check of each row, in the order `parse_bet` checks them
+    failures = [
+        (names == "", "Bet name cannot be empty."),
+        (~odds_parsed | ~np.isfinite(odds), "Odds must be a number."),
+        (odds <= 1.0, "Odds must be greater than 1.0."),
+        (~confidence_parsed, "Invalid confidence selection."),
+        (~(np.isfinite(probabilities) & (probabilities > 0.0) & (probabilities <= 1.0)),
+         "Confidence must be one of the labels or a probability between 0 and 1."),
+    ]
+    error_codes = np.select([mask for mask, _ in failures], np.arange(1, len(failures) + 1), 0)
+
+    invalid = np.flatnonzero(error_codes)
+    errors = {
+        row: f"Bet {row + 1} ({name or 'Unnamed'}): {failures[code - 1][1]}"
+        for row, name, code in zip(invalid.tolist(), names[invalid].tolist(), error_codes[invalid].tolist())
+    }
+    valid = np.flatnonzero(error_codes == 0)
+    bets = [
+        Bet(name, bet_odds, probability)
+        for name, bet_odds, probability in zip(
+            names[valid].tolist(), odds[valid].tolist(), probabilities[valid].tolist()
+        )
+    ]
+    return bets, errors
+
+
+def strategy_to_dict(strategy: BettingStrategy, date: str = None) -> dict:
+    """Saved-strategy representation: the combinations with a stake greater than zero."""
+    stakes = np.asarray(strategy.stake_allocation, dtype=np.float64)
+    staked = [(strategy.combinations[index], float(stakes[index])) for index in np.flatnonzero(stakes > 0)]
+    return {
+        "date": date or datetime.now().strftime(DATE_FORMAT),
+        "total_budget": strategy.total_budget,
+        "total_stake": sum(stake for combo, stake in staked),
+        "total_potential_payout": sum(combo.combined_odds * stake for combo, stake in staked),
+        "strategy_type": strategy.strategy_type,
+        "risk_preference": strategy.risk_preference,
+        "folds": strategy.folds,
+        "combinations": [
+            {
+                "bets": [
+                    {"name": bet.name, "odds": bet.odds, "confidence": bet.confidence}
+                    for bet in combo.bets
+                ],
+                "combined_odds": combo.combined_odds,
+                "combined_prob": combo.combined_prob,
+                "ev_per_dollar": combo.ev_per_dollar,
+                "stake_allocation": stake,
+                "potential_payout": combo.combined_odds * stake,
+            }
+            for combo, stake in staked
+        ],
+    }
+
+
+def strategy_from_dict(data: dict) -> BettingStrategy:
+    """Rebuild a strategy saved by `strategy_to_dict`."""
+    if not REQUIRED_FIELDS.issubset(data.keys()):
+        raise ValueError("Invalid strategy file format.")
+
+    combinations = []
+    stake_allocations = []
+    for combo_data in data["combinations"]:
+        bets = [Bet(bet["name"], bet["odds"], bet["confidence"]) for bet in combo_data["bets"]]
+        combinations.append(Combination(bets))
+        stake_allocations.append(combo_data.get("stake_allocation", 0.0))
+
+    return BettingStrategy(
+        total_budget=data["total_budget"],
+        strategy_type=data["strategy_type"],
+        folds=data["folds"],
+        risk_preference=data["risk_preference"],
+        combinations=combinations,
+        stake_allocation=stake_allocations
+    )
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // BINARY_ALIGNMENT) * BINARY_ALIGNMENT
+
+
+def save_strategy_binary(strategy: BettingStrategy, file_path: str, date: str = None):
+    """Write the staked combinations in the binary columnar format.
+
+    The file holds the preamble, a JSON header (settings, totals, the bet
+    table written once and the column layout), then each column of
+    `BINARY_COLUMNS` as raw aligned little-endian arrays. As with
+    `strategy_to_dict`, only combinations with a stake greater than zero are
+    kept.
+    """
+    stakes = np.asarray(strategy.stake_allocation, dtype=np.float64)
+    staked = np.flatnonzero(stakes > 0)
+    combinations = strategy.combinations.take(staked)
+    combinations.stake_allocation = stakes[staked]
+    columns = {
+        name: np.ascontiguousarray(getattr(combinations, name), dtype=dtype)
+        for name, dtype in BINARY_COLUMNS.items()
+    }
+
+    layout, offset = {}, 0
+    for name, column in columns.items():
+        layout[name] = {"dtype": column.dtype.str, "shape": list(column.shape), "offset": offset}
+        offset = _aligned(offset + column.nbytes)
+    header = json.dumps({
+        "date": date or datetime.now().strftime(DATE_FORMAT),
+        "total_budget": strategy.total_budget,
+        "total_stake": float(combinations.stake_allocation.sum()),
+        "total_potential_payout": float(combinations.stake_allocation @ combinations.combined_odds),
+        "strategy_type": strategy.strategy_type,
+        "risk_preference": strategy.risk_preference,
+        "folds": strategy.folds,
+        "bets": [{"name": bet.name, "odds": bet.odds, "confidence": bet.confidence} for bet in combinations.bets],
+        "columns": layout,
+    }).encode()
+    # Column offsets are relative to the first aligned byte after the header
+    data_start = _aligned(BINARY_PREAMBLE.size + len(header))
+
+    with open(file_path, "wb") as file:
+        file.write(BINARY_PREAMBLE.pack(BINARY_MAGIC, len(header)))
+        file.write(header)
+        for name, column in columns.items():
+            file.seek(data_start + layout[name]["offset"])
+            file.write(column.tobytes())
+        file.truncate(data_start + offset)
+
+
+def read_binary_header(file_path: str) -> Tuple[dict, int]:
+    """Return the JSON header of a binary strategy file and the offset of its first column."""
+    with open(file_path, "rb") as file:
+        magic, header_length = BINARY_PREAMBLE.unpack(file.read(BINARY_PREAMBLE.size))
+        if magic != BINARY_MAGIC:
+            raise ValueError("Invalid strategy file format.")
+        header = json.loads(file.read(header_length))
+    return header, _aligned(BINARY_PREAMBLE.size + header_length)
+
+
+def load_strategy_binary(file_path: str) -> BettingStrategy:
+    """Load a strategy written by `save_strategy_binary`.
+
+    The columns are memory-mapped copy-on-write: nothing is read until used,
+    and re-scoring or re-allocating the loaded strategy never modifies the file.
+    """
+    header, data_start = read_binary_header(file_path)
+
+    columns = {}
+    for name in BINARY_COLUMNS:
+        layout = header["columns"][name]
+        shape = tuple(layout["shape"])
+        if 0 in shape:
+            columns[name] = np.zeros(shape, dtype=layout["dtype"])
+        else:
+            columns[name] = np.memmap(
+                file_path, dtype=layout["dtype"], mode="c", offset=data_start + layout["offset"], shape=shape
+            )
+    bets = [Bet(bet["name"], bet["odds"], bet["confidence"]) for bet in header["bets"]]
+    return BettingStrategy(
+        total_budget=header["total_budget"],
+        strategy_type=header["strategy_type"],
+        folds=header["folds"],
+        risk_preference=header["risk_preference"],
+        combinations=CombinationSet(bets, **columns),
+    )
+
+
+def is_binary_strategy_file(file_path: str) -> bool:
+    return file_path.lower().endswith(BINARY_EXTENSION)
+
+
+def save_strategy_file(strategy: BettingStrategy, file_path: str):
+    """Save a strategy, creating the directory if needed.
+
+    Files ending in `BINARY_EXTENSION` use the binary columnar format, any
+    other name `strategy_to_dict(strategy)` as indented JSON.
+    """
+    directory = os.path.dirname(file_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if is_binary_strategy_file(file_path):
+        save_strategy_binary(strategy, file_path)
+        return
+    with open(file_path, "w") as file:
+        json.dump(strategy_to_dict(strategy), file, indent=4)
+
+
+def load_strategy_file(file_path: str) -> BettingStrategy:
+    if is_binary_strategy_file(file_path):
+        return load_strategy_binary(file_path)
+    with open(file_path, "r") as file:
+        return strategy_from_dict(json.load(file))
@@ -0,0 +1,274 @@
+import glob
+import json
+import os
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from models.bet import Bet
+from models.combination_set import LEG_DTYPE, CombinationSet
+from models.betting_strategy import BettingStrategy
+from .strategy_io import (
+    BINARY_EXTENSION, DATE_FORMAT, is_binary_strategy_file, load_strategy_binary, read_binary_header,
+    strategy_from_dict
+)
+
+# Database used by the GUI, next to the saved strategy files
+DEFAULT_DATABASE = os.path.join("results", "strategies.db")
+
+# Leg indices are stored per combination as little-endian int16 blobs, padded to the strategy's width
+LEG_BLOB_DTYPE = "<i2"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS strategies (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    total_budget REAL NOT NULL,
+    total_stake REAL NOT NULL,
+    total_potential_payout REAL NOT NULL,
+    strategy_type TEXT NOT NULL,
+    risk_preference TEXT NOT NULL,
+    folds INTEGER,
+    ev_per_dollar REAL NOT NULL,
+    combination_count INTEGER NOT NULL,
+    leg_width INTEGER NOT NULL,
+    source TEXT UNIQUE
+);
+CREATE INDEX IF NOT EXISTS strategies_date ON strategies (date);
+CREATE INDEX IF NOT EXISTS strategies_settings ON strategies (strategy_type, risk_preference, date);
+CREATE INDEX IF NOT EXISTS strategies_ev ON strategies (ev_per_dollar);
+
+CREATE TABLE IF NOT EXISTS bets (
+    strategy_id INTEGER NOT NULL REFERENCES strategies (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    odds REAL NOT NULL,
+    confidence REAL NOT NULL,
+    PRIMARY KEY (strategy_id, position)
+);
+CREATE INDEX IF NOT EXISTS bets_name ON bets (name, strategy_id);
+
+CREATE TABLE IF NOT EXISTS combinations (
+    strategy_id INTEGER NOT NULL REFERENCES strategies (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    legs BLOB NOT NULL,
+    combined_odds REAL NOT NULL,
+    combined_prob REAL NOT NULL,
+    ev_per_dollar REAL NOT NULL,
+    stake_allocation REAL NOT NULL,
+    kelly_fraction REAL NOT NULL,
+    PRIMARY KEY (strategy_id, position)
+);
+CREATE INDEX IF NOT EXISTS combinations_ev ON combinations (ev_per_dollar);
+"""
+
+
+@dataclass
+class StrategyRecord:
+    """Summary row of a stored strategy, as returned by `StrategyStore.find`.
+
+    `ev_per_dollar` is the stake-weighted EV per dollar of the staked combinations.
+    """
+    id: int
+    date: str
+    strategy_type: str
+    risk_preference: str
+    folds: Optional[int]
+    total_budget: float
+    total_stake: float
+    total_potential_payout: float
+    ev_per_dollar: float
+    combination_count: int
+    source: Optional[str]
+
+    def label(self) -> str:
+        return (f"#{self.id}  {self.date}  {self.strategy_type} / {self.risk_preference}  "
+                f"EV {self.ev_per_dollar:.3f}  Stake {self.total_stake:.2f}  ({self.combination_count} combinations)")
+
+
+def format_date(value) -> Optional[str]:
+    """Dates are stored as `DATE_FORMAT` text, which sorts chronologically."""
+    if isinstance(value, datetime):
+        return value.strftime(DATE_FORMAT)
+    return value
+
+
+class StrategyStore:
+    """SQLite index of saved strategies, their bets and their staked combinations.
+
+    As with the strategy files, only combinations with a stake greater than
+    zero are stored, with the bets they use. Strategies can be queried by
+    date, type, risk preference, leg name and EV, and loaded back by id
+    without reading the original file.
+    """
+
+    def __init__(self, path: str = DEFAULT_DATABASE):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _insert(self, strategy: BettingStrategy, date: str = None, source: str = None) -> int:
+        """Insert a strategy without committing, replacing any strategy indexed from the same source."""
+        stakes = np.asarray(strategy.stake_allocation, dtype=np.float64)
+        rows = np.flatnonzero(stakes > 0)
+        combinations = strategy.combinations.take(rows)
+        stakes = stakes[rows]
+
+        # Keep only the bets used by the staked combinations, renumbering the legs
+        legs = combinations.legs
+        used = np.unique(legs[legs >= 0])
+        renumber = np.full(len(combinations.bets) + 1, -1, dtype=LEG_DTYPE)  # The last slot maps -1 to -1
+        renumber[used] = np.arange(len(used))
+        legs = np.ascontiguousarray(renumber[legs], dtype=LEG_BLOB_DTYPE)
+        bets = [combinations.bets[leg] for leg in used]
+
+        total_stake = float(stakes.sum())
+        ev = float(stakes @ combinations.ev_per_dollar / total_stake) if total_stake > 0 else 0.0
+        if source is not None:
+            self.connection.execute("DELETE FROM strategies WHERE source = ?", (source,))
+        cursor = self.connection.execute(
+            "INSERT INTO strategies (date, total_budget, total_stake, total_potential_payout, strategy_type, "
+            "risk_preference, folds, ev_per_dollar, combination_count, leg_width, source) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (format_date(date) or datetime.now().strftime(DATE_FORMAT), float(strategy.total_budget), total_stake,
+             float(stakes @ combinations.combined_odds), strategy.strategy_type, strategy.risk_preference,
+             strategy.folds, ev, len(rows), legs.shape[1], source)
+        )
+        strategy_id = cursor.lastrowid
+        self.connection.executemany(
+            "INSERT INTO bets (strategy_id, position, name, odds, confidence) VALUES (?, ?, ?, ?, ?)",
+            [(strategy_id, position, bet.name, float(bet.odds), float(bet.confidence))
+             for position, bet in enumerate(bets)]
+        )
+        self.connection.executemany(
+            "INSERT INTO combinations (strategy_id, position, legs, combined_odds, combined_prob, ev_per_dollar, "
+            "stake_allocation, kelly_fraction) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            zip(
+                [strategy_id] * len(rows), range(len(rows)), (row.tobytes() for row in legs),
+                combinations.combined_odds.tolist(), combinations.combined_prob.tolist(),
+                combinations.ev_per_dollar.tolist(), stakes.tolist(), combinations.kelly_fraction.tolist(),
+            )
+        )
+        return strategy_id
+
+    def add(self, strategy: BettingStrategy, date=None, source: str = None) -> int:
+        """Index a strategy (e.g. when it is saved to `source`); returns its id."""
+        with self.connection:
+            return self._insert(strategy, date, None if source is None else os.path.abspath(source))
+
+    def import_directory(self, directory: str = "results") -> Tuple[int, int, List[str]]:
+        """Index every strategy file of a directory in a single transaction.
+
+        Files already indexed (by path) are skipped, so the import can be
+        repeated cheaply. Returns `(imported, skipped, errors)`.
+        """
+        paths = sorted(glob.glob(os.path.join(directory, "*.json")) +
+                       glob.glob(os.path.join(directory, "*" + BINARY_EXTENSION)))
+        known = {source for source, in self.connection.execute("SELECT source FROM strategies WHERE source IS NOT NULL")}
+        imported, skipped, errors = 0, 0, []
+        with self.connection:
+            for path in paths:
+                source = os.path.abspath(path)
+                if source in known:
+                    skipped += 1
+                    continue
+                try:
+                    if is_binary_strategy_file(path):
+                        date = read_binary_header(path)[0].get("date")
+                        strategy = load_strategy_binary(path)
+                    else:
+                        with open(path, "r") as file:
+                            data = json.load(file)
+                        date = data.get("date")
+                        strategy = strategy_from_dict(data)
+                    self._insert(strategy, date, source)
+                    imported += 1
+                except Exception as e:
+                    errors.append(f"{path}: {e}")
+        return imported, skipped, errors
+
+    def find(self, date_from=None, date_to=None, strategy_type: str = None, risk_preference: str = None,
+             leg: str = None, min_ev: float = None, max_ev: float = None, limit: int = None) -> List[StrategyRecord]:
+        """Return the matching strategies, most recent first.
+
+        Dates are datetimes or `DATE_FORMAT` text (a prefix such as
+        "2024-10" works); `date_from` is inclusive and `date_to` exclusive.
+        `leg` matches strategies staking a combination that uses a bet of
+        that name; the EV bounds apply to the stake-weighted EV per dollar.
+        """
+        conditions, parameters = [], []
+        for condition, value in (
+                ("date >= ?", format_date(date_from)),
+                ("date < ?", format_date(date_to)),
+                ("strategy_type = ?", strategy_type),
+                ("risk_preference = ?", risk_preference),
+                ("ev_per_dollar >= ?", min_ev),
+                ("ev_per_dollar <= ?", max_ev),
+                ("EXISTS (SELECT 1 FROM bets WHERE bets.strategy_id = strategies.id AND bets.name = ?)", leg),
+        ):
+            if value is not None:
+                conditions.append(condition)
+                parameters.append(value)
+        query = (
+            "SELECT id, date, strategy_type, risk_preference, folds, total_budget, total_stake, "
+            "total_potential_payout, ev_per_dollar, combination_count, source FROM strategies"
+        )
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY date DESC, id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            parameters.append(int(limit))
+        return [StrategyRecord(*row) for row in self.connection.execute(query, parameters)]
+
+    def load(self, strategy_id: int) -> BettingStrategy:
+        """Rebuild a stored strategy (raises KeyError for an unknown id)."""
+        row = self.connection.execute(
+            "SELECT total_budget, strategy_type, folds, risk_preference, combination_count, leg_width "
+            "FROM strategies WHERE id = ?", (strategy_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"No stored strategy with id {strategy_id}.")
+        total_budget, strategy_type, folds, risk_preference, count, width = row
+
+        bets = [Bet(*bet) for bet in self.connection.execute(
+            "SELECT name, odds, confidence FROM bets WHERE strategy_id = ? ORDER BY position", (strategy_id,)
+        )]
+        rows = self.connection.execute(
+            "SELECT legs, combined_odds, combined_prob, ev_per_dollar, stake_allocation, kelly_fraction "
+            "FROM combinations WHERE strategy_id = ? ORDER BY position", (strategy_id,)
+        ).fetchall()
+        columns = list(zip(*rows)) or [()] * 6
+        legs = np.frombuffer(b"".join(columns[0]), dtype=LEG_BLOB_DTYPE).astype(LEG_DTYPE).reshape(count, width)
+        odds, probs, ev, stakes, kelly = (np.array(column, dtype=np.float64) for column in columns[1:])
+        return BettingStrategy(
+            total_budget=total_budget,
+            strategy_type=strategy_type,
+            folds=folds,
+            risk_preference=risk_preference,
+            combinations=CombinationSet(bets, legs, odds, probs, ev, stakes, kelly),
+        )
+
+    def delete(self, strategy_id: int):
+        with self.connection:
+            self.connection.execute("DELETE FROM strategies WHERE id = ?", (strategy_id,))
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM strategies").fetchone()[0]
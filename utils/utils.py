@@ -1,6 +1,8 @@
 import itertools
 from typing import List
+import numpy as np
 from models.models import Bet, Combination, BettingStrategy
+from .kelly_criterion import kelly_fractions
 
 
 def kelly_criterion(odds: float, probability: float, fraction: float = 1.0) -> float:
@@ -42,17 +44,17 @@ def allocate_stakes(strategy: BettingStrategy, margin: float = 0.05):
         "Aggressive": 1.0
     }.get(strategy.risk_preference, 0.5)
 
-    total_kelly_fraction = 0.0
-
-    for combo in strategy.combinations:
-        adjusted_odds = combo.combined_odds * (1 - margin)
-        combo.adjusted_odds = adjusted_odds
-        combo.kelly_fraction = kelly_criterion(adjusted_odds, combo.combined_prob, fraction=risk_fraction)
-        total_kelly_fraction += combo.kelly_fraction
+    adjusted_odds = np.array([combo.combined_odds for combo in strategy.combinations]) * (1 - margin)
+    probabilities = np.array([combo.combined_prob for combo in strategy.combinations])
+    fractions = kelly_fractions(adjusted_odds, probabilities, fraction=risk_fraction)
+    for combo, odds, kelly_fraction in zip(strategy.combinations, adjusted_odds, fractions):
+        combo.adjusted_odds = float(odds)
+        combo.kelly_fraction = float(kelly_fraction)
 
+    total_kelly_fraction = fractions.sum()
     if total_kelly_fraction == 0:
         stakes = [0.0 for _ in strategy.combinations]
     else:
-        stakes = [(combo.kelly_fraction / total_kelly_fraction) * total_budget for combo in strategy.combinations]
+        stakes = (fractions / total_kelly_fraction * total_budget).tolist()
 
     strategy.stake_allocation = stakes